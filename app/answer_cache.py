@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.metrics import timed
+from app.vector_store import VectorStore
+
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", "data/answer_cache")
+# Minimum cosine similarity between two questions for a cached answer to be reused
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+# Seconds a cached answer stays valid, even for the same news snapshot
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "900"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "10000"))
+# Candidates compared per lookup; near-duplicates of older snapshots may rank first
+CANDIDATES = 5
+
+
+class SemanticAnswerCache:
+    """
+    Answers keyed by question embedding and news snapshot. A question close
+    enough to one answered for the same snapshot within the TTL gets the
+    stored answer back without another LLM call. Questions are embedded
+    outside the lock, which only covers the index search and update.
+    """
+
+    def __init__(self, store: VectorStore = None, path: str = ANSWER_CACHE_PATH,
+                 threshold: float = ANSWER_CACHE_THRESHOLD, ttl: float = ANSWER_CACHE_TTL,
+                 max_entries: int = ANSWER_CACHE_SIZE):
+        self.path = path
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._store = store
+        self._lock = threading.Lock()
+
+    def _get_store(self) -> VectorStore:
+        """Open the store on first use. Callers must hold the lock."""
+        if self._store is None:
+            self._store = VectorStore(persist_path=self.path, max_history=self.max_entries, metric="cosine")
+        return self._store
+
+    @timed("answer_cache.get")
+    def get(self, question: str, snapshot_key: str) -> Optional[Dict[str, Any]]:
+        """Stored analysis for a near-duplicate question on this snapshot, or None."""
+        now = time.time()
+        try:
+            with self._lock:
+                store = self._get_store()
+            # The embedding may be a network round trip, other lookups needn't wait for it
+            embedding = store.create_embeddings([question])[0]
+            with self._lock:
+                candidates = store.search_embedding(embedding, top_k=CANDIDATES)
+        except Exception as e:
+            print(f"Error reading answer cache: {str(e)}")
+            candidates = []
+        with self._lock:
+            for context, score in candidates:
+                if (score >= self.threshold and context.get("snapshot") == snapshot_key
+                        and now - context["timestamp"] <= self.ttl):
+                    self.hits += 1
+                    return context["analysis"]
+            self.misses += 1
+        return None
+
+    @timed("answer_cache.put")
+    def put(self, question: str, snapshot_key: str, analysis: Dict[str, Any]) -> None:
+        try:
+            with self._lock:
+                store = self._get_store()
+            embeddings = store.create_embeddings([question])
+            with self._lock:
+                store.add_contexts(
+                    [(question, analysis.get("content", ""), None)],
+                    [{"snapshot": snapshot_key, "analysis": analysis}], embeddings=embeddings
+                )
+        except Exception as e:
+            print(f"Error writing answer cache: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._store.contexts) if self._store is not None else 0,
+        }
+
+
+answer_cache = SemanticAnswerCache()
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import pytz
+
+DB_PATH = "database/news_sense.db"
+
+# Query parameters that only track the referrer and never change the article
+TRACKING_PARAMS = {"ref", "fbclid", "gclid", "cmpid"}
+# Bound parameters per IN (...) query, under SQLite's default limit
+MAX_QUERY_PARAMS = 500
+
+
+def canonical_url(url: str) -> str:
+    """Normalise an article URL so the same story always maps to one key."""
+    parts = urlsplit(url.strip())
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ""))
+
+
+def _published_at(timestamp: Optional[str], default: float) -> float:
+    """Epoch seconds for the timestamp formats produced by the scrapers."""
+    if timestamp:
+        try:
+            return parsedate_to_datetime(timestamp).timestamp()
+        except (TypeError, ValueError):
+            pass
+        try:
+            return pytz.UTC.localize(datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")).timestamp()
+        except ValueError:
+            pass
+    return default
+
+
+class ArticleStore:
+    """
+    Persistent article table in the app database, keyed by canonical URL.
+    `upsert_many` returns only the articles that are new or whose content
+    changed, so downstream stages only see fresh news.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the database on first use. Callers must hold the lock."""
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    url TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    content TEXT,
+                    source TEXT,
+                    timestamp TEXT,
+                    published_at REAL NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    first_seen REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_source_published ON articles (source, published_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def upsert_many(self, articles: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert or update articles and return the ones that are new or changed."""
+        now = time.time()
+        fresh = []
+        articles = [article for article in articles if article.get("url")]
+        with self._lock:
+            db = self._db()
+            stored = {row["url"]: row["content_hash"]
+                      for row in self._select(db, "url, content_hash", [canonical_url(a["url"]) for a in articles])}
+            for article in articles:
+                url = canonical_url(article["url"])
+                content_hash = hashlib.sha256(
+                    f"{article.get('title', '')}\n{article.get('content', '')}".encode("utf-8")
+                ).hexdigest()
+                if stored.get(url) == content_hash:
+                    continue
+                stored[url] = content_hash
+                db.execute(
+                    """
+                    INSERT INTO articles (url, title, content, source, timestamp, published_at,
+                                          content_hash, first_seen, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        title = excluded.title, content = excluded.content,
+                        source = excluded.source, timestamp = excluded.timestamp,
+                        content_hash = excluded.content_hash, updated_at = excluded.updated_at
+                    """,
+                    (url, article.get("title", ""), article.get("content"), article.get("source"),
+                     article.get("timestamp"), _published_at(article.get("timestamp"), now),
+                     content_hash, now, now)
+                )
+                fresh.append(article)
+            db.commit()
+        return fresh
+
+    def _select(self, db: sqlite3.Connection, columns: str, keys: List[str]) -> List[sqlite3.Row]:
+        """Rows for many canonical URLs, a few IN (...) queries instead of one per URL."""
+        keys = list(dict.fromkeys(keys))
+        rows = []
+        for i in range(0, len(keys), MAX_QUERY_PARAMS):
+            chunk = keys[i:i + MAX_QUERY_PARAMS]
+            rows.extend(db.execute(
+                f"SELECT {columns} FROM articles WHERE url IN ({','.join('?' for _ in chunk)})", chunk
+            ).fetchall())
+        return rows
+
+    def known_urls(self, urls: Iterable[str]) -> Set[str]:
+        """The subset of `urls` (as given) that are already stored."""
+        by_key = {canonical_url(url): url for url in urls}
+        with self._lock:
+            rows = self._select(self._db(), "url", list(by_key))
+        return {by_key[row["url"]] for row in rows}
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored articles by URL (as given) for those of `urls` that are stored."""
+        by_key = {canonical_url(url): url for url in urls}
+        with self._lock:
+            rows = self._select(self._db(), "*", list(by_key))
+        return {by_key[row["url"]]: _to_article(row) for row in rows}
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT * FROM articles WHERE url = ?", (canonical_url(url),)
+            ).fetchone()
+        return _to_article(row) if row else None
+
+    def latest(self, limit: int = 50, source: str = None) -> List[Dict[str, Any]]:
+        """Most recently published articles, optionally for one source."""
+        with self._lock:
+            if source:
+                rows = self._db().execute(
+                    "SELECT * FROM articles WHERE source = ? ORDER BY published_at DESC LIMIT ?",
+                    (source, limit)
+                ).fetchall()
+            else:
+                rows = self._db().execute(
+                    "SELECT * FROM articles ORDER BY published_at DESC LIMIT ?", (limit,)
+                ).fetchall()
+        return [_to_article(row) for row in rows]
+
+
+def _to_article(row: sqlite3.Row) -> Dict[str, Any]:
+    """Same dict shape as NewsArticle.to_dict()"""
+    return {
+        "title": row["title"],
+        "content": row["content"],
+        "url": row["url"],
+        "source": row["source"],
+        "timestamp": row["timestamp"],
+    }
+
+
+article_store = ArticleStore()
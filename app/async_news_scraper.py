@@ -0,0 +1,250 @@
+import asyncio
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import pytz
+
+from app.article_store import ArticleStore, article_store
+from app.http_cache import HttpCache, http_cache
+from app.metrics import record_error, timed
+from app.news_scraper import NewsArticle, parse_article_content, parse_feed, parse_listing, parser_key
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
+# Source definitions. "html" sources scrape a listing page for article links,
+# "rss" sources read links from a feed. Article bodies are the <p> tags inside
+# the element carrying `content_class`.
+NEWS_SOURCES: List[Dict[str, Any]] = [
+    {
+        "name": "MoneyControl",
+        "type": "html",
+        "urls": [
+            "https://www.moneycontrol.com/news/business/markets/",
+            "https://www.moneycontrol.com/news/business/stocks/",
+        ],
+        "listing_selector": "li.clearfix",
+        "title_tag": "h2",
+        "link_prefix": "",
+        "content_class": "content_wrapper",
+    },
+    {
+        "name": "Economic Times",
+        "type": "rss",
+        "urls": ["https://economictimes.indiatimes.com/markets/rssfeeds/1977021501.cms"],
+        "limit": 10,
+        "content_class": "artText",
+    },
+    {
+        "name": "Livemint",
+        "type": "rss",
+        "urls": ["https://www.livemint.com/rss/markets"],
+        "limit": 10,
+        "content_class": "mainArea",
+    },
+    {
+        "name": "Business Standard",
+        "type": "html",
+        "urls": ["https://www.business-standard.com/markets"],
+        "listing_selector": ".article-list li",
+        "title_tag": "h2",
+        "link_prefix": "https://www.business-standard.com",
+        "content_class": "article-content",
+    },
+]
+
+
+class TokenBucket:
+    """Async token bucket: allows `rate` requests per second with bursts of `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncFinancialNewsScraper:
+    """
+    Asyncio counterpart of FinancialNewsScraper. All sources share one
+    keep-alive HTTP client, article bodies are fetched concurrently, each host
+    is limited in concurrency and request rate, and the whole batch is bounded
+    by a global deadline.
+    """
+
+    def __init__(self, sources: List[Dict[str, Any]] = None, per_host_limit: int = 4,
+                 requests_per_second: float = 4.0, burst: float = 4.0,
+                 deadline: float = 30.0, timeout: float = 10.0, max_articles: Optional[int] = None,
+                 client: httpx.AsyncClient = None, cache: Optional[HttpCache] = http_cache,
+                 store: Optional[ArticleStore] = article_store):
+        self.sources = sources if sources is not None else NEWS_SOURCES
+        self.per_host_limit = per_host_limit
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.deadline = deadline
+        self.timeout = timeout
+        self.max_articles = max_articles
+        self.cache = cache
+        self.store = store
+        self._client: Optional[httpx.AsyncClient] = client
+        self._hosts: Dict[str, tuple] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=HEADERS,
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._hosts = {}
+
+    def _host_limits(self, url: str) -> tuple:
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = (
+                asyncio.Semaphore(self.per_host_limit),
+                TokenBucket(self.requests_per_second, self.burst),
+            )
+        return self._hosts[host]
+
+    async def _fetch_parsed(self, url: str, parse: Callable[..., Any], *args) -> Any:
+        """
+        GET a page and return `parse(text, *args)`. With a cache configured the request
+        is conditional and unchanged pages reuse the previously parsed result.
+        Only the request itself runs on the event loop.
+        """
+        semaphore, bucket = self._host_limits(url)
+        loop = asyncio.get_running_loop()
+        parser = parser_key(parse, *args)
+        async with semaphore:
+            await bucket.acquire()
+            try:
+                # Cache reads and writes and HTML parsing block, so they run in the default executor
+                headers = await loop.run_in_executor(None, self.cache.request_headers, url, parser) if self.cache else {}
+                response = await self._get_client().get(url, headers=headers)
+                if response.status_code != 304:
+                    response.raise_for_status()
+                if self.cache is None:
+                    return await loop.run_in_executor(None, parse, response.text, *args)
+                return await loop.run_in_executor(None, self.cache.resolve, url, response.status_code, response.headers,
+                                                  response.content, lambda: parse(response.text, *args), parser)
+            except Exception as e:
+                print(f"Error fetching {url}: {str(e)}")
+                record_error("fetch")
+                return None
+
+    async def _get_links(self, source: Dict[str, Any], url: str) -> List[Dict[str, Any]]:
+        """Return [{title, link, timestamp, summary}] found on a listing page or feed."""
+        if source["type"] == "rss":
+            links = await self._fetch_parsed(url, parse_feed)
+        else:
+            links = await self._fetch_parsed(url, parse_listing, source["listing_selector"], source["title_tag"],
+                                             source.get("link_prefix", ""))
+        if not links:
+            return []
+        limit = source.get("limit")
+        return links[:limit] if limit else links
+
+    async def _get_article(self, source: Dict[str, Any], item: Dict[str, Any],
+                           results: List[NewsArticle]) -> None:
+        content = await self._fetch_parsed(item["link"], parse_article_content, source["content_class"])
+        results.append(NewsArticle(
+            title=item["title"],
+            content=content or item["summary"] or item["title"],
+            url=item["link"],
+            source=source["name"],
+            timestamp=item["timestamp"],
+        ))
+
+    async def _scrape_source(self, source: Dict[str, Any], results: List[NewsArticle]) -> None:
+        with timed("scrape." + source["name"].lower().replace(" ", "_")):
+            await self._scrape_source_pages(source, results)
+
+    async def _scrape_source_pages(self, source: Dict[str, Any], results: List[NewsArticle]) -> None:
+        listings = await asyncio.gather(*[self._get_links(source, url) for url in source["urls"]])
+        items = [item for links in listings for item in links]
+        # Published articles don't change, reuse the stored body instead of fetching it again
+        if self.store:
+            loop = asyncio.get_running_loop()
+            known = await loop.run_in_executor(None, self.store.get_many, [item["link"] for item in items])
+        else:
+            known = {}
+        to_fetch = []
+        for item in items:
+            stored = known.get(item["link"])
+            # Stored bodies that fell back to the headline are retried
+            if stored and stored["content"] and stored["content"] != item["title"]:
+                results.append(NewsArticle(title=item["title"], content=stored["content"],
+                                           url=item["link"], source=source["name"],
+                                           timestamp=item["timestamp"] or stored["timestamp"]))
+            else:
+                to_fetch.append(item)
+        await asyncio.gather(*[self._get_article(source, item, results) for item in to_fetch])
+
+    @timed("news_refresh")
+    async def get_all_news(self) -> List[Dict]:
+        """Fetch news from all sources concurrently, returning whatever finished before the deadline"""
+        # Articles are collected as they complete so a slow host only loses its own pending pages
+        results: List[NewsArticle] = []
+        tasks = [asyncio.create_task(self._scrape_source(source, results)) for source in self.sources]
+        done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            print(f"News deadline of {self.deadline}s reached, {len(pending)} source(s) incomplete")
+        for task in done:
+            if task.exception():
+                print(f"Error scraping source: {str(task.exception())}")
+
+        all_articles = [article.to_dict() for article in results]
+        all_articles.sort(key=_timestamp_sort_key, reverse=True)
+        return all_articles[:self.max_articles] if self.max_articles else all_articles
+
+
+def _timestamp_sort_key(article: Dict[str, Any]) -> datetime:
+    """Parse RFC 822 feed timestamps; undated articles count as just published."""
+    try:
+        parsed = parsedate_to_datetime(article["timestamp"])
+        return parsed if parsed.tzinfo else pytz.UTC.localize(parsed)
+    except (TypeError, ValueError):
+        return datetime.now(pytz.UTC)
+
+
+def scrape_all_news() -> List[Dict]:
+    """Synchronous entry point running one batch with a fresh client"""
+    async def run():
+        scraper = AsyncFinancialNewsScraper()
+        try:
+            return await scraper.get_all_news()
+        finally:
+            await scraper.aclose()
+    return asyncio.run(run())
+
+
+async_news_scraper = AsyncFinancialNewsScraper()
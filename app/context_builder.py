@@ -0,0 +1,162 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Prompt tokens spent on news context, and the size of each ranked chunk
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "800"))
+CONTEXT_CHUNK_TOKENS = int(os.getenv("CONTEXT_CHUNK_TOKENS", "120"))
+# Chunks whose word trigrams overlap an already chosen chunk this much are dropped
+DUPLICATE_THRESHOLD = 0.8
+
+_WORD = re.compile(r"\w+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English), no tokenizer needed."""
+    return max(1, len(text) // 4)
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def chunk_text(text: str, max_tokens: int = CONTEXT_CHUNK_TOKENS) -> List[str]:
+    """Split text on sentence boundaries into chunks of at most ~max_tokens."""
+    chunks, current, size = [], [], 0
+    for sentence in _SENTENCE_END.split(text.strip()):
+        words = sentence.split()
+        # Sentences longer than a chunk are cut on word boundaries
+        while words:
+            piece, words = _take(words, max_tokens)
+            tokens = estimate_tokens(piece)
+            if current and size + tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _take(words: List[str], max_tokens: int) -> Tuple[str, List[str]]:
+    budget = max_tokens * 4
+    used = 0
+    for i, word in enumerate(words):
+        used += len(word) + 1
+        if used > budget and i:
+            return " ".join(words[:i]), words[i:]
+    return " ".join(words), []
+
+
+def _shingles(terms: List[str]) -> set:
+    return set(zip(terms, terms[1:], terms[2:])) or set(terms)
+
+
+class ChunkIndex:
+    """BM25 index over the chunks of a fixed list of articles."""
+
+    def __init__(self, articles: Sequence[Dict[str, Any]], chunk_tokens: int = CONTEXT_CHUNK_TOKENS,
+                 k1: float = 1.5, b: float = 0.75):
+        self.articles = list(articles)
+        self.k1 = k1
+        self.b = b
+        self.chunks: List[Tuple[int, str]] = []  # (article position, text)
+        self._terms: List[Counter] = []
+        self._shingles: List[set] = []
+        df = Counter()
+        for position, article in enumerate(self.articles):
+            title_terms = tokenize(article.get("title", ""))
+            for text in chunk_text(article.get("content") or "", chunk_tokens):
+                terms = tokenize(text)
+                # The title is matched with every chunk of its article
+                counts = Counter(terms + title_terms)
+                self.chunks.append((position, text))
+                self._terms.append(counts)
+                self._shingles.append(_shingles(terms))
+                df.update(counts.keys())
+        self._lengths = [sum(counts.values()) for counts in self._terms]
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        n = len(self.chunks)
+        self._idf = {term: math.log(1 + (n - freq + 0.5) / (freq + 0.5)) for term, freq in df.items()}
+
+    def score(self, question: str) -> List[float]:
+        query = set(tokenize(question))
+        scores = []
+        for counts, length in zip(self._terms, self._lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self._avg_length)
+            scores.append(sum(
+                self._idf[term] * counts[term] * (self.k1 + 1) / (counts[term] + norm)
+                for term in query if term in counts
+            ))
+        return scores
+
+    def is_duplicate(self, i: int, chosen: List[int]) -> bool:
+        mine = self._shingles[i]
+        for j in chosen:
+            other = self._shingles[j]
+            union = len(mine | other)
+            if union and len(mine & other) / union >= DUPLICATE_THRESHOLD:
+                return True
+        return False
+
+
+class ContextBuilder:
+    """
+    Builds the LLM context for a question: article chunks ranked by BM25
+    against the question, near-duplicates dropped, packed into a token budget.
+    Ties (and questions matching nothing) keep the snapshot's recency order.
+    The index of the last snapshot is reused while its key is unchanged.
+    """
+
+    def __init__(self, token_budget: int = CONTEXT_TOKEN_BUDGET, chunk_tokens: int = CONTEXT_CHUNK_TOKENS):
+        self.token_budget = token_budget
+        self.chunk_tokens = chunk_tokens
+        self._cached: Optional[Tuple[str, ChunkIndex]] = None
+        self._lock = threading.Lock()
+
+    def _index(self, articles: Sequence[Dict[str, Any]], key: Optional[str]) -> ChunkIndex:
+        with self._lock:
+            if key is not None and self._cached is not None and self._cached[0] == key:
+                return self._cached[1]
+        index = ChunkIndex(articles, self.chunk_tokens)
+        if key is not None:
+            with self._lock:
+                self._cached = (key, index)
+        return index
+
+    def build(self, question: str, articles: Sequence[Dict[str, Any]],
+              key: Optional[str] = None) -> Tuple[str, List[Dict[str, Any]]]:
+        """Context text and the articles it draws from, most relevant first."""
+        index = self._index(articles, key)
+        scores = index.score(question)
+        order = sorted(range(len(index.chunks)), key=lambda i: (-scores[i], i))
+
+        chosen: List[int] = []
+        used = 0
+        per_article: Dict[int, List[int]] = {}
+        for i in order:
+            position, text = index.chunks[i]
+            # A new article also pays for its title line
+            cost = estimate_tokens(text)
+            if position not in per_article:
+                cost += estimate_tokens("Title: " + index.articles[position].get("title", ""))
+            if used + cost > self.token_budget or index.is_duplicate(i, chosen):
+                continue
+            chosen.append(i)
+            per_article.setdefault(position, []).append(i)
+            used += cost
+
+        sections = []
+        for position, chunk_ids in per_article.items():
+            # Chunks of one article read in their original order
+            content = " ... ".join(index.chunks[i][1] for i in sorted(chunk_ids))
+            sections.append(f"Title: {index.articles[position]['title']}\nContent: {content}")
+        return "\n\n".join(sections), [index.articles[position] for position in per_article]
+
+
+context_builder = ContextBuilder()
@@ -1,28 +1,205 @@
 import json
+import re
 import sqlite3
 import os
+from typing import Any, Dict, Iterator, List, Sequence, TextIO
 
 DATA_PATH = "data"
 DB_PATH = "database/news_sense.db"
+FILES = ["mutual_funds.json", "stocks.json", "holdings.json"]
 
-def load_json_to_db():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+# Rows per executemany call; also the sample used to infer column types
+DATA_LOAD_BATCH_SIZE = int(os.getenv("DATA_LOAD_BATCH_SIZE", "5000"))
+# Files larger than this are stream-parsed instead of loaded whole
+DATA_LOAD_STREAM_BYTES = int(os.getenv("DATA_LOAD_STREAM_BYTES", str(64 * 1024 * 1024)))
+# Characters read from the JSON file at a time when streaming
+READ_CHUNK_SIZE = 1 << 16
+# Columns that get an index whenever a table has them
+INDEXED_COLUMNS = ("symbol", "fund_name", "fund", "sector")
 
-    files = ["mutual_funds.json", "stocks.json", "holdings.json"]
-    for file in files:
-        path = os.path.join(DATA_PATH, file)
-        with open(path, "r") as f:
-            data = json.load(f)
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_json_array(f: TextIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yield the items of a top-level JSON array one at a time, reading the file
+    in chunks so only the current item is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf, pos = buf[pos:] + chunk, 0
+        return not eof
+
+    def skip_space() -> None:
+        nonlocal pos
+        pos = _WHITESPACE.match(buf, pos).end()
+        while pos == len(buf):
+            if not fill():
+                raise ValueError("Unexpected end of JSON array")
+            pos = _WHITESPACE.match(buf, pos).end()
+
+    skip_space()
+    if buf[pos] != "[":
+        raise ValueError("Expected a JSON array")
+    pos += 1
+    skip_space()
+    if buf[pos] == "]":
+        return
+    while True:
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # The item runs past the buffer; read more and retry
+            if fill():
+                continue
+            raise
+        following = _WHITESPACE.match(buf, end).end()
+        if following == len(buf) or buf[following] not in ",]":
+            # A number may continue in the next chunk
+            if not eof and fill():
+                continue
+            raise ValueError("Expected ',' or ']' in JSON array")
+        yield item
+        pos = following + 1
+        if buf[following] == "]":
+            return
+        skip_space()
+
+
+def read_json_rows(f: TextIO, size: int) -> Iterator[Any]:
+    """Items of the JSON array in `f`, parsed whole when small and streamed when large."""
+    if size > DATA_LOAD_STREAM_BYTES:
+        return iter_json_array(f)
+    data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array")
+    return iter(data)
+
+
+def _value_type(value: Any) -> str:
+    if isinstance(value, (bool, int)):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    return "TEXT"
+
+
+def infer_column_types(rows: Sequence[Dict[str, Any]]) -> Dict[str, str]:
+    """SQLite type per column: INTEGER or REAL when every non-null value is numeric, else TEXT."""
+    types: Dict[str, str] = {}
+    for row in rows:
+        for column, value in row.items():
+            if value is None:
+                types.setdefault(column, None)
+                continue
+            seen, current = types.get(column), _value_type(value)
+            if seen is None or seen == current:
+                types[column] = current
+            elif {seen, current} == {"INTEGER", "REAL"}:
+                types[column] = "REAL"
+            else:
+                types[column] = "TEXT"
+    return {column: kind or "TEXT" for column, kind in types.items()}
+
+
+def _sql_value(value: Any) -> Any:
+    # Nested objects and lists are stored as JSON text
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def connect(db_path: str = DB_PATH) -> sqlite3.Connection:
+    if os.path.dirname(db_path):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    # Transactions are managed explicitly so a whole load commits at once
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def load_json_file(conn: sqlite3.Connection, path: str, table: str,
+                   batch_size: int = DATA_LOAD_BATCH_SIZE) -> int:
+    """
+    Load a JSON array of objects into `table`. Rows are streamed into a
+    staging table in batches inside one transaction, which then replaces the
+    live table; readers see the old table until the commit. Column types are
+    inferred from the first batch and keys first seen after it are ignored.
+    Returns the number of rows loaded.
+    """
+    staging = f"{table}__staging"
+    with open(path, "r") as f:
+        rows = read_json_rows(f, os.path.getsize(path))
+        batch: List[Dict[str, Any]] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                break
+        if not batch:
+            return 0
+
+        types = infer_column_types(batch)
+        columns = list(types)
+        insert = (f"INSERT INTO {_quote(staging)} VALUES "
+                  f"({', '.join('?' for _ in columns)})")
+        count = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"DROP TABLE IF EXISTS {_quote(staging)}")
+            conn.execute(f"CREATE TABLE {_quote(staging)} "
+                         f"({', '.join(f'{_quote(c)} {types[c]}' for c in columns)})")
+            while batch:
+                conn.execute("SAVEPOINT batch")
+                try:
+                    conn.executemany(insert, [tuple(map(row.get, columns)) for row in batch])
+                except (sqlite3.InterfaceError, sqlite3.ProgrammingError):
+                    # The batch holds nested values (InterfaceError before Python 3.11);
+                    # undo its partial insert, convert and retry
+                    conn.execute("ROLLBACK TO batch")
+                    conn.executemany(insert, [tuple(_sql_value(row.get(c)) for c in columns) for row in batch])
+                conn.execute("RELEASE batch")
+                count += len(batch)
+                batch = [row for _, row in zip(range(batch_size), rows)]
+
+            conn.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+            conn.execute(f"ALTER TABLE {_quote(staging)} RENAME TO {_quote(table)}")
+            for column in INDEXED_COLUMNS:
+                if column in types:
+                    conn.execute(f"CREATE INDEX {_quote(f'idx_{table}_{column}')} "
+                                 f"ON {_quote(table)} ({_quote(column)})")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    return count
+
+
+def load_json_to_db(data_path: str = DATA_PATH, db_path: str = DB_PATH,
+                    files: Sequence[str] = FILES, batch_size: int = DATA_LOAD_BATCH_SIZE) -> Dict[str, int]:
+    """Load each JSON file into the table named after it; returns rows loaded per table."""
+    conn = connect(db_path)
+    loaded = {}
+    try:
+        for file in files:
+            path = os.path.join(data_path, file)
             table = os.path.splitext(file)[0]
-            if isinstance(data, list) and data:
-                columns = data[0].keys()
-                cursor.execute(f"DROP TABLE IF EXISTS {table}")
-                cursor.execute(f"CREATE TABLE {table} ({', '.join([col + ' TEXT' for col in columns])})")
-                for row in data:
-                    cursor.execute(
-                        f"INSERT INTO {table} VALUES ({','.join(['?' for _ in columns])})",
-                        tuple(row.values())
-                    )
-    conn.commit()
-    conn.close()
\ No newline at end of file
+            if not os.path.exists(path):
+                print(f"Skipping {path}: file not found")
+                continue
+            try:
+                loaded[table] = load_json_file(conn, path, table, batch_size)
+            except Exception as e:
+                print(f"Error loading {path}: {str(e)}")
+    finally:
+        conn.close()
+    return loaded
@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+DB_PATH = "database/news_sense.db"
+# Bytes of the database file read through mmap, and page cache per connection in KiB
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", str(64 * 1024)))
+
+
+def _is_missing(error: sqlite3.OperationalError) -> bool:
+    """True when the database file or table has not been created yet."""
+    message = str(error)
+    return message.startswith("no such table") or message == "unable to open database file"
+
+
+class ConnectionPool:
+    """
+    One read-only connection per thread, opened on first use and reused for
+    the thread's lifetime. Statements are cached per connection by sqlite3,
+    so the fixed queries below are prepared once per thread.
+    """
+
+    def __init__(self, path: str = DB_PATH, mmap_size: int = DB_MMAP_SIZE, cache_size_kb: int = DB_CACHE_SIZE_KB):
+        self.path = path
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{os.path.abspath(self.path)}?mode=ro", uri=True,
+                                   check_same_thread=False, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA query_only=1")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            # Negative values are in KiB rather than pages
+            conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close every thread's connection; threads reconnect on next use."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+class MarketDB:
+    """
+    Read helpers over the tables written by data_loader (`stocks`,
+    `mutual_funds`, `holdings`) and the `articles` table of ArticleStore.
+    Lookups go through the indexes on symbol, fund_name and sector. Missing
+    tables (e.g. before the first load) read as empty.
+    """
+
+    def __init__(self, pool: ConnectionPool = None):
+        self.pool = pool or ConnectionPool()
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        try:
+            rows = self.pool.connection().execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            if not _is_missing(e):
+                print(f"Error querying database: {str(e)}")
+            return []
+        return [dict(row) for row in rows]
+
+    def query_one(self, sql: str, params: Sequence[Any] = ()) -> Optional[Dict[str, Any]]:
+        rows = self.query(sql, params)
+        return rows[0] if rows else None
+
+    def get_stock(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.query_one("SELECT * FROM stocks WHERE symbol = ? LIMIT 1", (symbol,))
+
+    def stocks_in_sector(self, sector: str, limit: int = 50) -> List[Dict[str, Any]]:
+        return self.query("SELECT * FROM stocks WHERE sector = ? LIMIT ?", (sector, limit))
+
+    def get_fund(self, fund_name: str) -> Optional[Dict[str, Any]]:
+        return self.query_one("SELECT * FROM mutual_funds WHERE fund_name = ? LIMIT 1", (fund_name,))
+
+    def fund_holdings(self, fund_name: str) -> List[Dict[str, Any]]:
+        return self.query("SELECT * FROM holdings WHERE fund_name = ?", (fund_name,))
+
+    def funds_holding(self, symbol: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Funds holding a symbol, best returns first, shaped like StockDataManager's."""
+        return self.query(
+            """
+            SELECT h.fund_name, h.allocation, f.nav, f.returns FROM holdings h
+            JOIN mutual_funds f ON f.fund_name = h.fund_name
+            WHERE h.symbol = ?
+            ORDER BY f.returns DESC LIMIT ?
+            """,
+            (symbol, limit)
+        )
+
+    def latest_articles(self, limit: int = 50, source: str = None) -> List[Dict[str, Any]]:
+        if source:
+            return self.query(
+                "SELECT title, content, url, source, timestamp FROM articles "
+                "WHERE source = ? ORDER BY published_at DESC LIMIT ?",
+                (source, limit)
+            )
+        return self.query(
+            "SELECT title, content, url, source, timestamp FROM articles ORDER BY published_at DESC LIMIT ?",
+            (limit,)
+        )
+
+
+market_db = MarketDB()
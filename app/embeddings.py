@@ -0,0 +1,189 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.metrics import timed
+from app.nlp_cache import content_hash
+
+load_dotenv()
+
+# "openai" calls the embeddings API; "hash" is a deterministic offline model
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "1536"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "data/embedding_cache.db")
+# Inputs per API request
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+
+
+class OpenAIEmbeddingBackend:
+    """Embeddings from the OpenAI API, many inputs per request."""
+
+    def __init__(self, model: str = EMBEDDING_MODEL, dimension: int = EMBEDDING_DIMENSION, client=None):
+        self.model = model
+        self.dimension = dimension
+        self._client = client
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        response = self._client.embeddings.create(model=self.model, input=texts)
+        data = sorted(response.data, key=lambda item: item.index)
+        return np.array([item.embedding for item in data], dtype=np.float32)
+
+
+class HashEmbeddingBackend:
+    """
+    Deterministic bag-of-words embeddings: word unigrams and bigrams are hashed
+    into signed buckets and the result is L2-normalised. Texts sharing words
+    land close together, which is enough for tests and air-gapped runs.
+    """
+
+    def __init__(self, dimension: int = EMBEDDING_DIMENSION):
+        self.dimension = dimension
+        self.model = f"hash-{dimension}"
+
+    def _vector(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        tokens = re.findall(r"\w+", text.lower())
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[h % self.dimension] += -1.0 if h >> 63 else 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return np.array([self._vector(text) for text in texts], dtype=np.float32).reshape(len(texts), self.dimension)
+
+
+def get_backend(name: str = EMBEDDING_BACKEND):
+    if name == "hash":
+        return HashEmbeddingBackend()
+    if name == "openai":
+        return OpenAIEmbeddingBackend()
+    raise ValueError(f"Unknown embedding backend: {name}")
+
+
+class EmbeddingCache:
+    """Persistent embeddings keyed by model and text hash, stored as float32 blobs."""
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the database on first use. Callers must hold the lock."""
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Cached embeddings for the given text hashes, missing ones omitted."""
+        hashes = list(dict.fromkeys(hashes))
+        found = {}
+        with self._lock:
+            db = self._db()
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i:i + 500]
+                rows = db.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({','.join('?' for _ in chunk)})",
+                    (model, *chunk)
+                ).fetchall()
+                found.update({h: np.frombuffer(vector, dtype=np.float32) for h, vector in rows})
+            self.hits += len(found)
+            self.misses += len(hashes) - len(found)
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                [(model, h, np.asarray(v, dtype=np.float32).tobytes()) for h, v in vectors.items()]
+            )
+            db.commit()
+
+
+class Embedder:
+    """
+    Embeds lists of texts through a backend. Known texts come from the cache,
+    duplicates are embedded once and the rest go to the backend in batches.
+    """
+
+    def __init__(self, backend=None, cache: Optional[EmbeddingCache] = None, batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.backend = backend or get_backend()
+        self.cache = cache
+        self.batch_size = batch_size
+
+    @property
+    def dimension(self) -> int:
+        return self.backend.dimension
+
+    @property
+    def model(self) -> str:
+        return self.backend.model
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """One float32 row per text."""
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        hashes = [content_hash(text) for text in texts]
+        vectors = self.cache.get_many(self.model, hashes) if self.cache is not None else {}
+
+        pending = {}
+        for h, text in zip(hashes, texts):
+            if h not in vectors:
+                pending.setdefault(h, text)
+        if pending:
+            keys = list(pending)
+            computed = {}
+            for i in range(0, len(keys), self.batch_size):
+                chunk = keys[i:i + self.batch_size]
+                with timed("embedding.backend"):
+                    computed.update(zip(chunk, self.backend.embed([pending[h] for h in chunk])))
+            if self.cache is not None:
+                self.cache.put_many(self.model, computed)
+            vectors.update(computed)
+
+        return np.stack([vectors[h] for h in hashes]).astype(np.float32, copy=False)
+
+
+embedding_cache = EmbeddingCache()
+_embedder: Optional[Embedder] = None
+
+
+def get_embedder() -> Embedder:
+    """Shared embedder for the configured backend, created on first use."""
+    global _embedder
+    if _embedder is None:
+        _embedder = Embedder(cache=embedding_cache)
+    return _embedder
+
+
+def create_embeddings(texts: List[str]) -> np.ndarray:
+    return get_embedder().embed(texts)
@@ -0,0 +1,251 @@
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # pragma: no cover - lxml is in requirements.txt
+    etree = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+# Tree builder for code that still needs a BeautifulSoup tree
+SOUP_FEATURES = "lxml" if etree is not None else "html.parser"
+
+_SIMPLE_SELECTOR = re.compile(r"^([a-zA-Z][a-zA-Z0-9]*)?((?:\.[\w-]+)*)$")
+
+
+class SoupExtractor:
+    """
+    Reference implementation on BeautifulSoup, used as the fallback. The
+    other engines return the same results from a C-backed parser.
+    """
+
+    name = "soup"
+
+    def __init__(self, features: str = "html.parser"):
+        self.features = features
+
+    def article_text(self, html: str, content_class: str, skip_empty: bool = False) -> str:
+        return self._text(BeautifulSoup(html, self.features), content_class, skip_empty)
+
+    def article_text_or_meta(self, html: str, content_classes: Sequence[str], skip_empty: bool = False) -> str:
+        soup = BeautifulSoup(html, self.features)
+        return _first_text(soup, content_classes, skip_empty, self._text, self._meta)
+
+    def _text(self, soup, content_class: str, skip_empty: bool) -> str:
+        content_div = soup.find("div", {"class": content_class})
+        if not content_div:
+            return ""
+        return _join([p.text.strip() for p in content_div.find_all("p")], skip_empty)
+
+    def listing(self, html: str, selector: str, title_tag: str = "h2", link_prefix: str = "") -> List[Dict]:
+        soup = BeautifulSoup(html, self.features)
+        links = []
+        for article in soup.select(selector):
+            title_elem = article.find(title_tag)
+            anchor = title_elem.find("a") if title_elem else None
+            if not anchor or not anchor.get("href"):
+                continue
+            links.append(_link(title_elem.text.strip(), link_prefix + anchor["href"]))
+        return links
+
+    def meta_description(self, html: str) -> str:
+        return self._meta(BeautifulSoup(html, self.features))
+
+    def _meta(self, soup) -> str:
+        meta = soup.find("meta", {"name": "description"})
+        return meta.get("content", "") if meta else ""
+
+
+class LxmlExtractor:
+    """libxml2 based engine with XPath expressions compiled once per selector."""
+
+    name = "lxml"
+
+    def __init__(self):
+        self._parser = lxml_html.HTMLParser(encoding="utf-8")
+
+    def _parse(self, html: str):
+        try:
+            return lxml_html.fromstring(html.encode("utf-8"), parser=self._parser)
+        except (etree.ParserError, ValueError):
+            return None
+
+    def article_text(self, html: str, content_class: str, skip_empty: bool = False) -> str:
+        root = self._parse(html)
+        return self._text(root, content_class, skip_empty) if root is not None else ""
+
+    def article_text_or_meta(self, html: str, content_classes: Sequence[str], skip_empty: bool = False) -> str:
+        root = self._parse(html)
+        if root is None:
+            return ""
+        return _first_text(root, content_classes, skip_empty, self._text, self._meta)
+
+    def _text(self, root, content_class: str, skip_empty: bool) -> str:
+        paragraphs = _content_xpath(content_class)(root)
+        return _join([p.text_content().strip() for p in paragraphs], skip_empty)
+
+    def listing(self, html: str, selector: str, title_tag: str = "h2", link_prefix: str = "") -> List[Dict]:
+        root = self._parse(html)
+        if root is None:
+            return []
+        links = []
+        for article in _css_xpath(selector)(root):
+            title_elem = next(article.iterdescendants(title_tag), None)
+            anchor = next(title_elem.iterdescendants("a"), None) if title_elem is not None else None
+            if anchor is None or not anchor.get("href"):
+                continue
+            links.append(_link(title_elem.text_content().strip(), link_prefix + anchor.get("href")))
+        return links
+
+    def meta_description(self, html: str) -> str:
+        root = self._parse(html)
+        return self._meta(root) if root is not None else ""
+
+    def _meta(self, root) -> str:
+        found = root.xpath("//meta[@name='description']/@content")
+        return str(found[0]) if found else ""
+
+
+class SelectolaxExtractor:
+    """Lexbor based engine, the fastest option when selectolax is installed."""
+
+    name = "selectolax"
+
+    def article_text(self, html: str, content_class: str, skip_empty: bool = False) -> str:
+        return self._text(SelectolaxParser(html), content_class, skip_empty)
+
+    def article_text_or_meta(self, html: str, content_classes: Sequence[str], skip_empty: bool = False) -> str:
+        return _first_text(SelectolaxParser(html), content_classes, skip_empty, self._text, self._meta)
+
+    def _text(self, tree, content_class: str, skip_empty: bool) -> str:
+        content_div = tree.css_first(f"div.{content_class}")
+        if content_div is None:
+            return ""
+        return _join([p.text().strip() for p in content_div.css("p")], skip_empty)
+
+    def listing(self, html: str, selector: str, title_tag: str = "h2", link_prefix: str = "") -> List[Dict]:
+        links = []
+        for article in SelectolaxParser(html).css(selector):
+            title_elem = article.css_first(title_tag)
+            anchor = title_elem.css_first("a") if title_elem is not None else None
+            if anchor is None or not anchor.attributes.get("href"):
+                continue
+            links.append(_link(title_elem.text().strip(), link_prefix + anchor.attributes["href"]))
+        return links
+
+    def meta_description(self, html: str) -> str:
+        return self._meta(SelectolaxParser(html))
+
+    def _meta(self, tree) -> str:
+        meta = tree.css_first("meta[name='description']")
+        return (meta.attributes.get("content") or "") if meta is not None else ""
+
+
+def _first_text(tree, content_classes: Sequence[str], skip_empty: bool, text, meta) -> str:
+    """Text of the first content class that has any, else the meta description, from one parsed tree."""
+    for content_class in content_classes:
+        found = text(tree, content_class, skip_empty)
+        if found:
+            return found
+    return meta(tree)
+
+
+def _join(paragraphs: List[str], skip_empty: bool) -> str:
+    return " ".join([p for p in paragraphs if p] if skip_empty else paragraphs)
+
+
+def _link(title: str, link: str) -> Dict:
+    return {"title": title, "link": link, "timestamp": None, "summary": ""}
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+@lru_cache(maxsize=None)
+def _content_xpath(content_class: str):
+    """<p> descendants of the first div carrying `content_class`."""
+    return etree.XPath(f"(//div[{_has_class(content_class)}])[1]//p")
+
+
+@lru_cache(maxsize=None)
+def _css_xpath(selector: str):
+    """
+    Compile the simple CSS selectors used in NEWS_SOURCES ("li.clearfix",
+    ".article-list li": tags, classes, descendant combinators and
+    comma-separated groups) to XPath.
+    """
+    paths = []
+    for group in selector.split(","):
+        steps = []
+        for part in group.split():
+            match = _SIMPLE_SELECTOR.match(part)
+            if not match:
+                raise ValueError(f"Unsupported selector for lxml engine: {selector}")
+            tag = match.group(1) or "*"
+            classes = [c for c in match.group(2).split(".") if c]
+            predicate = "".join(f"[{_has_class(c)}]" for c in classes)
+            steps.append(f"{tag}{predicate}")
+        paths.append("//" + "//".join(steps))
+    return etree.XPath(" | ".join(paths))
+
+
+class _FallbackExtractor:
+    """Runs the fast engine and falls back to BeautifulSoup if it fails."""
+
+    def __init__(self, fast, fallback: SoupExtractor):
+        self.fast = fast
+        self.fallback = fallback
+        self.name = fast.name
+
+    def article_text(self, html: str, content_class: str, skip_empty: bool = False) -> str:
+        try:
+            return self.fast.article_text(html, content_class, skip_empty)
+        except Exception:
+            return self.fallback.article_text(html, content_class, skip_empty)
+
+    def article_text_or_meta(self, html: str, content_classes: Sequence[str], skip_empty: bool = False) -> str:
+        try:
+            return self.fast.article_text_or_meta(html, content_classes, skip_empty)
+        except Exception:
+            return self.fallback.article_text_or_meta(html, content_classes, skip_empty)
+
+    def listing(self, html: str, selector: str, title_tag: str = "h2", link_prefix: str = "") -> List[Dict]:
+        try:
+            return self.fast.listing(html, selector, title_tag, link_prefix)
+        except Exception:
+            return self.fallback.listing(html, selector, title_tag, link_prefix)
+
+    def meta_description(self, html: str) -> str:
+        try:
+            return self.fast.meta_description(html)
+        except Exception:
+            return self.fallback.meta_description(html)
+
+
+def get_extractor(name: Optional[str] = None):
+    """
+    Return the engine named by `name` or HTML_EXTRACTOR ("selectolax", "lxml"
+    or "soup"), defaulting to the fastest one installed.
+    """
+    name = name or os.getenv("HTML_EXTRACTOR")
+    soup = SoupExtractor()
+    if name == "soup":
+        return soup
+    if name in (None, "selectolax") and SelectolaxParser is not None:
+        return _FallbackExtractor(SelectolaxExtractor(), soup)
+    if name in (None, "selectolax", "lxml") and etree is not None:
+        return _FallbackExtractor(LxmlExtractor(), soup)
+    return soup
+
+
+extractor = get_extractor()
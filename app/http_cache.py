@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional
+
+CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "data/http_cache.db")
+CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+class HttpCache:
+    """
+    On-disk cache for fetched pages. For every URL it keeps the ETag /
+    Last-Modified validators, a hash of the last body and the *parsed* result,
+    so unchanged pages (304, or 200 with an identical body) skip parsing.
+    Entries are keyed by URL and `parser`, an identifier of the parse
+    function; a result cached under another parser is a miss and gets no
+    validators, so the page is fetched and parsed again. Size is bounded by
+    `max_bytes` of stored results, evicting least recently used entries first.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the cache database on first use. Callers must hold the lock."""
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Shared by the scraper threads and the event loop, guarded by the lock
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(http_cache)")]
+            if columns and "parser" not in columns:
+                # Entries from before results were keyed by parser can't be trusted
+                conn.execute("DROP TABLE http_cache")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT NOT NULL,
+                    parser TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body_hash TEXT NOT NULL,
+                    parsed TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (url, parser)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_http_cache_accessed ON http_cache (accessed_at)")
+            conn.commit()
+            self._size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def request_headers(self, url: str, parser: str = "") -> Dict[str, str]:
+        """Conditional request headers for a URL we have a result of `parser` for."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT etag, last_modified FROM http_cache WHERE url = ? AND parser = ?", (url, parser)
+            ).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers["If-None-Match"] = row[0]
+        if row and row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def resolve(self, url: str, status: int, headers: Mapping[str, str], body: bytes,
+                parse: Callable[[], Any], parser: str = "") -> Any:
+        """
+        Return the parsed result for a response, calling `parse` only if the
+        page changed since it was cached by the same `parser`. `parse` must
+        return JSON-serialisable data.
+        """
+        body_hash = hashlib.sha256(body).hexdigest() if status != 304 else None
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT body_hash, parsed FROM http_cache WHERE url = ? AND parser = ?", (url, parser)
+            ).fetchone()
+            if row and (status == 304 or row[0] == body_hash):
+                self.hits += 1
+                db.execute(
+                    "UPDATE http_cache SET accessed_at = ?, etag = COALESCE(?, etag), "
+                    "last_modified = COALESCE(?, last_modified) WHERE url = ? AND parser = ?",
+                    (time.time(), headers.get("ETag"), headers.get("Last-Modified"), url, parser)
+                )
+                db.commit()
+                return json.loads(row[1])
+
+        if status == 304:
+            # Validators without a cached entry (e.g. evicted meanwhile)
+            raise ValueError(f"304 Not Modified for uncached URL {url}")
+
+        self.misses += 1
+        parsed = parse()
+        self._store(url, parser, headers, body_hash, parsed)
+        return parsed
+
+    def _store(self, url: str, parser: str, headers: Mapping[str, str], body_hash: str, parsed: Any) -> None:
+        encoded = json.dumps(parsed)
+        with self._lock:
+            db = self._db()
+            # Results of this or an older parser are replaced
+            old = db.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache WHERE url = ?", (url,)).fetchone()
+            db.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+            db.execute(
+                "INSERT INTO http_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, parser, headers.get("ETag"), headers.get("Last-Modified"), body_hash,
+                 encoded, len(encoded), time.time())
+            )
+            self._size += len(encoded) - old[0]
+            if self._size > self.max_bytes:
+                self._evict(db)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        """Drop least recently used entries until the cache is 10% under its bound."""
+        target = self.max_bytes * 0.9
+        rows = db.execute("SELECT url, parser, size FROM http_cache ORDER BY accessed_at").fetchall()
+        expired = []
+        for url, parser, size in rows:
+            if self._size <= target:
+                break
+            expired.append((url, parser))
+            self._size -= size
+        db.executemany("DELETE FROM http_cache WHERE url = ? AND parser = ?", expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM http_cache")
+            db.commit()
+            self._size = 0
+
+
+http_cache = HttpCache()
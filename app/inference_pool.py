@@ -0,0 +1,129 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from app import nlp_processor
+
+# Number of forked inference workers; 0 runs the models in-process
+NLP_WORKERS = int(os.getenv("NLP_WORKERS", "0"))
+# Chunks that may be queued or running at once before callers block
+NLP_MAX_PENDING = int(os.getenv("NLP_MAX_PENDING", str(max(NLP_WORKERS, 1) * 2)))
+
+
+def _init_worker() -> None:
+    # One intra-op thread per worker, parallelism comes from the processes
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+
+def _worker_run(chunk: List[Dict[str, Any]], batch_size: int) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+    """Runs in a worker; the models were inherited from the parent at fork time."""
+    before = nlp_processor.get_stage_timings()
+    results = nlp_processor.run_models(chunk, batch_size)
+    after = nlp_processor.get_stage_timings()
+    timings = {
+        stage: stats["seconds"] - before.get(stage, {}).get("seconds", 0.0)
+        for stage, stats in after.items()
+    }
+    return results, timings
+
+
+class InferencePool:
+    """
+    Process pool for the NLP models. The models are loaded once in the parent
+    and shared copy-on-write with `workers` forked processes, which receive
+    chunks of articles. At most `max_pending` chunks are in flight, further
+    callers block until a slot frees up. Without fork support, with
+    workers=0, or after a worker crash, batches run in-process instead.
+    """
+
+    def __init__(self, workers: int = NLP_WORKERS, max_pending: int = NLP_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._disabled = workers <= 0 or "fork" not in multiprocessing.get_all_start_methods()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return not self._disabled
+
+    @property
+    def pending(self) -> int:
+        """Chunks currently queued or running in the workers."""
+        return self._pending
+
+    def _ensure_started(self) -> Optional[ProcessPoolExecutor]:
+        with self._lock:
+            if self._executor is None and not self._disabled:
+                try:
+                    # Load before forking so every worker shares the same model pages
+                    nlp_processor.load_models()
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("fork"),
+                        initializer=_init_worker,
+                    )
+                except Exception as e:
+                    print(f"Inference pool unavailable, running in-process: {str(e)}")
+                    self._disabled = True
+            return self._executor
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def run(self, batch: List[Dict[str, Any]], batch_size: int = nlp_processor.NLP_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Same contract as nlp_processor.run_models, spread over the workers."""
+        executor = self._ensure_started()
+        if executor is None:
+            return nlp_processor.run_models(batch, batch_size)
+
+        futures = []
+        try:
+            for i in range(0, len(batch), batch_size):
+                # Only the content crosses the process boundary
+                chunk = [{"content": article["content"]} for article in batch[i:i + batch_size]]
+                self._slots.acquire()
+                with self._lock:
+                    self._pending += 1
+                try:
+                    future = executor.submit(_worker_run, chunk, batch_size)
+                except Exception:
+                    self._release()
+                    raise
+                future.add_done_callback(self._release)
+                futures.append(future)
+
+            results = []
+            for future in futures:
+                chunk_results, timings = future.result()
+                for stage, seconds in timings.items():
+                    nlp_processor.record_stage_timing(stage, seconds, len(chunk_results))
+                results.extend(chunk_results)
+            return results
+        except (BrokenProcessPool, RuntimeError) as e:
+            print(f"Inference pool failed, falling back to in-process execution: {str(e)}")
+            for future in futures:
+                future.cancel()
+            self.shutdown()
+            self._disabled = True
+            return nlp_processor.run_models(batch, batch_size)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+inference_pool = InferencePool()
@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import inspect
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.article_store import ArticleStore, _published_at, article_store
+from app.async_news_scraper import async_news_scraper
+from app.nlp_cache import content_hash
+from app.nlp_processor import process_articles
+from app.sentiment_aggregator import SentimentAggregator, sentiment_aggregator
+from app.stock_data_manager import StockDataManager, stock_manager
+
+# Seconds between two background refreshes of the news sources
+REFRESH_INTERVAL = float(os.getenv("NEWS_REFRESH_INTERVAL", "300"))
+# Number of most recent stored articles exposed in a snapshot
+SNAPSHOT_SIZE = int(os.getenv("NEWS_SNAPSHOT_SIZE", "50"))
+# New articles kept for the next refresh while `on_new_articles` keeps failing
+MAX_UNDELIVERED = 1000
+
+
+class NewsSnapshot:
+    """
+    Immutable view of the latest articles after one successful refresh.
+    `new_articles` holds only those that were new or changed in that refresh.
+    `fingerprint` identifies the article content, so it is stable across
+    refreshes that change nothing and across restarts, unlike `version`.
+    """
+
+    def __init__(self, articles: List[Dict[str, Any]], version: int, fetched_at: float = None,
+                 new_articles: List[Dict[str, Any]] = None):
+        self.articles = tuple(articles)
+        self.new_articles = tuple(new_articles if new_articles is not None else articles)
+        self.version = version
+        self.fetched_at = fetched_at or time.time()
+        self.fingerprint = _fingerprint(self.articles)
+
+    def age_seconds(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class IngestionScheduler:
+    """
+    Refreshes the news sources on a fixed interval in the background and keeps
+    the last good snapshot in memory, so request handlers never scrape inline.
+    `on_new_articles` is called with each published snapshot's new articles,
+    off the event loop; articles it failed on are passed again next time.
+    """
+
+    def __init__(self, fetch: Callable[[], Any] = async_news_scraper.get_all_news,
+                 interval: float = REFRESH_INTERVAL, store: Optional[ArticleStore] = article_store,
+                 on_new_articles: Optional[Callable[[List[Dict[str, Any]]], Any]] = None):
+        self.fetch = fetch
+        self.interval = interval
+        self.store = store
+        self.on_new_articles = on_new_articles
+        self._undelivered: List[Dict[str, Any]] = []
+        self.last_error: Optional[str] = None
+        self.last_attempt: Optional[float] = None
+        self._snapshot: Optional[NewsSnapshot] = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def snapshot(self) -> Optional[NewsSnapshot]:
+        """Return the latest good snapshot, or None before the first refresh."""
+        return self._snapshot
+
+    def refresh(self) -> Optional[NewsSnapshot]:
+        """
+        Run one refresh synchronously. On failure the previous snapshot is kept
+        and the error is recorded in `last_error`.
+        """
+        with self._lock:
+            self.last_attempt = time.time()
+            try:
+                return self._complete(self.fetch())
+            except Exception as e:
+                return self._fail(e)
+
+    async def refresh_async(self) -> Optional[NewsSnapshot]:
+        """
+        Same as `refresh` for coroutine fetchers, run on the event loop. The
+        article store writes and reads go to the default executor.
+        """
+        self.last_attempt = time.time()
+        try:
+            articles = await self.fetch()
+            return await asyncio.get_running_loop().run_in_executor(None, self._complete, articles)
+        except Exception as e:
+            return self._fail(e)
+
+    def _complete(self, articles: List[Dict[str, Any]]) -> Optional[NewsSnapshot]:
+        if _is_fallback(articles):
+            if self._snapshot is None and articles:
+                # Publish the placeholder content only if nothing better exists yet
+                self._publish(articles)
+            return self._fail(RuntimeError("no articles returned by news sources"))
+        self.last_error = None
+        if self.store is None:
+            snapshot = self._publish(articles)
+        else:
+            new_articles = self.store.upsert_many(articles)
+            snapshot = self._publish(self.store.latest(SNAPSHOT_SIZE), new_articles)
+        self._deliver(list(snapshot.new_articles))
+        return snapshot
+
+    def _deliver(self, new_articles: List[Dict[str, Any]]) -> None:
+        if self.on_new_articles is None:
+            return
+        batch = self._undelivered + new_articles
+        if not batch:
+            return
+        try:
+            self.on_new_articles(batch)
+            self._undelivered = []
+        except Exception as e:
+            # The store won't report these as new again, so keep them for the next refresh.
+            # The snapshot is already published, a failing consumer doesn't make it stale.
+            self._undelivered = batch[-MAX_UNDELIVERED:]
+            print(f"Error processing new articles: {str(e)}")
+
+    def _fail(self, error: Exception) -> Optional[NewsSnapshot]:
+        self.last_error = str(error)
+        print(f"News refresh failed, serving last snapshot: {str(error)}")
+        return self._snapshot
+
+    def _publish(self, articles: List[Dict[str, Any]],
+                 new_articles: List[Dict[str, Any]] = None) -> NewsSnapshot:
+        self._version += 1
+        self._snapshot = NewsSnapshot(articles, self._version, new_articles=new_articles)
+        return self._snapshot
+
+    def status(self) -> Dict[str, Any]:
+        """Freshness information reported alongside API responses."""
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else 0,
+            "fingerprint": snapshot.fingerprint if snapshot else None,
+            "age_seconds": round(snapshot.age_seconds(), 3) if snapshot else None,
+            "stale": self.last_error is not None or snapshot is None,
+            "last_error": self.last_error,
+        }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if inspect.iscoroutinefunction(self.fetch):
+                await self.refresh_async()
+            else:
+                # Blocking scrapers are kept off the event loop
+                await loop.run_in_executor(None, self.refresh)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _fingerprint(articles) -> str:
+    digest = hashlib.sha256()
+    for article in articles:
+        for field in ("url", "title", "content"):
+            digest.update(str(article.get(field, "")).encode("utf-8"))
+            digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def _is_fallback(articles: Optional[List[Dict[str, Any]]]) -> bool:
+    """True when the scraper returned nothing or only its placeholder article."""
+    return not articles or all(a.get("source") == "System" for a in articles)
+
+
+def record_sentiment(articles: List[Dict[str, Any]], aggregator: SentimentAggregator = sentiment_aggregator,
+                     manager: StockDataManager = stock_manager) -> int:
+    """
+    Run the NLP models over newly ingested articles and add each one's sentiment
+    to every fund, stock and sector it matches. Returns the number of updates.
+    """
+    articles = [article for article in articles if article.get("content")]
+    if not articles:
+        return 0
+    processed_batch = process_articles(articles)
+    # One matcher over the whole fund universe, built once per market data snapshot
+    market = manager.snapshot
+    matches = market.fund_matcher.match_batch([processed["entities"] for processed in processed_batch])
+    now = time.time()
+    recorded = 0
+    for article, processed, funds in zip(articles, processed_batch, matches):
+        stocks, sectors = market.match_entities(processed["entities"])
+        recorded += aggregator.record_article(content_hash(article["content"]), processed["sentiment"],
+                                              funds=funds, stocks=stocks, sectors=sectors,
+                                              timestamp=_published_at(article.get("timestamp"), now))
+    return recorded
+
+
+news_scheduler = IngestionScheduler(on_new_articles=record_sentiment)
@@ -1,11 +1,38 @@
-from fastapi import FastAPI, Query
+import asyncio
+import json
+from contextlib import asynccontextmanager
+import time
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.news_crawler import scrape_moneycontrol
-from app.openai_client import ask_openai
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from app.async_news_scraper import async_news_scraper
+from app.answer_cache import answer_cache
+from app.context_builder import context_builder
+from app.embeddings import embedding_cache
+from app.http_cache import http_cache
+from app.inference_pool import inference_pool
+from app.ingestion import news_scheduler
+from app.metrics import CallbackMetric, http_seconds, registry, timed
+from app.nlp_cache import nlp_cache
+from app.openai_client import FALLBACK_CONTENT, ask_openai_async, fallback_analysis, llm_client, to_analysis
+from app.sentiment_aggregator import KINDS, sentiment_aggregator
+from app.stock_data_manager import stock_manager
 from datetime import datetime
 import pytz
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep the news snapshot fresh in the background for the app's lifetime
+    news_scheduler.start()
+    # Pick up rewritten market data files without a restart
+    stock_manager.start_watching()
+    yield
+    stock_manager.stop_watching()
+    await news_scheduler.stop()
+    await async_news_scraper.aclose()
+    await llm_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -16,35 +43,91 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template so path parameters don't create new series
+    route = request.scope.get("route")
+    http_seconds.observe(time.perf_counter() - start, method=request.method,
+                         route=route.path if route else "unmatched", status=response.status_code)
+    return response
+
+# Read from the components' own counters when /metrics is scraped
+CACHES = {"http": http_cache, "nlp": nlp_cache, "embedding": embedding_cache, "answer": answer_cache}
+registry.register(CallbackMetric(
+    "newssense_cache_hits_total", "Cache hits by cache.",
+    lambda: {(name, ): cache.hits for name, cache in CACHES.items()}, ["cache"], kind="counter"))
+registry.register(CallbackMetric(
+    "newssense_cache_misses_total", "Cache misses by cache.",
+    lambda: {(name, ): cache.misses for name, cache in CACHES.items()}, ["cache"], kind="counter"))
+registry.register(CallbackMetric(
+    "newssense_queue_depth", "Work queued or running by queue.",
+    lambda: {("nlp_workers", ): inference_pool.pending, ("llm_requests", ): llm_client.active}, ["queue"]))
+registry.register(CallbackMetric(
+    "newssense_llm_calls_total", "LLM requests by outcome: upstream attempts or coalesced onto another request.",
+    lambda: {("upstream", ): llm_client.calls, ("coalesced", ): llm_client.coalesced}, ["kind"], kind="counter"))
+registry.register(CallbackMetric(
+    "newssense_news_snapshot_age_seconds", "Age of the news snapshot served by /analyze.",
+    lambda: {(): news_scheduler.snapshot().age_seconds()} if news_scheduler.snapshot() else {}))
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Market Analysis API"}
 
+@timed("context")
+def build_context(question, snapshot):
+    """LLM context for the question and the articles it was drawn from"""
+    news_articles = list(snapshot.articles) if snapshot else []
+    if news_articles:
+        # Chunks ranked against the question and packed into the token budget
+        context, used = context_builder.build(question, news_articles, key=snapshot.fingerprint)
+        if context:
+            return context, used
+    # Fallback context if no articles are available
+    return f"""
+Title: Market Analysis Update
+Content: Analyzing current market conditions and trends. The analysis will be based on general market indicators and recent trends.
+Timestamp: {datetime.now(pytz.UTC).strftime("%Y-%m-%d %H:%M:%S")}
+Source: System Generated
+""", []
+
+def build_sources(news_articles):
+    return [
+        {
+            "title": article["title"],
+            "url": article["url"],
+            "timestamp": article["timestamp"]
+        }
+        for article in news_articles
+    ]
+
 @app.get("/analyze")
 async def analyze_market(
     question: str = Query(..., description="Your question about the market (e.g., 'Why is Nifty down today?')")
 ):
     try:
-        # Fetch latest news
-        news_articles = scrape_moneycontrol()
+        # Read the latest news snapshot prepared by the background scheduler
+        snapshot = news_scheduler.snapshot()
         
-        # Prepare context from news articles
-        if news_articles:
-            context = "\n\n".join([
-                f"Title: {article['title']}\nContent: {article['content'][:500]}..."  # Truncate long articles
-                for article in news_articles[:5]  # Use top 5 articles
-            ])
-        else:
-            # Fallback context if no articles are available
-            context = f"""
-Title: Market Analysis Update
-Content: Analyzing current market conditions and trends. The analysis will be based on general market indicators and recent trends.
-Timestamp: {datetime.now(pytz.UTC).strftime("%Y-%m-%d %H:%M:%S")}
-Source: System Generated
-"""
+        # Prepare context from the news articles most relevant to the question
+        context, news_articles = build_context(question, snapshot)
         
+        # Reuse the answer to a near-identical question about the same news, if any
+        loop = asyncio.get_running_loop()
+        snapshot_key = snapshot.fingerprint if snapshot else "fallback"
+        analysis = await loop.run_in_executor(None, answer_cache.get, question, snapshot_key)
+        cached = analysis is not None
+
         # Get analysis from OpenAI
-        analysis = ask_openai(question, context)
+        if not cached:
+            analysis = await ask_openai_async(question, context)
+            if analysis and analysis["content"] != FALLBACK_CONTENT:
+                await loop.run_in_executor(None, answer_cache.put, question, snapshot_key, analysis)
         
         if not analysis:
             return {
@@ -56,14 +139,9 @@ Source: System Generated
             "status": "success",
             "question": question,
             "analysis": analysis,
-            "sources": [
-                {
-                    "title": article["title"],
-                    "url": article["url"],
-                    "timestamp": article["timestamp"]
-                }
-                for article in news_articles[:5]
-            ] if news_articles else []
+            "sources": build_sources(news_articles),
+            "snapshot": news_scheduler.status(),
+            "cached": cached
         }
         
     except Exception as e:
@@ -72,4 +150,85 @@ Source: System Generated
             "status": "error",
             "message": "An error occurred while processing your request. Please try again.",
             "analysis": "I apologize, but I'm having trouble analyzing the market data right now. Please try asking your question again."
-        }
\ No newline at end of file
+        }
+
+@app.get("/sentiment")
+async def sentiment(
+    kind: str = Query("fund", description="One of fund, stock or sector"),
+    key: str = Query(None, description="A single fund name, stock symbol or sector"),
+    limit: int = Query(20, ge=1, le=500)
+):
+    """Time-decayed news sentiment, precomputed as articles are processed"""
+    if kind not in KINDS:
+        return {"status": "error", "message": f"kind must be one of {', '.join(KINDS)}"}
+    loop = asyncio.get_running_loop()
+    if key is not None:
+        score = await loop.run_in_executor(None, sentiment_aggregator.get, kind, key)
+        scores = [score] if score else []
+    else:
+        scores = await loop.run_in_executor(None, sentiment_aggregator.scores, kind, limit)
+    return {
+        "status": "success",
+        "kind": kind,
+        "half_life_hours": sentiment_aggregator.half_life / 3600,
+        "scores": scores
+    }
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.get("/analyze/stream")
+async def analyze_market_stream(
+    question: str = Query(..., description="Your question about the market (e.g., 'Why is Nifty down today?')")
+):
+    """
+    Server-sent events: `sources` right away, then `token` events as the answer
+    is generated, then `done` with the full analysis and its price_change.
+    """
+    snapshot = news_scheduler.snapshot()
+    # Ranked locally against the in-memory snapshot, so the first event goes out at once
+    context, news_articles = build_context(question, snapshot)
+
+    async def events():
+        yield sse_event("sources", {
+            "question": question,
+            "sources": build_sources(news_articles),
+            "snapshot": news_scheduler.status()
+        })
+        try:
+            loop = asyncio.get_running_loop()
+            snapshot_key = snapshot.fingerprint if snapshot else "fallback"
+            analysis = await loop.run_in_executor(None, answer_cache.get, question, snapshot_key)
+            cached = analysis is not None
+
+            if cached:
+                yield sse_event("token", {"text": analysis["content"]})
+            else:
+                parts = []
+                try:
+                    async for text in llm_client.stream(question, context):
+                        parts.append(text)
+                        yield sse_event("token", {"text": text})
+                except Exception as e:
+                    if parts:
+                        raise
+                    print(f"Error calling OpenAI API: {str(e)}")
+                if parts:
+                    analysis = to_analysis("".join(parts))
+                    await loop.run_in_executor(None, answer_cache.put, question, snapshot_key, analysis)
+                else:
+                    analysis = fallback_analysis()
+                    yield sse_event("token", {"text": analysis["content"]})
+
+            yield sse_event("done", {"status": "success", "analysis": analysis, "cached": cached})
+        except Exception as e:
+            print(f"API Error: {str(e)}")  # Log the error
+            yield sse_event("error", {
+                "status": "error",
+                "message": "An error occurred while processing your request. Please try again."
+            })
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # don't let proxies buffer the stream
+    })
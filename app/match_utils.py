@@ -1,5 +1,72 @@
+import threading
+from typing import Dict, Iterable, List, Set
+
+import numpy as np
 from fuzzywuzzy import fuzz
 
+try:
+    from rapidfuzz import fuzz as rapid_fuzz
+    from rapidfuzz import process as rapid_process
+except ImportError:
+    rapid_process = None
+
+MATCH_THRESHOLD = 80
+
 def is_related(news_entities, fund_name):
-    return any(fuzz.partial_ratio(ent.lower(), fund_name.lower()) > 80 for ent in news_entities)
+    return any(fuzz.partial_ratio(ent.lower(), fund_name.lower()) > MATCH_THRESHOLD for ent in news_entities)
+
+
+class FundMatcher:
+    """
+    Precomputed index over fund names that matches whole batches of entities
+    in one call, with the same result as calling `is_related` per pair.
+
+    rapidfuzz's `cdist` scores every entity against every fund in C++ and its
+    partial_ratio searches all alignments, so it never scores below
+    fuzzywuzzy's. Pairs it rejects are dropped without further work and the
+    few survivors are confirmed with fuzzywuzzy. Without rapidfuzz every
+    pair is checked with fuzzywuzzy. Verdicts are memoised per entity, so
+    one long-lived matcher gets cheaper as entities repeat. Safe to share
+    between threads.
+    """
+
+    def __init__(self, fund_names: Iterable[str], threshold: int = MATCH_THRESHOLD):
+        self.fund_names = list(fund_names)
+        self.threshold = threshold
+        self._normalized = [name.lower() for name in self.fund_names]
+        self._memo: Dict[str, Set[int]] = {}
+        self._lock = threading.Lock()
+
+    def _score(self, entities: List[str]) -> None:
+        """Fill the memo for entities not seen before."""
+        if rapid_process is not None and self._normalized:
+            scores = rapid_process.cdist(
+                entities, self._normalized, scorer=rapid_fuzz.partial_ratio,
+                score_cutoff=self.threshold, workers=-1
+            )
+            candidates = np.argwhere(scores > self.threshold)
+        else:
+            candidates = [(e, f) for e in range(len(entities)) for f in range(len(self._normalized))]
+
+        for entity in entities:
+            self._memo[entity] = set()
+        for e, f in candidates:
+            entity = entities[e]
+            if fuzz.partial_ratio(entity, self._normalized[f]) > self.threshold:
+                self._memo[entity].add(int(f))
+
+    def match_batch(self, entity_lists: List[List[str]]) -> List[List[str]]:
+        """Fund names related to each list of entities (e.g. one list per article)."""
+        normalized = [[entity.lower() for entity in entities] for entities in entity_lists]
+        with self._lock:
+            unseen = list({entity for entities in normalized for entity in entities if entity not in self._memo})
+            if unseen:
+                self._score(unseen)
+        results = []
+        for entities in normalized:
+            matched = set().union(*(self._memo[entity] for entity in entities)) if entities else set()
+            results.append([self.fund_names[i] for i in sorted(matched)])
+        return results
 
+    def match(self, entities: List[str]) -> List[str]:
+        return self.match_batch([entities])[0]
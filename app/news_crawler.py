@@ -1,9 +1,14 @@
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 import pytz
 import time
 from typing import List, Dict, Any
+from app.extraction import extractor
+from app.metrics import timed
+
+# Headline items on the section pages, and the article body classes tried in order
+LISTING_SELECTOR = "li.clearfix, div.clearfix, li.article-list, div.article-list"
+CONTENT_CLASSES = ("content_wrapper", "article-content", "article_content")
 
 def get_default_headers():
     return {
@@ -13,6 +18,7 @@ def get_default_headers():
         "Connection": "keep-alive",
     }
 
+@timed("crawl.moneycontrol")
 def scrape_moneycontrol() -> List[Dict[str, Any]]:
     """
     Scrapes latest market news from MoneyControl
@@ -31,54 +37,23 @@ def scrape_moneycontrol() -> List[Dict[str, Any]]:
         try:
             response = requests.get(base_url, headers=headers, timeout=10)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find all news articles
-            articles = soup.find_all(['li', 'div'], class_=['clearfix', 'article-list'])
-            
-            for article in articles[:5]:  # Get latest 5 articles from each section
+            # Latest 5 headline links from each section
+            for article in extractor.listing(response.text, LISTING_SELECTOR)[:5]:
                 try:
-                    # Find title and link
-                    title_element = article.find(['h2', 'h3']) or article.find('a')
-                    if not title_element:
-                        continue
-                        
-                    title = title_element.text.strip()
-                    link = title_element.find('a')['href'] if title_element.find('a') else None
-                    if not link and hasattr(title_element, 'href'):
-                        link = title_element['href']
-                    
-                    # Skip if no title or link
+                    title, link = article['title'], article['link']
                     if not title or not link:
                         continue
-                    
-                    # Get article timestamp
-                    time_element = article.find(['span', 'time'], class_=['ago', 'date'])
-                    timestamp = time_element.text.strip() if time_element else datetime.now(pytz.UTC).strftime("%Y-%m-%d %H:%M:%S")
+                    # Listing items only show relative ages, so articles are stamped with the fetch time
+                    timestamp = datetime.now(pytz.UTC).strftime("%Y-%m-%d %H:%M:%S")
                     
                     # Get article content
                     content = ""
                     if link:
                         try:
                             article_response = requests.get(link, headers=headers, timeout=10)
-                            article_soup = BeautifulSoup(article_response.text, 'html.parser')
-                            
-                            # Try different content selectors
-                            content_div = (
-                                article_soup.find('div', class_='content_wrapper') or
-                                article_soup.find('div', class_='article-content') or
-                                article_soup.find('div', class_='article_content')
-                            )
-                            
-                            if content_div:
-                                paragraphs = content_div.find_all('p')
-                                content = ' '.join([p.text.strip() for p in paragraphs if p.text.strip()])
-                            
-                            # Fallback to meta description if no content
-                            if not content:
-                                meta_desc = article_soup.find('meta', {'name': 'description'})
-                                if meta_desc:
-                                    content = meta_desc.get('content', '')
+                            # Try each content selector, then the meta description, on one parse of the page
+                            content = extractor.article_text_or_meta(article_response.text, CONTENT_CLASSES,
+                                                                     skip_empty=True)
                         except Exception as e:
                             print(f"Error fetching article content: {str(e)}")
                             # Use title as fallback content
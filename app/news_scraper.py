@@ -1,10 +1,17 @@
 import requests
 import feedparser
-from bs4 import BeautifulSoup
 from datetime import datetime
 import time
 from typing import List, Dict
 import concurrent.futures
+import inspect
+from app.extraction import extractor
+from app.http_cache import http_cache
+from app.metrics import record_error, timed
+
+# Bump when the output of parse_listing / parse_feed / parse_article_content changes,
+# so results cached by HttpCache are parsed again
+PARSER_VERSION = "1"
 
 class NewsArticle:
     def __init__(self, title: str, content: str, url: str, source: str, timestamp: str = None):
@@ -24,11 +31,26 @@ class NewsArticle:
         }
 
 class FinancialNewsScraper:
-    def __init__(self):
+    def __init__(self, cache=http_cache):
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
+        self.session = requests.Session()
+        self.cache = cache
+
+    def _get_parsed(self, url: str, parse, *args):
+        """GET a page and return parse(text, *args), reusing the cached result if the page is unchanged"""
+        parser = parser_key(parse, *args)
+        headers = dict(self.headers, **self.cache.request_headers(url, parser)) if self.cache else self.headers
+        response = self.session.get(url, headers=headers, timeout=10)
+        if response.status_code != 304:
+            response.raise_for_status()
+        if self.cache is None:
+            return parse(response.text, *args)
+        return self.cache.resolve(url, response.status_code, response.headers,
+                                  response.content, lambda: parse(response.text, *args), parser)
 
+    @timed("scrape.moneycontrol")
     def _get_moneycontrol_news(self) -> List[NewsArticle]:
         try:
             urls = [
@@ -38,24 +60,12 @@ class FinancialNewsScraper:
             articles = []
             
             for url in urls:
-                response = requests.get(url, headers=self.headers, timeout=10)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                for article in soup.select("li.clearfix"):
+                for item in self._get_parsed(url, parse_listing, "li.clearfix"):
                     try:
-                        title_elem = article.find("h2")
-                        if not title_elem:
-                            continue
-                            
-                        title = title_elem.text.strip()
-                        link = title_elem.find("a")["href"] if title_elem.find("a") else None
-                        
+                        title, link = item["title"], item["link"]
                         if link:
                             # Get full article content
-                            article_response = requests.get(link, headers=self.headers, timeout=10)
-                            article_soup = BeautifulSoup(article_response.text, 'html.parser')
-                            content_div = article_soup.find("div", {"class": "content_wrapper"})
-                            content = " ".join([p.text.strip() for p in content_div.find_all("p")]) if content_div else title
+                            content = self._get_parsed(link, parse_article_content, "content_wrapper") or title
                             
                             articles.append(NewsArticle(
                                 title=title,
@@ -65,95 +75,88 @@ class FinancialNewsScraper:
                             ))
                     except Exception as e:
                         print(f"Error processing MoneyControl article: {str(e)}")
+                        record_error("scrape.moneycontrol")
                         continue
                         
             return articles
         except Exception as e:
             print(f"Error fetching MoneyControl news: {str(e)}")
+            record_error("scrape.moneycontrol")
             return []
 
+    @timed("scrape.economic_times")
     def _get_economic_times_news(self) -> List[NewsArticle]:
         try:
             # ET RSS feed for markets
             rss_url = "https://economictimes.indiatimes.com/markets/rssfeeds/1977021501.cms"
-            feed = feedparser.parse(rss_url)
+            entries = self._get_parsed(rss_url, parse_feed)
             
             articles = []
-            for entry in feed.entries[:10]:  # Get top 10 articles
+            for entry in entries[:10]:  # Get top 10 articles
                 try:
                     # Get full article content
-                    response = requests.get(entry.link, headers=self.headers, timeout=10)
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    content_div = soup.find("div", {"class": "artText"})
-                    content = " ".join([p.text.strip() for p in content_div.find_all("p")]) if content_div else entry.summary
+                    content = self._get_parsed(entry["link"], parse_article_content, "artText") or entry["summary"]
                     
                     articles.append(NewsArticle(
-                        title=entry.title,
+                        title=entry["title"],
                         content=content,
-                        url=entry.link,
+                        url=entry["link"],
                         source="Economic Times",
-                        timestamp=entry.published
+                        timestamp=entry["timestamp"]
                     ))
                 except Exception as e:
                     print(f"Error processing ET article: {str(e)}")
+                    record_error("scrape.economic_times")
                     continue
                     
             return articles
         except Exception as e:
             print(f"Error fetching Economic Times news: {str(e)}")
+            record_error("scrape.economic_times")
             return []
 
+    @timed("scrape.livemint")
     def _get_livemint_news(self) -> List[NewsArticle]:
         try:
             # Livemint RSS feed for markets
             rss_url = "https://www.livemint.com/rss/markets"
-            feed = feedparser.parse(rss_url)
+            entries = self._get_parsed(rss_url, parse_feed)
             
             articles = []
-            for entry in feed.entries[:10]:
+            for entry in entries[:10]:
                 try:
-                    response = requests.get(entry.link, headers=self.headers, timeout=10)
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    content_div = soup.find("div", {"class": "mainArea"})
-                    content = " ".join([p.text.strip() for p in content_div.find_all("p")]) if content_div else entry.summary
+                    content = self._get_parsed(entry["link"], parse_article_content, "mainArea") or entry["summary"]
                     
                     articles.append(NewsArticle(
-                        title=entry.title,
+                        title=entry["title"],
                         content=content,
-                        url=entry.link,
+                        url=entry["link"],
                         source="Livemint",
-                        timestamp=entry.published
+                        timestamp=entry["timestamp"]
                     ))
                 except Exception as e:
                     print(f"Error processing Livemint article: {str(e)}")
+                    record_error("scrape.livemint")
                     continue
                     
             return articles
         except Exception as e:
             print(f"Error fetching Livemint news: {str(e)}")
+            record_error("scrape.livemint")
             return []
 
+    @timed("scrape.business_standard")
     def _get_business_standard_news(self) -> List[NewsArticle]:
         try:
             url = "https://www.business-standard.com/markets"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
             
             articles = []
-            for article in soup.select(".article-list li"):
+            listing = self._get_parsed(url, parse_listing, ".article-list li", "h2", "https://www.business-standard.com")
+            for item in listing:
                 try:
-                    title_elem = article.find("h2")
-                    if not title_elem:
-                        continue
-                        
-                    title = title_elem.text.strip()
-                    link = "https://www.business-standard.com" + title_elem.find("a")["href"] if title_elem.find("a") else None
-                    
+                    title, link = item["title"], item["link"]
                     if link:
-                        article_response = requests.get(link, headers=self.headers, timeout=10)
-                        article_soup = BeautifulSoup(article_response.text, 'html.parser')
-                        content_div = article_soup.find("div", {"class": "article-content"})
-                        content = " ".join([p.text.strip() for p in content_div.find_all("p")]) if content_div else title
+                        content = self._get_parsed(link, parse_article_content, "article-content") or title
                         
                         articles.append(NewsArticle(
                             title=title,
@@ -163,11 +166,13 @@ class FinancialNewsScraper:
                         ))
                 except Exception as e:
                     print(f"Error processing Business Standard article: {str(e)}")
+                    record_error("scrape.business_standard")
                     continue
                     
             return articles
         except Exception as e:
             print(f"Error fetching Business Standard news: {str(e)}")
+            record_error("scrape.business_standard")
             return []
 
     def get_all_news(self) -> List[Dict]:
@@ -198,6 +203,39 @@ class FinancialNewsScraper:
         
         return all_articles[:15]  # Return top 15 most recent articles
 
+def parser_key(parse, *args) -> str:
+    """
+    HttpCache key of a parse function with its arguments, under the current parser
+    version and engine. Defaults are filled in, so callers passing them or not share
+    one cache entry per page.
+    """
+    bound = inspect.signature(parse).bind("", *args)
+    bound.apply_defaults()
+    values = list(bound.arguments.values())[1:]  # without the page text
+    return ":".join([PARSER_VERSION, extractor.name, parse.__name__, *map(str, values)])
+
+def parse_listing(text: str, selector: str, title_tag: str = "h2", link_prefix: str = "") -> List[Dict]:
+    """Headline links found on a listing page"""
+    return extractor.listing(text, selector, title_tag, link_prefix)
+
+def parse_feed(text: str) -> List[Dict]:
+    """Entries of an RSS feed in the same shape as parse_listing"""
+    return [
+        {
+            "title": entry.get("title"),
+            "link": entry.get("link"),
+            "timestamp": entry.get("published"),
+            "summary": entry.get("summary", ""),
+        }
+        for entry in feedparser.parse(text).entries
+        if entry.get("link")
+    ]
+
+def parse_article_content(text: str, content_class: str) -> str:
+    """Paragraph text inside the article's content div, empty if there is none"""
+    return extractor.article_text(text, content_class)
+
+@timed("scrape_moneycontrol")
 def scrape_moneycontrol():
     """Legacy function for compatibility"""
     scraper = FinancialNewsScraper()
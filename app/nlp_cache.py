@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from importlib import metadata
+from typing import Any, Dict, Iterable, Optional
+
+NLP_CACHE_PATH = os.getenv("NLP_CACHE_PATH", "database/news_sense.db")
+
+
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "missing"
+
+
+def current_model_version() -> str:
+    """
+    Identifies everything that determines NLP output: the models, the library
+    versions that pick the default pipelines, and how inputs are truncated.
+    Override with NLP_MODEL_VERSION to pin or bump it by hand.
+    """
+    return os.getenv("NLP_MODEL_VERSION") or "|".join([
+        "en_core_web_sm=" + _package_version("en_core_web_sm"),
+        "spacy=" + _package_version("spacy"),
+        "transformers=" + _package_version("transformers"),
+        "summary[:1000]/sentiment[:512]",
+    ])
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class NLPResultCache:
+    """
+    Persistent memo of process_article results keyed by content hash and model
+    version. Entries written by other model versions are dropped when opened.
+    """
+
+    def __init__(self, path: str = NLP_CACHE_PATH, model_version: str = None):
+        self.path = path
+        self.model_version = model_version or current_model_version()
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the database on first use. Callers must hold the lock."""
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS nlp_results (
+                    content_hash TEXT NOT NULL,
+                    model_version TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (content_hash, model_version)
+                )
+            """)
+            # Invalidate results produced by any other model version
+            conn.execute("DELETE FROM nlp_results WHERE model_version != ?", (self.model_version,))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Cached results for the given content hashes, missing ones omitted."""
+        hashes = list(dict.fromkeys(hashes))
+        found = {}
+        with self._lock:
+            db = self._db()
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i:i + 500]
+                rows = db.execute(
+                    f"SELECT content_hash, result FROM nlp_results WHERE model_version = ? "
+                    f"AND content_hash IN ({','.join('?' for _ in chunk)})",
+                    (self.model_version, *chunk)
+                ).fetchall()
+                found.update({h: json.loads(result) for h, result in rows})
+            self.hits += len(found)
+            self.misses += len(hashes) - len(found)
+        return found
+
+    def put_many(self, results: Dict[str, Dict[str, Any]]) -> None:
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR REPLACE INTO nlp_results VALUES (?, ?, ?, ?)",
+                [(h, self.model_version, json.dumps(result), now) for h, result in results.items()]
+            )
+            db.commit()
+
+
+nlp_cache = NLPResultCache()
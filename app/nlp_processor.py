@@ -1,16 +1,136 @@
-import spacy
-from transformers import pipeline
+import os
+import threading
+import time
+from typing import Any, Dict, List
+
+from app.metrics import stage_seconds, timed
+from app.nlp_cache import content_hash, nlp_cache
+
+# Articles per model call and torch intra-op threads (0 keeps the library default)
+NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", "8"))
+NLP_THREADS = int(os.getenv("NLP_THREADS", "0"))
+
+_models: Dict[str, Any] = {}
+_models_lock = threading.Lock()
+_stage_timings: Dict[str, Dict[str, float]] = {}
+_timings_lock = threading.Lock()
+
+
+def _load(name: str):
+    """Load a model on first use; spaCy and transformers are only imported then."""
+    if name not in _models:
+        with _models_lock:
+            if name not in _models:
+                if NLP_THREADS > 0:
+                    import torch
+                    torch.set_num_threads(NLP_THREADS)
+                if name == "nlp":
+                    import spacy
+                    _models[name] = spacy.load("en_core_web_sm")
+                else:
+                    from transformers import pipeline
+                    task = "summarization" if name == "summarizer" else "sentiment-analysis"
+                    _models[name] = pipeline(task)
+    return _models[name]
+
+
+def get_nlp():
+    return _load("nlp")
+
+
+def get_summarizer():
+    return _load("summarizer")
+
+
+def get_sentiment_analyzer():
+    return _load("sentiment_analyzer")
+
+
+def load_models() -> None:
+    """Eagerly load every model, e.g. before forking worker processes."""
+    get_nlp()
+    get_summarizer()
+    get_sentiment_analyzer()
+
+
+def __getattr__(name: str):
+    # Keep `nlp_processor.nlp` / `.summarizer` / `.sentiment_analyzer` working, loaded lazily
+    if name in ("nlp", "summarizer", "sentiment_analyzer"):
+        return _load(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def record_stage_timing(stage: str, seconds: float, articles: int) -> None:
+    with _timings_lock:
+        stats = _stage_timings.setdefault(stage, {"batches": 0, "articles": 0, "seconds": 0.0})
+        stats["batches"] += 1
+        stats["articles"] += articles
+        stats["seconds"] += seconds
+        stats["last_seconds"] = seconds
+    stage_seconds.observe(seconds, stage="nlp." + stage)
+
+
+def get_stage_timings() -> Dict[str, Dict[str, float]]:
+    """Cumulative and last-batch wall time of each pipeline stage."""
+    with _timings_lock:
+        return {stage: dict(stats) for stage, stats in _stage_timings.items()}
+
+
+def run_models(batch: List[Dict[str, Any]], batch_size: int) -> List[Dict[str, Any]]:
+    """Summarise, extract entities and classify sentiment, each model once per batch."""
+    contents = [article["content"] for article in batch]
+
+    start = time.perf_counter()
+    summaries = get_summarizer()([text[:1000] for text in contents], batch_size=batch_size)
+    record_stage_timing("summarization", time.perf_counter() - start, len(batch))
+
+    start = time.perf_counter()
+    entities = [[ent.text for ent in doc.ents] for doc in get_nlp().pipe(contents, batch_size=batch_size)]
+    record_stage_timing("ner", time.perf_counter() - start, len(batch))
+
+    start = time.perf_counter()
+    sentiments = get_sentiment_analyzer()([text[:512] for text in contents], batch_size=batch_size)
+    record_stage_timing("sentiment", time.perf_counter() - start, len(batch))
+
+    return [
+        {
+            # Summarisation returns one list of candidates per input on some versions
+            "summary": (summary[0] if isinstance(summary, list) else summary)["summary_text"],
+            "entities": ents,
+            "sentiment": sentiment
+        }
+        for summary, ents, sentiment in zip(summaries, entities, sentiments)
+    ]
+
+
+@timed("nlp")
+def process_articles(batch: List[Dict[str, Any]], batch_size: int = NLP_BATCH_SIZE,
+                     cache=nlp_cache) -> List[Dict[str, Any]]:
+    """
+    NLP results for a batch of articles. Results are memoised by content hash
+    and model version, so only unseen content goes through the models.
+    """
+    if not batch:
+        return []
+    hashes = [content_hash(article["content"]) for article in batch]
+    results = cache.get_many(hashes) if cache is not None else {}
+
+    # Identical content appearing twice in a batch is only processed once
+    pending = {}
+    for h, article in zip(hashes, batch):
+        if h not in results:
+            pending.setdefault(h, article)
+    if pending:
+        # Imported here, the pool module depends on this one
+        from app.inference_pool import inference_pool
+        runner = inference_pool.run if inference_pool.active else run_models
+        computed = dict(zip(pending, runner(list(pending.values()), batch_size)))
+        if cache is not None:
+            cache.put_many(computed)
+        results.update(computed)
+
+    return [results[h] for h in hashes]
 
-nlp = spacy.load("en_core_web_sm")
-summarizer = pipeline("summarization")
-sentiment_analyzer = pipeline("sentiment-analysis")
 
 def process_article(article):
-    summary = summarizer(article["content"][:1000])[0]["summary_text"]
-    ents = [ent.text for ent in nlp(article["content"]).ents]
-    sentiment = sentiment_analyzer(article["content"][:512])[0]
-    return {
-        "summary": summary,
-        "entities": ents,
-        "sentiment": sentiment
-    }
\ No newline at end of file
+    return process_articles([article])[0]
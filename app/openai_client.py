@@ -1,9 +1,14 @@
 # app/openai_client.py
+import asyncio
 import os
+import random
 import re
-from openai import OpenAI
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+import openai
+from openai import AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
-from functools import lru_cache
+
+from app.metrics import record_error, timed
 
 # Load environment variables
 load_dotenv()
@@ -11,6 +16,18 @@ load_dotenv()
 # Initialize OpenAI client
 client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
+# Returned when the API call fails; never worth caching
+FALLBACK_CONTENT = "I apologize, but I'm having trouble accessing the market data. Please try again shortly."
+
+# Async client limits: concurrent completions, seconds per attempt, retries after the first attempt
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF = float(os.getenv("LLM_BACKOFF", "0.5"))
+
+MODEL = "gpt-3.5-turbo"
+SYSTEM_PROMPT = "You are a top financial analyst who provides precise, data-rich responses tailored to each question. You adapt your style based on whether the question is about stocks, ETFs, sectors, or general concepts."
+
 def extract_price_change(text: str) -> tuple[float, str]:
     """
     Extract price change percentage and symbol from text
@@ -29,14 +46,10 @@ def extract_price_change(text: str) -> tuple[float, str]:
         return float(up_match.group(1)), symbol
     return 0.0, symbol
 
-@lru_cache(maxsize=100)  # Cache up to 100 most recent responses
-def ask_openai(question: str, context: str) -> dict:
-    """
-    Ask OpenAI a question with context and get a response
-    """
-    try:
-        # Create a more flexible prompt
-        prompt = f"""You are a senior financial analyst with expertise in stocks, ETFs, and market trends. 
+def build_messages(question: str, context: str) -> list:
+    """Chat messages for a question and its news context"""
+    # Create a more flexible prompt
+    prompt = f"""You are a senior financial analyst with expertise in stocks, ETFs, and market trends. 
         Provide a concise, data-driven response to the following question:
 
         Question: {question}
@@ -63,34 +76,198 @@ def ask_openai(question: str, context: str) -> dict:
         If asking about a specific stock, don't list unrelated funds.
         """
 
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def to_analysis(content: str) -> dict:
+    """Response payload for a completion, with the extracted price change"""
+    content = content.strip()
+    percentage, symbol = extract_price_change(content)
+
+    return {
+        "content": content,
+        "price_change": {
+            "percentage": percentage,
+            "symbol": symbol
+        }
+    }
+
+def fallback_analysis() -> dict:
+    return {
+        "content": FALLBACK_CONTENT,
+        "price_change": {
+            "percentage": 0.0,
+            "symbol": "Unknown"
+        }
+    }
+
+@timed("llm")
+def ask_openai(question: str, context: str) -> dict:
+    """
+    Ask OpenAI a question with context and get a response.
+    Not memoised here: answers are cached semantically in app.answer_cache.
+    """
+    try:
         # Call OpenAI API
         response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a top financial analyst who provides precise, data-rich responses tailored to each question. You adapt your style based on whether the question is about stocks, ETFs, sectors, or general concepts."},
-                {"role": "user", "content": prompt}
-            ],
+            model=MODEL,
+            messages=build_messages(question, context),
             temperature=0.5,  # Lower for more factual responses
             max_tokens=800
         )
 
-        content = response.choices[0].message.content.strip()
-        percentage, symbol = extract_price_change(content)
-
-        return {
-            "content": content,
-            "price_change": {
-                "percentage": percentage,
-                "symbol": symbol
-            }
-        }
+        return to_analysis(response.choices[0].message.content)
 
     except Exception as e:
         print(f"Error calling OpenAI API: {str(e)}")
-        return {
-            "content": "I apologize, but I'm having trouble accessing the market data. Please try again shortly.",
-            "price_change": {
-                "percentage": 0.0,
-                "symbol": "Unknown"
-            }
-        }
\ No newline at end of file
+        record_error("llm")
+        return fallback_analysis()
+
+
+# Errors worth another attempt; anything else (bad request, auth) fails at once
+RETRYABLE_ERRORS = (
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class AsyncLLMClient:
+    """
+    Non-blocking completions for the API handlers. At most `max_concurrency`
+    requests are in flight, each attempt is bounded by `timeout`, and failed
+    attempts are retried with exponential backoff and full jitter. Identical
+    questions asked while one is in flight share its result (single-flight).
+    """
+
+    def __init__(self, client: Optional[AsyncOpenAI] = None, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 timeout: float = LLM_TIMEOUT, max_retries: int = LLM_MAX_RETRIES, backoff: float = LLM_BACKOFF):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.calls = 0      # upstream attempts
+        self.coalesced = 0  # requests served by another request's call
+        self.active = 0     # upstream requests holding a concurrency slot
+        self._client = client
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    def _get_client(self) -> AsyncOpenAI:
+        if self._client is None:
+            # Retries are ours; OPENAI_BASE_URL can point this at a local mock server
+            self._client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'), max_retries=0)
+        return self._client
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores belong to the loop they were first used on
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+            self._inflight = {}
+        return self._semaphore
+
+    async def _complete(self, messages: list, **kwargs) -> Any:
+        """One completion with the concurrency bound, timeout and retries applied"""
+        attempt = 0
+        while True:
+            try:
+                async with self._get_semaphore():
+                    self.calls += 1
+                    self.active += 1
+                    try:
+                        return await self._get_client().chat.completions.create(
+                            model=MODEL,
+                            messages=messages,
+                            temperature=0.5,
+                            max_tokens=800,
+                            timeout=self.timeout,
+                            **kwargs
+                        )
+                    finally:
+                        self.active -= 1
+            except RETRYABLE_ERRORS:
+                if attempt >= self.max_retries:
+                    raise
+                # Full jitter keeps retries from many callers from arriving together
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+                attempt += 1
+
+    async def stream(self, question: str, context: str) -> AsyncIterator[str]:
+        """
+        Completion text as it is generated. Failures before the first token are
+        retried like `ask`; after that they propagate to the caller.
+        """
+        attempt = 0
+        while True:
+            started = False
+            try:
+                # The slot is held for the whole stream
+                async with self._get_semaphore():
+                    self.calls += 1
+                    self.active += 1
+                    try:
+                        with timed("llm.stream"):
+                            response = await self._get_client().chat.completions.create(
+                                model=MODEL,
+                                messages=build_messages(question, context),
+                                temperature=0.5,
+                                max_tokens=800,
+                                timeout=self.timeout,
+                                stream=True
+                            )
+                            async for chunk in response:
+                                delta = chunk.choices[0].delta.content if chunk.choices else None
+                                if delta:
+                                    started = True
+                                    yield delta
+                    finally:
+                        self.active -= 1
+                    return
+            except RETRYABLE_ERRORS:
+                if started or attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+                attempt += 1
+
+    @timed("llm")
+    async def _ask(self, question: str, context: str) -> dict:
+        try:
+            response = await self._complete(build_messages(question, context))
+            return to_analysis(response.choices[0].message.content)
+        except Exception as e:
+            print(f"Error calling OpenAI API: {str(e)}")
+            record_error("llm")
+            return fallback_analysis()
+
+    async def ask(self, question: str, context: str) -> dict:
+        """Same contract as ask_openai, without blocking the event loop"""
+        self._get_semaphore()
+        key = (question, context)
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(self._ask(question, context))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller disconnecting does not cancel the shared call
+        return await asyncio.shield(future)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+llm_client = AsyncLLMClient()
+
+
+async def ask_openai_async(question: str, context: str) -> dict:
+    return await llm_client.ask(question, context)
@@ -1,14 +1,29 @@
+from functools import lru_cache
+
 from app.openai_client import ask_openai
+from app.news_scraper import scrape_moneycontrol
+from app.nlp_processor import process_articles
+from app.match_utils import FundMatcher
+from app.article_store import article_store
+from app.stock_data_manager import stock_manager
+
+@lru_cache(maxsize=64)
+def _single_fund_matcher(fund):
+    """Matcher for a fund name that isn't in the market data"""
+    return FundMatcher([fund])
 
 def answer_query(fund):
     news = scrape_moneycontrol()
+    article_store.upsert_many(news)
     summaries = []
 
-    for article in news:
-        processed = process_article(article)
-        save_article_to_db(article, processed)
-
-        if is_related(processed["entities"], fund):
+    # One batched pass through the models and the matcher for the whole refresh
+    processed_batch = process_articles(news)
+    # The matcher over all funds is built once per market data snapshot and keeps its memo
+    matcher = stock_manager.fund_matcher if fund in stock_manager.mf_data else _single_fund_matcher(fund)
+    matches = matcher.match_batch([processed["entities"] for processed in processed_batch])
+    for processed, related_funds in zip(processed_batch, matches):
+        if fund in related_funds:
             summaries.append(f"- {processed['summary']} (Sentiment: {processed['sentiment']['label']})")
 
     context = "\n".join(summaries[:5])  # only top 5
@@ -0,0 +1,182 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SENTIMENT_DB_PATH = os.getenv("SENTIMENT_DB_PATH", "database/news_sense.db")
+# Hours after which an article's weight in the scores has halved
+SENTIMENT_HALF_LIFE_HOURS = float(os.getenv("SENTIMENT_HALF_LIFE_HOURS", "24"))
+KINDS = ("fund", "stock", "sector")
+# Articles older than this many half-lives weigh under 0.1% and are forgotten for de-duplication
+SEEN_HALF_LIVES = 10
+# Recorded articles between two prunes of the de-duplication table
+PRUNE_EVERY = 1000
+
+# Index of each field in an in-memory state row
+SCORE, WEIGHT, POSITIVE, NEGATIVE, UPDATED_AT = range(5)
+
+
+def signed_score(sentiment: Dict[str, Any]) -> float:
+    """Sentiment pipeline output ({'label', 'score'}) as a value in [-1, 1]."""
+    label = str(sentiment.get("label", "")).upper()
+    if label.startswith("POS"):
+        return float(sentiment.get("score", 0.0))
+    if label.startswith("NEG"):
+        return -float(sentiment.get("score", 0.0))
+    return 0.0
+
+
+class SentimentAggregator:
+    """
+    Running sentiment per fund, stock and sector with exponential time decay.
+    Each key keeps decayed sums of article scores, article weights and
+    positive/negative counts as of its last update, so recording a match and
+    reading a score are both O(1). The score is the recency-weighted mean
+    sentiment and `mentions` the decayed article count. State is written
+    through to SQLite, and an article counts at most once per key.
+    """
+
+    def __init__(self, path: str = SENTIMENT_DB_PATH, half_life_hours: float = SENTIMENT_HALF_LIFE_HOURS):
+        self.path = path
+        self.half_life = half_life_hours * 3600
+        self.decay_rate = math.log(2) / self.half_life
+        self._state: Dict[Tuple[str, str], List[float]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._since_prune = 0
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the database and load the state on first use. Callers must hold the lock."""
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sentiment_scores (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    score_sum REAL NOT NULL,
+                    weight REAL NOT NULL,
+                    positive REAL NOT NULL,
+                    negative REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sentiment_matches (
+                    article_key TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    recorded_at REAL NOT NULL,
+                    PRIMARY KEY (article_key, kind, key)
+                )
+            """)
+            self._prune(conn)
+            for kind, key, *state in conn.execute("SELECT * FROM sentiment_scores"):
+                self._state[(kind, key)] = state
+            self._conn = conn
+        return self._conn
+
+    def _prune(self, db: sqlite3.Connection) -> None:
+        """Forget matches too old to matter. Callers must hold the lock."""
+        db.execute("DELETE FROM sentiment_matches WHERE recorded_at < ?",
+                   (time.time() - SEEN_HALF_LIVES * self.half_life,))
+        db.commit()
+        self._since_prune = 0
+
+    def _decay(self, elapsed: float) -> float:
+        return math.exp(-self.decay_rate * elapsed) if elapsed > 0 else 1.0
+
+    def _add(self, state: Optional[List[float]], value: float, timestamp: float) -> List[float]:
+        """A copy of `state` (a new one if None) with one article added."""
+        state = list(state) if state is not None else [0.0, 0.0, 0.0, 0.0, timestamp]
+        if timestamp >= state[UPDATED_AT]:
+            # Bring the sums forward to this article, then add it at full weight
+            factor = self._decay(timestamp - state[UPDATED_AT])
+            for i in (SCORE, WEIGHT, POSITIVE, NEGATIVE):
+                state[i] *= factor
+            state[UPDATED_AT] = timestamp
+            weight = 1.0
+        else:
+            # An older article joins already decayed
+            weight = self._decay(state[UPDATED_AT] - timestamp)
+        state[SCORE] += weight * value
+        state[WEIGHT] += weight
+        if value > 0:
+            state[POSITIVE] += weight
+        elif value < 0:
+            state[NEGATIVE] += weight
+        return state
+
+    def record_article(self, article_key: str, sentiment: Dict[str, Any], funds: Iterable[str] = (),
+                       stocks: Iterable[str] = (), sectors: Iterable[str] = (),
+                       timestamp: float = None) -> int:
+        """
+        Add one article's sentiment to every fund, stock and sector it matched
+        and that it was not already recorded for. Returns the number updated.
+        """
+        timestamp = timestamp if timestamp is not None else time.time()
+        value = signed_score(sentiment)
+        keys = [(kind, key) for kind, names in zip(KINDS, (funds, stocks, sectors)) for key in dict.fromkeys(names)]
+        with self._lock:
+            db = self._db()
+            try:
+                updated = {}
+                for kind, key in keys:
+                    cursor = db.execute("INSERT OR IGNORE INTO sentiment_matches VALUES (?, ?, ?, ?)",
+                                        (article_key, kind, key, time.time()))
+                    if cursor.rowcount:
+                        updated[(kind, key)] = self._add(self._state.get((kind, key)), value, timestamp)
+                db.executemany("INSERT OR REPLACE INTO sentiment_scores VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               [(kind, key, *state) for (kind, key), state in updated.items()])
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"Error recording sentiment: {str(e)}")
+                return 0
+            # Only what was committed reaches memory, so both stay in step
+            self._state.update(updated)
+            self._since_prune += 1
+            if self._since_prune >= PRUNE_EVERY:
+                try:
+                    self._prune(db)
+                except Exception as e:
+                    db.rollback()
+                    print(f"Error pruning sentiment matches: {str(e)}")
+        return len(updated)
+
+    def _view(self, key: str, state: List[float], now: float) -> Dict[str, Any]:
+        factor = self._decay(now - state[UPDATED_AT])
+        return {
+            "key": key,
+            "score": state[SCORE] / state[WEIGHT] if state[WEIGHT] else 0.0,
+            "mentions": state[WEIGHT] * factor,
+            "positive": state[POSITIVE] * factor,
+            "negative": state[NEGATIVE] * factor,
+            "updated_at": state[UPDATED_AT],
+        }
+
+    def get(self, kind: str, key: str, now: float = None) -> Optional[Dict[str, Any]]:
+        """Current decayed sentiment for one fund, stock or sector, or None if never mentioned."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            self._db()
+            state = self._state.get((kind, key))
+            return self._view(key, state, now) if state else None
+
+    def scores(self, kind: str, limit: int = 20, now: float = None) -> List[Dict[str, Any]]:
+        """Current sentiment of the most mentioned keys of one kind."""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown sentiment kind: {kind}")
+        now = now if now is not None else time.time()
+        with self._lock:
+            self._db()
+            views = [self._view(key, state, now) for (k, key), state in self._state.items() if k == kind]
+        return sorted(views, key=lambda view: view["mentions"], reverse=True)[:limit]
+
+
+sentiment_aggregator = SentimentAggregator()
@@ -1,96 +1,262 @@
+import bisect
 import json
+import math
 import os
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
-from functools import lru_cache
 
-class StockDataManager:
-    def __init__(self):
-        self.stock_data_path = "data/stock_data.json"
-        self.mf_data_path = "data/mutual_funds_data.json"
-        self.mf_holdings_path = "data/mf_holdings_data.json"
-        self.stock_data: Dict[str, Any] = {}
-        self.mf_data: Dict[str, Any] = {}
-        self.mf_holdings: Dict[str, Any] = {}
-        self._load_data()
+import numpy as np
 
-    def _load_data(self) -> None:
-        """Load data from JSON files if they exist."""
-        try:
-            if os.path.exists(self.stock_data_path):
-                with open(self.stock_data_path, 'r') as f:
-                    self.stock_data = json.load(f)
-            
-            if os.path.exists(self.mf_data_path):
-                with open(self.mf_data_path, 'r') as f:
-                    self.mf_data = json.load(f)
-            
-            if os.path.exists(self.mf_holdings_path):
-                with open(self.mf_holdings_path, 'r') as f:
-                    self.mf_holdings = json.load(f)
-        except Exception as e:
-            print(f"Error loading data: {str(e)}")
+from app.db import MarketDB, market_db
+from app.match_utils import FundMatcher
+
+# Numeric stock fields stored as float64 columns; missing values are NaN
+NUMERIC_FIELDS = ("price", "returns", "market_cap", "volume", "pe_ratio")
+# Funds count as sector-focused above this percentage exposure
+SECTOR_EXPOSURE_MIN = 20
+# Seconds between checks of the data files for changes
+MARKET_DATA_POLL_INTERVAL = float(os.getenv("MARKET_DATA_POLL_INTERVAL", "30"))
+
+
+class StockTable:
+    """
+    Columnar view of the stock data: one float64 array per numeric field, a
+    sector code per stock, and per-sector aggregates computed once with
+    bincount. Queries are array lookups instead of scans over the dicts.
+    """
+
+    def __init__(self, stock_data: Dict[str, Any]):
+        self.stock_data = stock_data
+        self.symbols = list(stock_data)
+        self.positions = {symbol: i for i, symbol in enumerate(self.symbols)}
+        rows = list(stock_data.values())
+        self.columns = {
+            field: np.array([_number(row.get(field)) for row in rows], dtype=np.float64)
+            for field in NUMERIC_FIELDS
+        }
+
+        sector_names = [row.get('sector') for row in rows]
+        self.sectors = sorted({name for name in sector_names if name})
+        self.sector_codes = {name: code for code, name in enumerate(self.sectors)}
+        # Stocks without a sector get code -1 and are left out of the sector aggregates
+        self.sector_of = np.array([self.sector_codes.get(name, -1) for name in sector_names], dtype=np.int64)
+
+        in_sector = self.sector_of >= 0
+        codes = self.sector_of[in_sector]
+        n_sectors = len(self.sectors)
+        self.sector_count = np.bincount(codes, minlength=n_sectors)
+        self.sector_sums = {}
+        self.sector_means = {}
+        for field in NUMERIC_FIELDS:
+            values = self.columns[field][in_sector]
+            present = ~np.isnan(values)
+            sums = np.bincount(codes[present], weights=values[present], minlength=n_sectors)
+            counts = np.bincount(codes[present], minlength=n_sectors)
+            self.sector_sums[field] = sums
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self.sector_means[field] = sums / counts
+
+        self.total_market_cap = float(np.nansum(self.columns['market_cap']))
+        self.average_pe = float(np.nanmean(self.columns['pe_ratio'])) if rows else 0.0
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def sector_performance(self, sector: str) -> Dict[str, float]:
+        code = self.sector_codes.get(sector)
+        if code is None:
+            return {}
+        return {
+            'avg_returns': float(self.sector_means['returns'][code]),
+            'market_cap': float(self.sector_sums['market_cap'][code]),
+            'volume': float(self.sector_sums['volume'][code])
+        }
+
+    def sector_mean(self, sector: str, field: str) -> float:
+        code = self.sector_codes.get(sector)
+        return float(self.sector_means[field][code]) if code is not None else float('nan')
+
+    def top_movers(self, limit: int = 5, ascending: bool = True) -> List[str]:
+        """Symbols with the lowest (ascending) or highest returns, best first."""
+        k = min(limit, len(self.symbols))
+        if k <= 0:
+            return []
+        # Rank on a key where smaller is better and NaN sorts last
+        key = self.columns['returns'] if ascending else -self.columns['returns']
+        key = np.where(np.isnan(key), np.inf, key)
+        top = np.argpartition(key, k - 1)[:k] if k < len(key) else np.arange(len(key))
+        top = top[np.lexsort((top, key[top]))]
+        return [self.symbols[i] for i in top]
+
+
+class HoldingsIndex:
+    """
+    Inverted index over the mutual funds: symbol -> funds holding it, and
+    sector -> funds with more than SECTOR_EXPOSURE_MIN% exposure. Postings are
+    kept sorted by fund returns (best first, then fund order), so the top-k
+    funds for a symbol or sector are the first k postings. Postings lists are
+    replaced rather than modified, so a `copy` shares them safely.
+    """
+
+    def __init__(self, mf_data: Dict[str, Any]):
+        self._by_symbol: Dict[str, List[Tuple]] = {}
+        self._by_sector: Dict[str, List[Tuple]] = {}
+        self._keys: Dict[str, Tuple[List[str], List[str]]] = {}  # fund -> symbols, sectors it is posted under
+        self._order: Dict[str, int] = {}
+        self._next = 0
+        # While building, postings are appended and sorted once at the end
+        self._building = True
+        for fund_name, fund_data in mf_data.items():
+            self.update_fund(fund_name, fund_data)
+        for postings in (self._by_symbol, self._by_sector):
+            for current in postings.values():
+                current.sort()
+        self._building = False
+
+    def update_fund(self, fund_name: str, fund_data: Dict[str, Any]) -> None:
+        """Add a fund or replace its postings after its data changed."""
+        self.remove_fund(fund_name, keep_order=True)
+        if fund_name not in self._order:
+            self._order[fund_name] = self._next
+            self._next += 1
+        order = self._order[fund_name]
+        key = (-fund_data.get('returns', 0), order)
+        nav = fund_data.get('nav', 0)
+        returns = fund_data.get('returns', 0)
+
+        symbols = list(fund_data.get('holdings', {}))
+        for symbol in symbols:
+            entry = {'fund_name': fund_name, 'allocation': fund_data['holdings'][symbol], 'nav': nav, 'returns': returns}
+            self._insert(self._by_symbol, symbol, (key, fund_name, entry))
+
+        sectors = [
+            sector for sector, exposure in fund_data.get('sector_allocation', {}).items()
+            if exposure > SECTOR_EXPOSURE_MIN
+        ]
+        for sector in sectors:
+            entry = {'fund_name': fund_name, 'sector_exposure': fund_data['sector_allocation'][sector],
+                     'nav': nav, 'returns': returns}
+            self._insert(self._by_sector, sector, (key, fund_name, entry))
+
+        self._keys[fund_name] = (symbols, sectors)
+
+    def _insert(self, postings: Dict[str, List[Tuple]], name: str, posting: Tuple) -> None:
+        if self._building:
+            postings.setdefault(name, []).append(posting)
+            return
+        current = postings.get(name, [])
+        i = bisect.bisect(current, posting)
+        postings[name] = current[:i] + [posting] + current[i:]
+
+    def copy(self) -> "HoldingsIndex":
+        """An independent index sharing the (never mutated) postings lists."""
+        clone = HoldingsIndex.__new__(HoldingsIndex)
+        clone._by_symbol = dict(self._by_symbol)
+        clone._by_sector = dict(self._by_sector)
+        clone._keys = dict(self._keys)
+        clone._order = dict(self._order)
+        clone._next = self._next
+        clone._building = False
+        return clone
+
+    def remove_fund(self, fund_name: str, keep_order: bool = False) -> None:
+        symbols, sectors = self._keys.pop(fund_name, ([], []))
+        for postings, names in ((self._by_symbol, symbols), (self._by_sector, sectors)):
+            for name in names:
+                postings[name] = [p for p in postings[name] if p[1] != fund_name]
+                if not postings[name]:
+                    del postings[name]
+        if not keep_order:
+            self._order.pop(fund_name, None)
+
+    def funds_holding(self, symbol: str, limit: int) -> List[Dict[str, Any]]:
+        return [dict(entry) for _, _, entry in self._by_symbol.get(symbol, [])[:limit]]
+
+    def funds_in_sector(self, sector: str, limit: int) -> List[Dict[str, Any]]:
+        return [dict(entry) for _, _, entry in self._by_sector.get(sector, [])[:limit]]
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+class MarketSnapshot:
+    """
+    One immutable version of the market data with the indexes and caches
+    derived from it. Replaced as a whole, never modified in place, so a reader
+    holding a snapshot always sees consistent data.
+    """
+
+    def __init__(self, stock_data: Dict[str, Any], mf_data: Dict[str, Any], mf_holdings: Dict[str, Any],
+                 source_stamps: Dict[str, Any] = None, holdings_index: HoldingsIndex = None,
+                 table: StockTable = None):
+        self.stock_data = stock_data
+        self.mf_data = mf_data
+        self.mf_holdings = mf_holdings
+        self.source_stamps = source_stamps or {}  # path -> (mtime_ns, size) it was loaded from
+        self.table = table if table is not None else StockTable(stock_data)
+        self.holdings_index = holdings_index if holdings_index is not None else HoldingsIndex(mf_data)
+        self.loaded_at = time.time()
+        self._summary: Optional[Dict[str, Any]] = None
+        self._fund_matcher: Optional[FundMatcher] = None
+
+    def with_fund(self, fund_name: str, fund_data: Dict[str, Any]) -> "MarketSnapshot":
+        """A new snapshot with one fund added or replaced; this one is unchanged."""
+        mf_data = dict(self.mf_data)
+        mf_data[fund_name] = fund_data
+        holdings_index = self.holdings_index.copy()
+        holdings_index.update_fund(fund_name, fund_data)
+        return MarketSnapshot(self.stock_data, mf_data, self.mf_holdings, self.source_stamps,
+                              holdings_index=holdings_index, table=self.table)
 
-    @lru_cache(maxsize=100)
     def get_stock_metrics(self, symbol: str) -> Dict[str, Any]:
         """Get metrics for a specific stock."""
         return self.stock_data.get(symbol, {})
 
-    @lru_cache(maxsize=50)
     def get_sector_performance(self, sector: str) -> Dict[str, float]:
         """Get performance metrics for a specific sector."""
-        sector_stocks = {
-            symbol: data for symbol, data in self.stock_data.items()
-            if data.get('sector') == sector
-        }
-        
-        if not sector_stocks:
-            return {}
+        return self.table.sector_performance(sector)
 
-        return {
-            'avg_returns': sum(stock['returns'] for stock in sector_stocks.values()) / len(sector_stocks),
-            'market_cap': sum(stock['market_cap'] for stock in sector_stocks.values()),
-            'volume': sum(stock['volume'] for stock in sector_stocks.values())
-        }
-
-    def get_relevant_funds(self, symbol: str = None, sector: str = None) -> List[Dict[str, Any]]:
+    def get_relevant_funds(self, symbol: str = None, sector: str = None, limit: int = 5) -> List[Dict[str, Any]]:
         """Get relevant mutual funds based on stock or sector."""
         relevant_funds = []
         
         if symbol:
             # Find funds holding this stock
-            relevant_funds.extend([
-                {
-                    'fund_name': fund_name,
-                    'allocation': fund_data['holdings'].get(symbol, 0),
-                    'nav': fund_data.get('nav', 0),
-                    'returns': fund_data.get('returns', 0)
-                }
-                for fund_name, fund_data in self.mf_data.items()
-                if symbol in fund_data.get('holdings', {})
-            ])
+            relevant_funds.extend(self.holdings_index.funds_holding(symbol, limit))
         
         if sector:
-            # Find sector-focused funds
-            relevant_funds.extend([
-                {
-                    'fund_name': fund_name,
-                    'sector_exposure': fund_data.get('sector_allocation', {}).get(sector, 0),
-                    'nav': fund_data.get('nav', 0),
-                    'returns': fund_data.get('returns', 0)
-                }
-                for fund_name, fund_data in self.mf_data.items()
-                if fund_data.get('sector_allocation', {}).get(sector, 0) > 20  # >20% exposure
-            ])
+            # Find sector-focused funds (>20% exposure)
+            relevant_funds.extend(self.holdings_index.funds_in_sector(sector, limit))
         
-        return sorted(relevant_funds, key=lambda x: x.get('returns', 0), reverse=True)[:5]
+        # Each list is already the top `limit` by returns; merge the two
+        return sorted(relevant_funds, key=lambda x: x.get('returns', 0), reverse=True)[:limit]
+
+    @property
+    def fund_matcher(self) -> FundMatcher:
+        """FundMatcher over every fund in the snapshot, built on first use and reused."""
+        if self._fund_matcher is None:
+            self._fund_matcher = FundMatcher(self.mf_data)
+        return self._fund_matcher
+
+    def match_entities(self, entities: List[str]) -> Tuple[List[str], List[str]]:
+        """Stock symbols and sectors named by a list of entities; a stock also implies its sector."""
+        symbols = [symbol for symbol in dict.fromkeys(entity.upper() for entity in entities) if symbol in self.stock_data]
+        sectors = [self.stock_data[symbol].get('sector') for symbol in symbols]
+        sectors += [entity.title() for entity in entities if entity.title() in self.table.sector_codes]
+        return symbols, [sector for sector in dict.fromkeys(sectors) if sector]
 
     def get_focused_analysis(self, query: str) -> Dict[str, Any]:
         """Get focused analysis based on the query."""
         # Extract symbols and sectors from query
         words = query.upper().split()
         symbols = [word for word in words if word in self.stock_data]
-        sectors = [word.title() for word in words if word.title() in self._get_all_sectors()]
+        sectors = [word.title() for word in words if word.title() in self.table.sector_codes]
         
         analysis = {
             'query_focus': query,
@@ -124,36 +290,34 @@ class StockDataManager:
 
         return analysis
 
-    @lru_cache(maxsize=1)
     def _get_all_sectors(self) -> List[str]:
         """Get list of all sectors."""
-        return list(set(stock.get('sector') for stock in self.stock_data.values() if stock.get('sector')))
+        return list(self.table.sectors)
 
     def get_market_summary(self) -> Dict[str, Any]:
-        """Get overall market summary."""
+        """Get overall market summary (computed once per snapshot)."""
         if not self.stock_data:
             return {}
+        if self._summary is None:
+            self._summary = self._market_summary()
+        return self._summary
 
-        total_market_cap = sum(stock['market_cap'] for stock in self.stock_data.values())
-        avg_pe = sum(stock['pe_ratio'] for stock in self.stock_data.values()) / len(self.stock_data)
-        
+    def _market_summary(self) -> Dict[str, Any]:
         return {
-            'total_market_cap': total_market_cap,
-            'average_pe': avg_pe,
-            'stock_count': len(self.stock_data),
-            'sectors': list(set(stock['sector'] for stock in self.stock_data.values())),
+            'total_market_cap': self.table.total_market_cap,
+            'average_pe': self.table.average_pe,
+            'stock_count': len(self.table),
+            'sectors': list(self.table.sectors),
             'top_gainers': self._get_top_movers(limit=5, ascending=False),
             'top_losers': self._get_top_movers(limit=5, ascending=True)
         }
 
     def _get_top_movers(self, limit: int = 5, ascending: bool = True) -> List[Dict[str, Any]]:
         """Get top gaining or losing stocks."""
-        sorted_stocks = sorted(
-            [{'symbol': k, **v} for k, v in self.stock_data.items()],
-            key=lambda x: x['returns'],
-            reverse=not ascending
-        )
-        return sorted_stocks[:limit]
+        return [
+            {'symbol': symbol, **self.stock_data[symbol]}
+            for symbol in self.table.top_movers(limit, ascending)
+        ]
 
     def get_stock_recommendation(self, symbol: str) -> Dict[str, Any]:
         """Get stock recommendation based on technical and fundamental analysis."""
@@ -161,19 +325,25 @@ class StockDataManager:
         if not stock:
             return {}
 
-        # Calculate basic metrics
+        # Calculate basic metrics (sector mean is precomputed per sector)
         pe_ratio = stock['pe_ratio']
-        avg_sector_pe = sum(s['pe_ratio'] for s in self.stock_data.values() 
-                          if s['sector'] == stock['sector']) / len(self.stock_data)
-        
+        avg_sector_pe = self.table.sector_mean(stock.get('sector'), 'pe_ratio')
+        # No sector, an unknown one or no peer PE (NaN), or no PE of its own: nothing to compare
+        if math.isnan(avg_sector_pe) or not avg_sector_pe or math.isnan(_number(pe_ratio)):
+            avg_sector_pe = None
+            recommendation, confidence = 'HOLD', 0
+        else:
+            recommendation = 'BUY' if pe_ratio < avg_sector_pe else 'HOLD'
+            confidence = min(100, max(0, int((avg_sector_pe - pe_ratio) / avg_sector_pe * 100)))
+
         return {
             'symbol': symbol,
             'current_price': stock['price'],
             'pe_ratio': pe_ratio,
             'sector_avg_pe': avg_sector_pe,
             'market_cap': stock['market_cap'],
-            'recommendation': 'BUY' if pe_ratio < avg_sector_pe else 'HOLD',
-            'confidence': min(100, max(0, int((avg_sector_pe - pe_ratio) / avg_sector_pe * 100))),
+            'recommendation': recommendation,
+            'confidence': confidence,
             'technical_indicators': {
                 'rsi': stock.get('rsi', 0),
                 'macd': stock.get('macd', 0),
@@ -181,5 +351,150 @@ class StockDataManager:
             }
         }
 
+
+class StockDataManager:
+    """
+    Serves queries from the current MarketSnapshot. `reload_if_changed` (run
+    periodically by `start_watching`) parses changed data files off the
+    request path and swaps in a new snapshot with a single assignment, so
+    readers never lock and never see a half-loaded state. Symbols missing from
+    the snapshot are looked up in `db` (the tables written by data_loader).
+    """
+
+    def __init__(self, stock_data_path: str = "data/stock_data.json",
+                 mf_data_path: str = "data/mutual_funds_data.json",
+                 mf_holdings_path: str = "data/mf_holdings_data.json", db: Optional[MarketDB] = None):
+        self.db = db
+        self.stock_data_path = stock_data_path
+        self.mf_data_path = mf_data_path
+        self.mf_holdings_path = mf_holdings_path
+        self._snapshot = MarketSnapshot({}, {}, {})
+        self._write_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._load_data()
+
+    @property
+    def snapshot(self) -> MarketSnapshot:
+        return self._snapshot
+
+    @property
+    def stock_data(self) -> Dict[str, Any]:
+        return self._snapshot.stock_data
+
+    @property
+    def mf_data(self) -> Dict[str, Any]:
+        return self._snapshot.mf_data
+
+    @property
+    def mf_holdings(self) -> Dict[str, Any]:
+        return self._snapshot.mf_holdings
+
+    @property
+    def table(self) -> StockTable:
+        return self._snapshot.table
+
+    @property
+    def fund_matcher(self) -> FundMatcher:
+        return self._snapshot.fund_matcher
+
+    @property
+    def holdings_index(self) -> HoldingsIndex:
+        return self._snapshot.holdings_index
+
+    def _paths(self) -> List[str]:
+        return [self.stock_data_path, self.mf_data_path, self.mf_holdings_path]
+
+    def _stamps(self) -> Dict[str, Any]:
+        stamps = {}
+        for path in self._paths():
+            try:
+                stat = os.stat(path)
+                stamps[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamps[path] = None
+        return stamps
+
+    def _load_data(self) -> bool:
+        """Load data from JSON files if they exist and swap in a new snapshot."""
+        stamps = self._stamps()
+        loaded = []
+        try:
+            for path in self._paths():
+                if os.path.exists(path):
+                    with open(path, 'r') as f:
+                        loaded.append(json.load(f))
+                else:
+                    loaded.append({})
+            snapshot = MarketSnapshot(*loaded, source_stamps=stamps)
+        except Exception as e:
+            # Keep serving the previous snapshot, e.g. while a file is half-written
+            print(f"Error loading data: {str(e)}")
+            return False
+        with self._write_lock:
+            self._snapshot = snapshot
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Reload when any data file's mtime or size changed; True if a new snapshot was swapped in."""
+        if self._stamps() == self._snapshot.source_stamps:
+            return False
+        return self._load_data()
+
+    def start_watching(self, interval: float = MARKET_DATA_POLL_INTERVAL) -> None:
+        """Poll the data files for changes in a background thread."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+
+        def watch():
+            while not self._stop.wait(interval):
+                self.reload_if_changed()
+
+        self._watcher = threading.Thread(target=watch, name="market-data-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def update_fund(self, fund_name: str, fund_data: Dict[str, Any]) -> None:
+        """
+        Add or replace a fund, keeping the holdings index in step. Applied
+        copy-on-write; the next reload from disk replaces it.
+        """
+        with self._write_lock:
+            self._snapshot = self._snapshot.with_fund(fund_name, fund_data)
+
+    # Each query reads the snapshot once, so it never mixes two versions
+    def get_stock_metrics(self, symbol: str) -> Dict[str, Any]:
+        metrics = self._snapshot.get_stock_metrics(symbol)
+        if not metrics and self.db is not None:
+            return self.db.get_stock(symbol) or {}
+        return metrics
+
+    def get_sector_performance(self, sector: str) -> Dict[str, float]:
+        return self._snapshot.get_sector_performance(sector)
+
+    def get_relevant_funds(self, symbol: str = None, sector: str = None, limit: int = 5) -> List[Dict[str, Any]]:
+        funds = self._snapshot.get_relevant_funds(symbol, sector, limit)
+        if not funds and symbol and not sector and self.db is not None:
+            return self.db.funds_holding(symbol, limit)
+        return funds
+
+    def get_focused_analysis(self, query: str) -> Dict[str, Any]:
+        return self._snapshot.get_focused_analysis(query)
+
+    def match_entities(self, entities: List[str]) -> Tuple[List[str], List[str]]:
+        return self._snapshot.match_entities(entities)
+
+    def get_market_summary(self) -> Dict[str, Any]:
+        return self._snapshot.get_market_summary()
+
+    def get_stock_recommendation(self, symbol: str) -> Dict[str, Any]:
+        return self._snapshot.get_stock_recommendation(symbol)
+
 # Initialize the manager
-stock_manager = StockDataManager() 
\ No newline at end of file
+stock_manager = StockDataManager(db=market_db)
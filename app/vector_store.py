@@ -1,130 +1,497 @@
 import numpy as np
-from typing import List, Dict, Any
-from openai import OpenAI
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import os
 import json
 import time
+import sqlite3
+import threading
 import faiss
 from dotenv import load_dotenv
 
+from app.embeddings import Embedder, get_embedder
+from app.metrics import timed
+
 load_dotenv()
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+# Compact the embedding file once dead rows exceed both this and the live row count
+COMPACT_MIN_DEAD_ROWS = 1024
+# Matrix file of a store that has never been compacted; compaction writes embeddings.<generation>.f32
+MATRIX_FILE = "embeddings.f32"
+# Evicted ids are dropped from FAISS in batches once there are more than this many
+# (or 1/16th of the index); until then searches skip them
+REMOVE_BATCH_SIZE = 256
+# Searches first ask the index for this many times top_k to skip over evicted ids
+OVERFETCH_FACTOR = 2
+VECTOR_STORE_MAX_HISTORY = int(os.getenv("VECTOR_STORE_MAX_HISTORY", "10"))
+
+# Index mode and tuning knobs, see build_index and benchmarks/bench_vector_index.py
+INDEX_MODES = ("flat", "ivf", "ivfpq", "hnsw")
+VECTOR_INDEX = os.getenv("VECTOR_INDEX", "flat")
+VECTOR_METRIC = os.getenv("VECTOR_METRIC", "l2")  # "l2" or "cosine"
+VECTOR_NLIST = int(os.getenv("VECTOR_NLIST", "1024"))
+VECTOR_NPROBE = int(os.getenv("VECTOR_NPROBE", "16"))
+VECTOR_PQ_M = int(os.getenv("VECTOR_PQ_M", "64"))  # must divide the dimension
+VECTOR_HNSW_M = int(os.getenv("VECTOR_HNSW_M", "32"))
+VECTOR_EF_CONSTRUCTION = int(os.getenv("VECTOR_EF_CONSTRUCTION", "80"))
+VECTOR_EF_SEARCH = int(os.getenv("VECTOR_EF_SEARCH", "64"))
+# IVF modes search exactly until there are this many vectors per list to train on
+TRAIN_POINTS_PER_LIST = 39
+# At most this many vectors per list are sampled for training
+MAX_TRAIN_POINTS_PER_LIST = 256
+
+
+def build_index(mode: str, dimension: int, metric: str = "l2", nlist: int = VECTOR_NLIST,
+                pq_m: int = VECTOR_PQ_M, hnsw_m: int = VECTOR_HNSW_M,
+                ef_construction: int = VECTOR_EF_CONSTRUCTION) -> faiss.Index:
+    """Empty FAISS index taking explicit ids. IVF indexes must be trained before use."""
+    if metric not in ("l2", "cosine"):
+        raise ValueError(f"Unknown metric: {metric}")
+    # Cosine similarity is the inner product of L2-normalised vectors
+    metric_type = faiss.METRIC_INNER_PRODUCT if metric == "cosine" else faiss.METRIC_L2
+
+    def flat():
+        return faiss.IndexFlatIP(dimension) if metric == "cosine" else faiss.IndexFlatL2(dimension)
+
+    if mode == "flat":
+        return faiss.IndexIDMap(flat())
+    if mode == "ivf":
+        return faiss.IndexIVFFlat(flat(), dimension, nlist, metric_type)
+    if mode == "ivfpq":
+        return faiss.IndexIVFPQ(flat(), dimension, nlist, pq_m, 8, metric_type)
+    if mode == "hnsw":
+        hnsw = faiss.IndexHNSWFlat(dimension, hnsw_m, metric_type)
+        hnsw.hnsw.efConstruction = ef_construction
+        return faiss.IndexIDMap(hnsw)
+    raise ValueError(f"Unknown index mode: {mode}")
+
+
+def set_search_params(index: faiss.Index, nprobe: int = VECTOR_NPROBE, ef_search: int = VECTOR_EF_SEARCH) -> None:
+    """Apply the query-time knobs of whichever index type this is"""
+    if isinstance(index, faiss.IndexIVF):
+        index.nprobe = nprobe
+    elif isinstance(index, faiss.IndexIDMap):
+        inner = faiss.downcast_index(index.index)
+        if isinstance(inner, faiss.IndexHNSW):
+            inner.hnsw.efSearch = ef_search
+
+
+class _ContextMap(Mapping):
+    """Read-only mapping of query -> context, read from the metadata sidecar on access"""
+
+    def __init__(self, store: "VectorStore"):
+        self._store = store
+
+    def __getitem__(self, query: str) -> Dict[str, Any]:
+        if query not in self._store._rows:
+            raise KeyError(query)
+        return self._store._load_context(query)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store._rows)
+
+    def __len__(self) -> int:
+        return len(self._store._rows)
+
+
+class _EmbeddingMap(Mapping):
+    """Read-only mapping of query -> embedding, each a view of its row in the memory map"""
+
+    def __init__(self, store: "VectorStore"):
+        self._store = store
+
+    def __getitem__(self, query: str) -> np.ndarray:
+        return self._store._row_vector(self._store._rows[query])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store._rows)
+
+    def __len__(self) -> int:
+        return len(self._store._rows)
+
 
 class VectorStore:
-    def __init__(self, persist_path="data/vector_store.json"):
+    def __init__(self, persist_path="data/vector_store", max_history: int = VECTOR_STORE_MAX_HISTORY,
+                 embedder: Embedder = None, index_mode: str = VECTOR_INDEX, metric: str = VECTOR_METRIC):
+        # A legacy JSON store next to the new directory is migrated on first load
+        if persist_path.endswith(".json"):
+            persist_path = persist_path[:-len(".json")]
         self.persist_path = persist_path
-        self.embeddings = {}  # Store embeddings
-        self.contexts = {}    # Store original context
-        self.max_history = 10 # Maximum number of historical entries
+        self.legacy_path = persist_path + ".json"
+        self.matrix_path = os.path.join(persist_path, MATRIX_FILE)  # replaced by the one recorded in the metadata
+        self.meta_path = os.path.join(persist_path, "metadata.db")
+        self.embeddings = _EmbeddingMap(self)  # Store embeddings
+        self.contexts = _ContextMap(self)  # Store original context
+        self.max_history = max_history # Maximum number of historical entries
         self.index = None     # FAISS index
-        self.dimension = 1536 # OpenAI embedding dimension
-        
+        self.index_mode = index_mode  # flat, ivf, ivfpq or hnsw
+        self.metric = metric  # l2 or cosine
+        self.nlist = VECTOR_NLIST  # IVF lists (coarse clusters)
+        self.nprobe = VECTOR_NPROBE  # IVF lists visited per query
+        self.ef_search = VECTOR_EF_SEARCH  # HNSW candidate list size per query
+        self.embedder = embedder or get_embedder()
+        self.dimension = self.embedder.dimension # Embedding dimension of the backend
+        self._rows = OrderedDict()  # query -> row of its embedding, oldest first
+        self._queries = {}    # row (= FAISS id) -> query
+        self._removed = set() # ids evicted but still in the FAISS index
+        self._n_rows = 0      # rows in the matrix file, including dead ones
+        self._meta = None     # sidecar metadata database
+        self._matrix = None   # read-only memory map of the matrix file
+        self._index_kind = "flat"  # mode of the index actually built (IVF falls back until trained)
+        self._index_generation = 0  # bumped whenever the index is replaced synchronously
+        self._rebuild_thread = None  # background HNSW rebuild, see _start_rebuild
+        self._rebuilt = None  # (generation, index, rows) it produced, swapped in by the owner
+
         # Initialize FAISS index
         self._init_faiss()
-        
+
         # Load persisted data if exists
         self._load_persisted_data()
 
-    def _init_faiss(self):
+    def _init_faiss(self, n_vectors: int = 0):
         """Initialize FAISS index for efficient similarity search"""
-        self.index = faiss.IndexFlatL2(self.dimension)
-        self.index_ids = []  # Store mapping between FAISS indices and query strings
+        if self.index_mode not in INDEX_MODES:
+            raise ValueError(f"Unknown index mode: {self.index_mode}")
+        # IVF needs enough vectors to train its coarse quantizer; search exactly until then
+        kind = self.index_mode
+        if kind in ("ivf", "ivfpq") and n_vectors < self.nlist * TRAIN_POINTS_PER_LIST:
+            kind = "flat"
+        # Ids are matrix rows, so entries can be removed without renumbering the rest
+        self.index = build_index(kind, self.dimension, self.metric, nlist=self.nlist)
+        self._index_kind = kind
+        self._index_generation += 1  # a background rebuild started before this is stale
+        self._removed = set()
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        """float32 rows ready for the index; normalised (as a copy) for cosine"""
+        if self.metric == "cosine":
+            vectors = np.array(vectors, dtype=np.float32, order='C')
+            faiss.normalize_L2(vectors)
+            return vectors
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def train_index(self) -> None:
+        """Rebuild the index, training IVF quantizers on the live vectors if there are enough"""
+        self._rebuild_faiss_index()
+
+    def _open_metadata(self):
+        os.makedirs(self.persist_path, exist_ok=True)
+        self._meta = sqlite3.connect(self.meta_path, check_same_thread=False)
+        self._meta.execute("PRAGMA journal_mode=WAL")
+        self._meta.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                row INTEGER PRIMARY KEY,
+                query TEXT NOT NULL,
+                context TEXT NOT NULL,
+                timestamp REAL NOT NULL,
+                live INTEGER NOT NULL DEFAULT 1
+            )
+        """)
+        self._meta.execute("CREATE INDEX IF NOT EXISTS idx_entries_query ON entries (query, live)")
+        # Name of the matrix file the entries' rows refer to, switched by compaction
+        self._meta.execute("CREATE TABLE IF NOT EXISTS store_info (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._meta.commit()
+        found = self._meta.execute("SELECT value FROM store_info WHERE key = 'matrix'").fetchone()
+        self.matrix_path = os.path.join(self.persist_path, found[0] if found else MATRIX_FILE)
+        self._remove_stale_matrices()
+
+    def _remove_stale_matrices(self):
+        """Delete matrix files left by a compaction interrupted before or after its commit"""
+        for name in os.listdir(self.persist_path):
+            path = os.path.join(self.persist_path, name)
+            if name.startswith("embeddings.") and name.endswith((".f32", ".tmp")) and path != self.matrix_path:
+                os.remove(path)
 
     def _load_persisted_data(self):
-        """Load persisted data from disk"""
-        if os.path.exists(self.persist_path):
-            with open(self.persist_path, 'r') as f:
-                data = json.load(f)
-                self.embeddings = {k: np.array(v) for k, v in data['embeddings'].items()}
-                self.contexts = data['contexts']
-                
-                # Rebuild FAISS index
-                if self.embeddings:
-                    self._rebuild_faiss_index()
-
-    def _persist_data(self):
-        """Save data to disk"""
-        os.makedirs(os.path.dirname(self.persist_path), exist_ok=True)
-        with open(self.persist_path, 'w') as f:
-            data = {
-                'embeddings': {k: v.tolist() for k, v in self.embeddings.items()},
-                'contexts': self.contexts
-            }
-            json.dump(data, f)
+        """Memory-map the embedding matrix and read the live entries from the sidecar"""
+        migrate = not os.path.exists(self.meta_path) and os.path.exists(self.legacy_path)
+        self._open_metadata()
+        if migrate:
+            self._migrate_legacy_json()
+            return
+
+        # A crash between the two appends can leave rows without metadata; they are dead
+        row_bytes = 4 * self.dimension
+        file_rows = os.path.getsize(self.matrix_path) // row_bytes if os.path.exists(self.matrix_path) else 0
+        if file_rows and os.path.getsize(self.matrix_path) != file_rows * row_bytes:
+            with open(self.matrix_path, 'r+b') as f:
+                f.truncate(file_rows * row_bytes)
+        self._n_rows = file_rows
+
+        # Rows are appended in time order, so row order is also eviction order
+        self._rows = OrderedDict(
+            (query, row) for row, query in self._meta.execute(
+                "SELECT row, query FROM entries WHERE live = 1 AND row < ? ORDER BY row", (file_rows,)
+            )
+        )
+        if self._rows:
+            self._rebuild_faiss_index()
+
+    def _map_matrix(self):
+        """Memory-map every row written so far; nothing is read until it is accessed"""
+        if not self._n_rows:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(
+            self.matrix_path, dtype=np.float32, mode='r', shape=(self._n_rows, self.dimension)
+        ).view(np.ndarray)
+
+    def _row_vector(self, row: int) -> np.ndarray:
+        if self._matrix is None or row >= len(self._matrix):
+            self._map_matrix()
+        return self._matrix[row]
+
+    def _migrate_legacy_json(self):
+        with open(self.legacy_path, 'r') as f:
+            data = json.load(f)
+        entries = sorted(data['contexts'].items(), key=lambda x: x[1]['timestamp'])
+        for query, context in entries:
+            self._append(query, np.asarray(data['embeddings'][query], dtype=np.float32), context)
+        self._meta.commit()
+        self._rebuild_faiss_index()
+
+    def _append(self, query: str, embedding: np.ndarray, context: Dict[str, Any]) -> int:
+        """
+        Append one embedding row and its metadata; earlier entries for the query die.
+        The caller commits once the rows are written.
+        """
+        with open(self.matrix_path, 'ab') as f:
+            f.write(np.ascontiguousarray(embedding, dtype=np.float32).tobytes())
+        row = self._n_rows
+        self._n_rows += 1
+        self._meta.execute("UPDATE entries SET live = 0 WHERE query = ? AND live = 1", (query,))
+        self._meta.execute(
+            "INSERT INTO entries (row, query, context, timestamp) VALUES (?, ?, ?, ?)",
+            (row, query, json.dumps(context), context['timestamp'])
+        )
+        self._rows.pop(query, None)
+        self._rows[query] = row
+        self._queries[row] = query
+        return row
+
+    def _load_context(self, query: str) -> Dict[str, Any]:
+        found = self._meta.execute(
+            "SELECT context FROM entries WHERE row = ?", (self._rows[query],)
+        ).fetchone()
+        return json.loads(found[0])
+
+    def _compact(self):
+        """
+        Write the live rows to a new matrix file, then renumber the metadata
+        and point it at the new file in one transaction. Until that commits
+        the old file and rows stay valid, so a crash at any point leaves a
+        consistent store; the file no longer referenced is deleted on open.
+        """
+        live = list(self._rows.items())  # already in row order
+        generation = int(self._meta.execute(
+            "SELECT COALESCE(MAX(CAST(value AS INTEGER)), 0) FROM store_info WHERE key = 'generation'"
+        ).fetchone()[0]) + 1
+        new_name = f"embeddings.{generation}.f32"
+        new_path = os.path.join(self.persist_path, new_name)
+        with open(new_path, 'wb') as f:
+            for _, row in live:
+                f.write(self._row_vector(row).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+        try:
+            self._meta.execute("DELETE FROM entries WHERE live = 0")
+            # Rows only move down, so renumbering in ascending order never collides
+            for new_row, (query, old_row) in enumerate(live):
+                if new_row != old_row:
+                    self._meta.execute("UPDATE entries SET row = ? WHERE row = ?", (new_row, old_row))
+            self._meta.executemany("INSERT OR REPLACE INTO store_info VALUES (?, ?)",
+                                   [("matrix", new_name), ("generation", str(generation))])
+            self._meta.commit()
+        except Exception:
+            self._meta.rollback()
+            os.remove(new_path)
+            raise
+
+        old_path, self.matrix_path = self.matrix_path, new_path
+        self._matrix = None
+        os.remove(old_path)
+        for new_row, (query, _) in enumerate(live):
+            self._rows[query] = new_row
+        self._n_rows = len(live)
+        self._rebuild_faiss_index()
+
+    def _maybe_compact(self):
+        dead = self._n_rows - len(self._rows)
+        if dead > COMPACT_MIN_DEAD_ROWS and dead > len(self._rows):
+            self._compact()
 
     def _rebuild_faiss_index(self):
-        """Rebuild FAISS index from current embeddings"""
-        self._init_faiss()
-        embeddings_array = np.array(list(self.embeddings.values()))
-        self.index.add(embeddings_array)
-        self.index_ids = list(self.embeddings.keys())
+        """Rebuild FAISS index from the live rows of the matrix file"""
+        self._map_matrix()
+        self._init_faiss(len(self._rows))
+        if self._rows:
+            rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+            if len(rows) == len(self._matrix) and (rows == np.arange(len(rows))).all():
+                vectors = self._prepare(self._matrix)  # compacted file: no gather needed
+            else:
+                vectors = self._prepare(self._matrix[rows])
+            if not self.index.is_trained:
+                sample_size = min(len(rows), self.nlist * MAX_TRAIN_POINTS_PER_LIST)
+                sample = np.random.default_rng(0).choice(len(rows), size=sample_size, replace=False)
+                self.index.train(vectors[np.sort(sample)])
+            self.index.add_with_ids(vectors, rows)
+        self._queries = {row: query for query, row in self._rows.items()}
+
+    def _start_rebuild(self):
+        """
+        Build a tombstone-free HNSW index from the current live rows in a
+        background thread (faiss releases the GIL), so the add that crossed
+        the threshold doesn't stall. The caller's thread swaps it in later.
+        """
+        if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+            return
+        self._map_matrix()
+        matrix, generation = self._matrix, self._index_generation
+        rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+
+        def build():
+            index = build_index("hnsw", self.dimension, self.metric)
+            if len(rows):
+                index.add_with_ids(self._prepare(matrix[rows]), rows)
+            self._rebuilt = (generation, index, set(rows.tolist()))
+
+        self._rebuild_thread = threading.Thread(target=build, name="vector-index-rebuild", daemon=True)
+        self._rebuild_thread.start()
+
+    def _swap_rebuilt_index(self, wait: bool = False):
+        """Install a finished background rebuild, catching it up with rows added or removed since"""
+        if wait and self._rebuild_thread is not None:
+            self._rebuild_thread.join()
+        rebuilt, self._rebuilt = self._rebuilt, None
+        if rebuilt is None:
+            return
+        generation, index, built_rows = rebuilt
+        if generation != self._index_generation:
+            return  # the index was rebuilt or the rows renumbered meanwhile
+        added = [row for row in self._queries if row not in built_rows]
+        if added:
+            index.add_with_ids(self._prepare(np.stack([self._row_vector(row) for row in added])),
+                               np.array(added, dtype=np.int64))
+        self.index = index
+        self._removed = {row for row in built_rows if row not in self._queries}
+
+    def create_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Create embeddings for many texts in as few backend calls as possible (cached)"""
+        with timed("embedding"):
+            return self.embedder.embed(texts)
 
     def create_embedding(self, text: str) -> List[float]:
-        """Create embedding for a given text using OpenAI API"""
-        response = client.embeddings.create(
-            model="text-embedding-ada-002",
-            input=text
-        )
-        return response.data[0].embedding
-
-    def add_context(self, query: str, response: str, entities: List[str] = None) -> None:
-        """Add new context with its embedding"""
-        # Create combined context
-        context = {
-            'query': query,
-            'response': response,
-            'entities': entities or [],
-            'timestamp': time.time()
-        }
-        
-        # Create embedding for the query
-        embedding = np.array(self.create_embedding(query), dtype=np.float32)
-        
-        # Store in memory
-        self.embeddings[query] = embedding
-        self.contexts[query] = context
-        
-        # Update FAISS index
-        self.index.add(embedding.reshape(1, -1))
-        self.index_ids.append(query)
-        
-        # Maintain history limit
-        if len(self.embeddings) > self.max_history:
-            oldest_query = min(self.contexts.items(), key=lambda x: x[1]['timestamp'])[0]
-            self._remove_context(oldest_query)
-        
-        # Persist data
-        self._persist_data()
+        """Create embedding for a given text"""
+        return self.create_embeddings([text])[0].tolist()
+
+    def add_context(self, query: str, response: str, entities: List[str] = None,
+                    metadata: Dict[str, Any] = None) -> None:
+        """Add new context with its embedding; `metadata` is stored with the context"""
+        self.add_contexts([(query, response, entities)], [metadata] if metadata else None)
+
+    def add_contexts(self, entries: List[Tuple[str, str, List[str]]],
+                     metadata: List[Dict[str, Any]] = None, embeddings: np.ndarray = None) -> None:
+        """Add several (query, response, entities) contexts with one embedding call, unless `embeddings` are given"""
+        if embeddings is None:
+            embeddings = self.create_embeddings([query for query, _, _ in entries])
+        self._swap_rebuilt_index()
+        try:
+            self._add_rows(entries, metadata, embeddings)
+        finally:
+            # One commit per batch, after its rows are in the matrix file, so the
+            # metadata never refers to rows a crash could lose
+            self._meta.commit()
+
+        # Switch to the trained IVF index once enough vectors have accumulated
+        if self._index_kind != self.index_mode and len(self._rows) >= self.nlist * TRAIN_POINTS_PER_LIST:
+            self.train_index()
+
+        self._maybe_compact()
+
+    def _add_rows(self, entries: List[Tuple[str, str, List[str]]], metadata: Optional[List[Dict[str, Any]]],
+                  embeddings: np.ndarray) -> None:
+        for i, ((query, response, entities), embedding) in enumerate(zip(entries, embeddings)):
+            # Create combined context
+            context = {
+                **(metadata[i] if metadata else {}),
+                'query': query,
+                'response': response,
+                'entities': entities or [],
+                'timestamp': time.time()
+            }
+
+            # Asking the same question again replaces the earlier entry
+            if query in self._rows:
+                self._remove_context(query)
+
+            # Persist (append-only) and update FAISS index
+            row = self._append(query, embedding, context)
+            self.index.add_with_ids(self._prepare(embedding.reshape(1, -1)), np.array([row], dtype=np.int64))
+
+            # Maintain history limit
+            while len(self._rows) > self.max_history:
+                self._remove_context(next(iter(self._rows)))
 
     def _remove_context(self, query: str):
-        """Remove context and its embedding"""
-        if query in self.embeddings:
-            del self.embeddings[query]
-            del self.contexts[query]
-            self._rebuild_faiss_index()
+        """Remove context and its embedding; committed with the rest of the batch"""
+        if query in self._rows:
+            row = self._rows.pop(query)
+            del self._queries[row]
+            self._meta.execute("UPDATE entries SET live = 0 WHERE row = ?", (row,))
+            self._removed.add(row)
+            if len(self._removed) > max(REMOVE_BATCH_SIZE, self.index.ntotal // 16):
+                if self._index_kind == "hnsw":
+                    # HNSW graphs cannot delete nodes, so the tombstones go with a rebuild;
+                    # searches skip them until it is swapped in
+                    self._start_rebuild()
+                else:
+                    self.index.remove_ids(np.fromiter(self._removed, dtype=np.int64, count=len(self._removed)))
+                    self._removed = set()
+
+    def _search(self, embedding: np.ndarray, top_k: int) -> List[Tuple[str, float]]:
+        """(query, score) of the nearest live entries: L2 distance, or cosine similarity"""
+        self._swap_rebuilt_index()
+        set_search_params(self.index, self.nprobe, self.ef_search)
+        query = self._prepare(embedding.reshape(1, -1))
+        # Evicted ids not yet removed from the index can take up result slots. Fetch a
+        # little extra, and more only if too few live entries came back.
+        most = min(top_k + len(self._removed), self.index.ntotal)
+        fetch = min(top_k * OVERFETCH_FACTOR, most)
+        while True:
+            scores, indices = self.index.search(query, max(fetch, 1))
+            found = []
+            for score, idx in zip(scores[0], indices[0]):
+                if idx in self._queries:  # Skip empty slots (-1) and evicted ids
+                    found.append((self._queries[idx], float(score)))
+                    if len(found) == top_k:
+                        return found
+            if fetch >= most:
+                return found
+            fetch = min(fetch * 4, most)
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[Dict[str, Any], float]]:
+        """Most similar contexts with their score (L2 distance, or cosine similarity)"""
+        return self.search_embedding(self.create_embeddings([query])[0], top_k)
+
+    def search_embedding(self, embedding: np.ndarray, top_k: int = 3) -> List[Tuple[Dict[str, Any], float]]:
+        """Same as `search` for a query embedded beforehand with `create_embeddings`"""
+        return [(self.contexts[query_str], score) for query_str, score in self._search(embedding, top_k)]
 
     def find_similar_contexts(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
         """Find most similar contexts to the query using FAISS"""
-        query_embedding = np.array(self.create_embedding(query), dtype=np.float32)
-        
-        # Search in FAISS index
-        distances, indices = self.index.search(query_embedding.reshape(1, -1), top_k)
-        
+        query_embedding = self.create_embeddings([query])[0]
+
         # Get similar contexts
-        similar_contexts = []
-        for idx in indices[0]:
-            if idx < len(self.index_ids):  # Ensure index is valid
-                query_str = self.index_ids[idx]
-                similar_contexts.append(self.contexts[query_str])
-            
-        return similar_contexts
+        return [self.contexts[query_str] for query_str, _ in self._search(query_embedding, top_k)]
 
     def get_relevant_entities(self, query: str) -> List[str]:
         """Extract relevant entities from similar contexts"""
         similar_contexts = self.find_similar_contexts(query)
         entities = set()
-        
+
         for context in similar_contexts:
             entities.update(context['entities'])
-            
-        return list(entities) 
\ No newline at end of file
+
+        return list(entities)
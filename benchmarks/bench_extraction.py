@@ -0,0 +1,85 @@
+"""
+Micro-benchmark of the HTML extraction engines over the synthetic pages in
+benchmarks/fixtures (see benchmarks/fixtures/README.md). Every engine is
+checked against the BeautifulSoup reference before it is timed.
+
+    python -m benchmarks.bench_extraction [--repeat 20] [--json]
+"""
+import argparse
+import json
+import os
+import time
+
+from app.extraction import LxmlExtractor, SelectolaxExtractor, SelectolaxParser, SoupExtractor, etree
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# (fixture, kind, arguments) mirroring NEWS_SOURCES
+CASES = [
+    ("moneycontrol_listing.html", "listing", ("li.clearfix", "h2", "")),
+    ("business_standard_listing.html", "listing", (".article-list li", "h2", "https://www.business-standard.com")),
+    ("moneycontrol_article.html", "article_text", ("content_wrapper",)),
+    ("economictimes_article.html", "article_text", ("artText",)),
+    ("livemint_article.html", "article_text", ("mainArea",)),
+    ("business_standard_article.html", "article_text", ("article-content",)),
+]
+
+
+def load_cases():
+    cases = []
+    for name, kind, args in CASES:
+        with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+            cases.append((name, kind, f.read(), args))
+    return cases
+
+
+def run_engine(engine, cases, repeat: int) -> float:
+    """Seconds per pass over all fixtures (best of `repeat`)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, kind, html, args in cases:
+            getattr(engine, kind)(html, *args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    cases = load_cases()
+    engines = [SoupExtractor(), SoupExtractor(features="lxml")]
+    engines[1].name = "soup+lxml"
+    if etree is not None:
+        engines.append(LxmlExtractor())
+    if SelectolaxParser is not None:
+        engines.append(SelectolaxExtractor())
+
+    reference = engines[0]
+    results = []
+    for engine in engines:
+        for name, kind, html, case_args in cases:
+            expected = getattr(reference, kind)(html, *case_args)
+            if getattr(engine, kind)(html, *case_args) != expected:
+                raise SystemExit(f"{engine.name} output differs from BeautifulSoup on {name}")
+        seconds = run_engine(engine, cases, args.repeat)
+        results.append({"engine": engine.name, "seconds_per_pass": seconds, "pages": len(cases)})
+
+    baseline = results[0]["seconds_per_pass"]
+    for result in results:
+        result["speedup"] = baseline / result["seconds_per_pass"]
+
+    if args.json:
+        print(json.dumps({"benchmark": "extraction", "results": results}, indent=2))
+        return
+    print(f"{'engine':<12} {'ms/page':>10} {'speedup':>8}")
+    for result in results:
+        ms = result["seconds_per_pass"] * 1000 / result["pages"]
+        print(f"{result['engine']:<12} {ms:>10.2f} {result['speedup']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compares the inverted holdings index behind StockDataManager.get_relevant_funds
+with the previous scan over every fund, on a synthetic mutual fund universe.
+
+    python -m benchmarks.bench_holdings [--funds 5000] [--symbols 2000] [--lookups 500] [--json]
+"""
+import argparse
+import json
+import random
+import time
+
+from app.stock_data_manager import HoldingsIndex, MarketSnapshot
+
+SECTORS = ["Banking", "It", "Pharma", "Energy", "Auto", "Fmcg", "Metals", "Realty", "Telecom", "Infra"]
+
+
+def make_funds(n_funds: int, n_symbols: int, rng: random.Random):
+    funds = {}
+    for i in range(n_funds):
+        holdings = {f"SYM{s}": round(rng.uniform(0.5, 8), 2) for s in rng.sample(range(n_symbols), 50)}
+        weights = [rng.random() ** 3 for _ in SECTORS]
+        total = sum(weights)
+        funds[f"Fund {i}"] = {
+            "nav": round(rng.uniform(10, 500), 2),
+            "returns": round(rng.uniform(-5, 40), 1),
+            "holdings": holdings,
+            "sector_allocation": {s: round(100 * w / total, 1) for s, w in zip(SECTORS, weights)},
+        }
+    return funds
+
+
+def scan_relevant_funds(mf_data, symbol=None, sector=None):
+    """The previous implementation: a pass over every fund per lookup."""
+    relevant_funds = []
+    if symbol:
+        relevant_funds.extend([
+            {'fund_name': fund_name, 'allocation': fund_data['holdings'].get(symbol, 0),
+             'nav': fund_data.get('nav', 0), 'returns': fund_data.get('returns', 0)}
+            for fund_name, fund_data in mf_data.items()
+            if symbol in fund_data.get('holdings', {})
+        ])
+    if sector:
+        relevant_funds.extend([
+            {'fund_name': fund_name, 'sector_exposure': fund_data.get('sector_allocation', {}).get(sector, 0),
+             'nav': fund_data.get('nav', 0), 'returns': fund_data.get('returns', 0)}
+            for fund_name, fund_data in mf_data.items()
+            if fund_data.get('sector_allocation', {}).get(sector, 0) > 20
+        ])
+    return sorted(relevant_funds, key=lambda x: x.get('returns', 0), reverse=True)[:5]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--funds", type=int, default=5000)
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    funds = make_funds(args.funds, args.symbols, rng)
+    queries = [(f"SYM{rng.randrange(args.symbols)}", rng.choice(SECTORS + [None])) for _ in range(args.lookups)]
+
+    start = time.perf_counter()
+    expected = [scan_relevant_funds(funds, symbol, sector) for symbol, sector in queries]
+    scan_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = HoldingsIndex(funds)
+    build_seconds = time.perf_counter() - start
+
+    snapshot = MarketSnapshot({}, funds, {}, holdings_index=index)
+    start = time.perf_counter()
+    actual = [snapshot.get_relevant_funds(symbol, sector) for symbol, sector in queries]
+    index_seconds = time.perf_counter() - start
+
+    if actual != expected:
+        raise SystemExit("Holdings index results differ from the scan")
+
+    result = {
+        "benchmark": "holdings",
+        "funds": args.funds,
+        "symbols": args.symbols,
+        "lookups": args.lookups,
+        "scan_ms_per_lookup": scan_seconds / args.lookups * 1000,
+        "index_ms_per_lookup": index_seconds / args.lookups * 1000,
+        "index_build_seconds": build_seconds,
+        "speedup": scan_seconds / index_seconds,
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"scan over funds: {result['scan_ms_per_lookup']:8.3f}ms/lookup")
+        print(f"holdings index:  {result['index_ms_per_lookup']:8.3f}ms/lookup  ({result['speedup']:.0f}x, "
+              f"built in {build_seconds:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Compares FundMatcher with calling is_related for every article x fund pair
+on synthetic fund names and NER output.
+
+    python -m benchmarks.bench_matcher [--funds 2000] [--articles 50] [--json]
+"""
+import argparse
+import json
+import random
+import time
+
+from app.match_utils import FundMatcher, is_related, rapid_process
+
+AMCS = ["HDFC", "ICICI Prudential", "SBI", "Axis", "Kotak", "Nippon India", "Aditya Birla Sun Life",
+        "UTI", "Mirae Asset", "DSP", "Tata", "Franklin India", "Parag Parikh", "Motilal Oswal", "Quant"]
+STYLES = ["Bluechip", "Flexi Cap", "Midcap", "Small Cap", "Large & Mid Cap", "Banking & PSU Debt",
+          "Nifty 50 Index", "Nifty Next 50 Index", "Technology", "Pharma & Healthcare", "Infrastructure",
+          "Value", "Focused 25", "Balanced Advantage", "Liquid", "Gilt", "ELSS Tax Saver", "Consumption"]
+PLANS = ["Fund", "Fund - Direct Plan", "Fund - Regular Plan", "ETF", "Fund - Growth", "Fund - IDCW"]
+ENTITIES = ["Reliance Industries", "Infosys", "TCS", "HDFC Bank", "ICICI Bank", "Sensex", "Nifty",
+            "RBI", "Sebi", "Mumbai", "Adani Ports", "Bajaj Finance", "Tata Motors", "Monday",
+            "Q4", "FY25", "Sunil Singhania", "Wall Street", "US Fed", "Nifty Bank", "crude oil",
+            "Maruti Suzuki", "Axis Bank", "SBI", "Kotak Mahindra Bank", "Nifty IT", "rupee", "BSE"]
+
+
+def make_funds(n: int, rng: random.Random):
+    return [f"{rng.choice(AMCS)} {rng.choice(STYLES)} {rng.choice(PLANS)} {i}" for i in range(n)]
+
+
+def make_articles(n: int, rng: random.Random):
+    return [rng.sample(ENTITIES, rng.randint(5, 20)) for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--funds", type=int, default=2000)
+    parser.add_argument("--articles", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    funds = make_funds(args.funds, rng)
+    articles = make_articles(args.articles, rng)
+
+    start = time.perf_counter()
+    expected = [[fund for fund in funds if is_related(entities, fund)] for entities in articles]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = FundMatcher(funds)
+    actual = matcher.match_batch(articles)
+    matcher_seconds = time.perf_counter() - start
+
+    if actual != expected:
+        raise SystemExit("FundMatcher results differ from is_related")
+
+    result = {
+        "benchmark": "matcher",
+        "funds": args.funds,
+        "articles": args.articles,
+        "matches": sum(len(m) for m in actual),
+        "rapidfuzz": rapid_process is not None,
+        "legacy_seconds": legacy_seconds,
+        "matcher_seconds": matcher_seconds,
+        "speedup": legacy_seconds / matcher_seconds,
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"is_related per pair: {legacy_seconds:8.3f}s")
+        print(f"FundMatcher batch:   {matcher_seconds:8.3f}s  ({result['speedup']:.1f}x, "
+              f"{result['matches']} matches, rapidfuzz={result['rapidfuzz']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+Offline end-to-end benchmark of news refresh, NLP, vector search and /analyze.
+Synthetic pages from benchmarks/fixtures are served by a local stub server,
+which also stands in for the LLM; embeddings use the hash backend and NLP
+uses lightweight fake models unless --real-models is given. Every cache and
+database lives in a temporary directory, so runs are repeatable.
+
+    python -m benchmarks.bench_suite [--quick] [--sizes 1000,10000,50000] [--requests 200]
+        [--concurrency 16] [--llm-latency 0.05] [--output results.json]
+        [--compare baseline.json] [--tolerance 0.2] [--json]
+
+With --compare, exits non-zero if a metric is worse than the baseline by more
+than the tolerance (latencies higher, throughputs lower).
+"""
+import argparse
+import asyncio
+import atexit
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+WORK_DIR = tempfile.mkdtemp(prefix="newssense-bench-")
+atexit.register(shutil.rmtree, WORK_DIR, True)
+
+# Must be set before the app modules read them at import
+for name, value in (("OPENAI_API_KEY", "bench"), ("EMBEDDING_BACKEND", "hash"), ("EMBEDDING_DIMENSION", "384"),
+                    ("HTTP_CACHE_PATH", "http_cache.db"), ("NLP_CACHE_PATH", "nlp_cache.db"),
+                    ("EMBEDDING_CACHE_PATH", "embedding_cache.db"), ("ANSWER_CACHE_PATH", "answer_cache"),
+                    ("SENTIMENT_DB_PATH", "sentiment.db")):
+    os.environ[name] = os.path.join(WORK_DIR, value) if name.endswith("_PATH") else value
+
+import httpx  # noqa: E402
+import numpy as np  # noqa: E402
+from openai import AsyncOpenAI  # noqa: E402
+
+from app import main as api  # noqa: E402
+from app import nlp_processor  # noqa: E402
+from app.answer_cache import SemanticAnswerCache  # noqa: E402
+from app.article_store import ArticleStore  # noqa: E402
+from app.async_news_scraper import AsyncFinancialNewsScraper  # noqa: E402
+from app.embeddings import Embedder, HashEmbeddingBackend  # noqa: E402
+from app.http_cache import HttpCache  # noqa: E402
+from app.ingestion import IngestionScheduler  # noqa: E402
+from app.nlp_cache import NLPResultCache  # noqa: E402
+from app.openai_client import AsyncLLMClient  # noqa: E402
+from app.vector_store import VectorStore  # noqa: E402
+from benchmarks.stub_server import StubServer  # noqa: E402
+
+POSITIVE = {"gain", "gains", "rally", "rose", "surge", "growth", "beat", "strong", "inflows", "record"}
+NEGATIVE = {"fell", "fall", "slump", "losses", "weak", "outflows", "decline", "miss", "selloff", "slipped"}
+TOPICS = ["Nifty", "Sensex", "HDFC Bank", "Infosys", "Reliance", "TCS", "ICICI Bank", "metal stocks",
+          "IT sector", "banking sector", "midcap funds", "smallcap funds", "the rupee", "FII flows",
+          "crude oil", "gold ETFs", "auto stocks", "pharma stocks", "PSU banks", "SIP inflows"]
+ASKS = ["Why is {} down today", "What is driving {} this week", "Should I worry about {}",
+        "How did {} react to the RBI policy", "What do analysts expect for {}", "Is {} overvalued now"]
+
+
+class _FakeDoc:
+    def __init__(self, text: str):
+        self.ents = [_FakeEntity(m) for m in re.findall(r"\b[A-Z][a-zA-Z]+(?: [A-Z][a-zA-Z]+)*", text)]
+
+
+class _FakeEntity:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeNLP:
+    """Capitalised phrases as entities, with spaCy's `pipe` interface"""
+
+    def pipe(self, texts, batch_size=None):
+        return (_FakeDoc(text) for text in texts)
+
+
+def fake_summarizer(texts, batch_size=None):
+    return [{"summary_text": text.split(". ")[0][:200]} for text in texts]
+
+
+def fake_sentiment(texts, batch_size=None):
+    results = []
+    for text in texts:
+        words = re.findall(r"\w+", text.lower())
+        score = sum(w in POSITIVE for w in words) - sum(w in NEGATIVE for w in words)
+        results.append({"label": "POSITIVE" if score >= 0 else "NEGATIVE", "score": min(0.5 + abs(score) / 10, 1.0)})
+    return results
+
+
+def percentiles(seconds):
+    ms = sorted(s * 1000 for s in seconds)
+    pick = lambda q: ms[min(len(ms) - 1, int(q * len(ms)))]  # noqa: E731
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "mean_ms": statistics.fmean(ms)}
+
+
+def questions(n: int, offset: int = 0):
+    """Distinct questions, far enough apart not to hit the semantic answer cache"""
+    return [ASKS[i % len(ASKS)].format(TOPICS[(i // len(ASKS)) % len(TOPICS)])
+            + f" (case {i}: {' '.join(TOPICS[(i * 7 + j) % len(TOPICS)] for j in range(3))})?"
+            for i in range(offset, offset + n)]
+
+
+async def bench_refresh(server: StubServer, repeat: int):
+    """Cold refresh with empty caches, then warm ones answered by 304s and the article store"""
+    scraper = AsyncFinancialNewsScraper(sources=server.news_sources(), per_host_limit=16,
+                                        requests_per_second=10000, burst=10000,
+                                        cache=HttpCache(os.path.join(WORK_DIR, "refresh_http.db")),
+                                        store=ArticleStore(os.path.join(WORK_DIR, "refresh_articles.db")))
+    scheduler = IngestionScheduler(fetch=scraper.get_all_news, store=scraper.store)
+    requests = server.requests
+    start = time.perf_counter()
+    snapshot = await scheduler.refresh_async()
+    cold = time.perf_counter() - start
+    cold_requests = server.requests - requests
+
+    warm = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await scheduler.refresh_async()
+        warm.append(time.perf_counter() - start)
+    await scraper.aclose()
+    if snapshot is None or scheduler.last_error:
+        raise SystemExit(f"refresh against the stub server failed: {scheduler.last_error}")
+    result = {
+        "articles": len(snapshot.articles),
+        "requests": cold_requests,
+        "cold_seconds": cold,
+        "warm_seconds": statistics.median(warm),
+    }
+    return result, scheduler
+
+
+def bench_nlp(articles, count: int, repeat: int):
+    """Articles/s through process_articles, uncached and from a warm NLP cache"""
+    # Vary the content so every article is a distinct cache entry
+    batch = [dict(article, content=f"Item {i}. " + article["content"])
+             for i, article in enumerate(articles[i % len(articles)] for i in range(count))]
+    uncached = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = nlp_processor.process_articles(batch, cache=None)
+        uncached.append(time.perf_counter() - start)
+    if len(results) != len(batch):
+        raise SystemExit("process_articles returned the wrong number of results")
+
+    cache = NLPResultCache(os.path.join(WORK_DIR, "nlp_bench.db"))
+    nlp_processor.process_articles(batch, cache=cache)
+    cached = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        again = nlp_processor.process_articles(batch, cache=cache)
+        cached.append(time.perf_counter() - start)
+    if again != results:
+        raise SystemExit("cached NLP results differ from computed ones")
+    return {
+        "articles": len(batch),
+        "uncached_articles_per_second": len(batch) / min(uncached),
+        "cached_articles_per_second": len(batch) / min(cached),
+    }
+
+
+def bench_vector_search(sizes, queries: int, k: int, dim: int):
+    """Build time and single-query QPS of VectorStore at each size"""
+    rng = np.random.default_rng(0)
+    vocabulary = [f"w{i}" for i in range(5000)] + [topic.lower() for topic in TOPICS]
+    results = {}
+    for n in sizes:
+        path = os.path.join(WORK_DIR, f"vectors_{n}")
+        store = VectorStore(persist_path=path, max_history=n,
+                            embedder=Embedder(HashEmbeddingBackend(dim), cache=None))
+        texts = [" ".join(rng.choice(vocabulary, 12)) + f" {i}" for i in range(n)]
+        start = time.perf_counter()
+        store.add_contexts([(text, "", None) for text in texts])
+        build = time.perf_counter() - start
+
+        query_texts = [texts[i] + " update" for i in rng.integers(0, n, queries)]
+        embeddings = store.create_embeddings(query_texts)
+        latencies = []
+        for embedding in embeddings:
+            start = time.perf_counter()
+            store._search(embedding, k)
+            latencies.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        for text in query_texts:
+            store.search(text, top_k=k)
+        end_to_end = time.perf_counter() - start
+        results[str(n)] = {
+            "index": store._index_kind,
+            "build_seconds": build,
+            "search_qps": len(latencies) / sum(latencies),
+            "query_qps": queries / end_to_end,
+            **percentiles(latencies),
+        }
+        shutil.rmtree(path, ignore_errors=True)
+    return results
+
+
+async def _load(client: httpx.AsyncClient, path: str, items, concurrency: int, check):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(question):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path, params={"question": question})
+            latencies.append(time.perf_counter() - start)
+            check(response)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(question) for question in items))
+    wall = time.perf_counter() - start
+    return {"requests": len(items), "requests_per_second": len(items) / wall,
+            **percentiles(latencies)}
+
+
+async def bench_analyze(server: StubServer, scheduler: IngestionScheduler, requests: int, concurrency: int):
+    """/analyze latency and throughput in-process, on answer cache misses and then hits"""
+    llm = AsyncLLMClient(client=AsyncOpenAI(api_key="bench", base_url=server.url + "/v1", max_retries=0),
+                         max_concurrency=concurrency)
+    cache = SemanticAnswerCache(store=VectorStore(persist_path=os.path.join(WORK_DIR, "answers"),
+                                                  max_history=requests * 2, metric="cosine",
+                                                  embedder=Embedder(cache=None)))
+    saved = {name: getattr(api, name) for name in ("news_scheduler", "llm_client", "ask_openai_async", "answer_cache")}
+    api.news_scheduler, api.llm_client, api.ask_openai_async, api.answer_cache = scheduler, llm, llm.ask, cache
+    outcomes = {"cached": 0, "errors": 0}
+
+    def check(response):
+        body = response.json()
+        if response.status_code != 200 or body.get("status") != "success":
+            outcomes["errors"] += 1
+        elif body["cached"]:
+            outcomes["cached"] += 1
+
+    def check_stream(response):
+        if response.status_code != 200 or "event: done" not in response.text:
+            outcomes["errors"] += 1
+
+    try:
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            asked = questions(requests)
+            calls = server.llm_calls
+            results = {"miss": await _load(client, "/analyze", asked, concurrency, check)}
+            results["miss"]["llm_calls"] = server.llm_calls - calls
+            outcomes["cached"] = 0
+            results["hit"] = await _load(client, "/analyze", asked, concurrency, check)
+            results["hit"]["hit_ratio"] = outcomes["cached"] / len(asked)
+            results["stream"] = await _load(client, "/analyze/stream", questions(max(requests // 4, 1), requests),
+                                            concurrency, check_stream)
+    finally:
+        for name, value in saved.items():
+            setattr(api, name, value)
+        await llm.aclose()
+    if outcomes["errors"]:
+        raise SystemExit(f"{outcomes['errors']} /analyze requests failed")
+    return results
+
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(results, baseline, tolerance: float):
+    """Metrics worse than the baseline by more than `tolerance` (a fraction)"""
+    regressions = []
+    current = flatten(results)
+    for key, old in flatten(baseline).items():
+        new = current.get(key)
+        if new is None or not old:
+            continue
+        if key.endswith(("_seconds", "_ms")) and new > old * (1 + tolerance):
+            regressions.append(f"{key}: {old:.4g} -> {new:.4g} (+{new / old - 1:.0%})")
+        elif key.endswith(("per_second", "_qps")) and new < old * (1 - tolerance):
+            regressions.append(f"{key}: {old:.4g} -> {new:.4g} ({new / old - 1:.0%})")
+    return regressions
+
+
+async def run(args):
+    with StubServer(llm_latency=args.llm_latency) as server:
+        refresh, scheduler = await bench_refresh(server, args.repeat)
+        articles = list(scheduler.snapshot().articles)
+        nlp = await asyncio.get_running_loop().run_in_executor(None, bench_nlp, articles, args.nlp_articles, args.repeat)
+        vectors = bench_vector_search(args.sizes, args.queries, args.k, args.dim)
+        analyze = await bench_analyze(server, scheduler, args.requests, args.concurrency)
+    return {"refresh": refresh, "nlp": nlp, "vector_search": vectors, "analyze": analyze}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="small sizes, for CI smoke runs")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="vector store sizes")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--nlp-articles", type=int, default=400)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds the stub LLM takes per call")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--real-models", action="store_true", help="use spaCy/transformers instead of fake NLP")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON results to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+    if args.quick:
+        args.sizes, args.queries, args.nlp_articles, args.requests, args.repeat = "500,2000", 100, 100, 40, 1
+    args.sizes = [int(n) for n in args.sizes.split(",")]
+
+    if not args.real_models:
+        nlp_processor._models.update(nlp=FakeNLP(), summarizer=fake_summarizer, sentiment_analyzer=fake_sentiment)
+
+    results = asyncio.run(run(args))
+    report = {
+        "benchmark": "suite",
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpu_count": os.cpu_count(), "real_models": args.real_models},
+        "parameters": {key: getattr(args, key) for key in ("sizes", "dim", "queries", "k", "nlp_articles",
+                                                            "requests", "concurrency", "llm_latency", "repeat")},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in flatten(results).items():
+            print(f"{key:50s} {value:12.4g}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline.get("results", baseline), args.tolerance)
+        if regressions:
+            print("Regressions against " + args.compare + ":\n  " + "\n  ".join(regressions), file=sys.stderr)
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Recall@k and per-query latency of the VectorStore index modes on synthetic
+clustered vectors, against exact search as ground truth.
+
+    python -m benchmarks.bench_vector_index [--n 100000] [--dim 1536] [--queries 200]
+        [--modes flat,ivf,ivfpq,hnsw] [--nprobe 1,8,32] [--ef 16,64,256] [--metric cosine] [--json]
+
+For 1M vectors at 1536 dims expect ~6 GB of RAM for the data alone.
+"""
+import argparse
+import json
+import time
+
+import faiss
+import numpy as np
+
+from app.vector_store import build_index, set_search_params
+
+
+def make_data(n: int, queries: int, dim: int, rng: np.random.Generator):
+    """Gaussian clusters, a rough stand-in for text embeddings"""
+    centers = rng.standard_normal((max(n // 1000, 16), dim)).astype(np.float32)
+    data = centers[rng.integers(0, len(centers), n)] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+    picks = rng.integers(0, n, queries)
+    xq = data[picks] + 0.1 * rng.standard_normal((queries, dim)).astype(np.float32)
+    return data, xq
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def run(index, xq: np.ndarray, k: int):
+    """Queries one at a time, as VectorStore does"""
+    latencies = []
+    found = []
+    for q in xq:
+        start = time.perf_counter()
+        _, ids = index.search(q.reshape(1, -1), k)
+        latencies.append(time.perf_counter() - start)
+        found.append(ids[0])
+    return np.array(found), np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--modes", default="flat,ivf,ivfpq,hnsw")
+    parser.add_argument("--metric", default="cosine", choices=["l2", "cosine"])
+    parser.add_argument("--nlist", type=int, default=0, help="IVF lists (default ~4*sqrt(n))")
+    parser.add_argument("--pq-m", type=int, default=64)
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--nprobe", default="1,8,32,128")
+    parser.add_argument("--ef", default="16,64,256")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    data, xq = make_data(args.n, args.queries, args.dim, rng)
+    if args.metric == "cosine":
+        faiss.normalize_L2(data)
+        faiss.normalize_L2(xq)
+    ids = np.arange(args.n, dtype=np.int64)
+    nlist = args.nlist or int(4 * np.sqrt(args.n))
+
+    exact = build_index("flat", args.dim, args.metric)
+    exact.add_with_ids(data, ids)
+    _, truth = exact.search(xq, args.k)
+
+    results = []
+    for mode in args.modes.split(","):
+        index = build_index(mode, args.dim, args.metric, nlist=nlist, pq_m=args.pq_m, hnsw_m=args.hnsw_m)
+        start = time.perf_counter()
+        if not index.is_trained:
+            sample = data[rng.choice(args.n, size=min(args.n, nlist * 256), replace=False)]
+            index.train(sample)
+        train_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        index.add_with_ids(data, ids)
+        add_seconds = time.perf_counter() - start
+
+        if mode in ("ivf", "ivfpq"):
+            settings = [{"nprobe": int(v)} for v in args.nprobe.split(",")]
+        elif mode == "hnsw":
+            settings = [{"ef_search": int(v)} for v in args.ef.split(",")]
+        else:
+            settings = [{}]
+        for params in settings:
+            set_search_params(index, **params)
+            found, latencies = run(index, xq, args.k)
+            results.append({
+                "mode": mode,
+                **params,
+                "recall": recall(found, truth),
+                "p50_ms": float(np.percentile(latencies, 50) * 1000),
+                "p99_ms": float(np.percentile(latencies, 99) * 1000),
+                "train_seconds": train_seconds,
+                "add_seconds": add_seconds,
+            })
+
+    summary = {"benchmark": "vector_index", "n": args.n, "dim": args.dim, "k": args.k,
+               "metric": args.metric, "nlist": nlist, "results": results}
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"n={args.n} dim={args.dim} k={args.k} metric={args.metric} nlist={nlist}")
+        for r in results:
+            knob = ", ".join(f"{key}={r[key]}" for key in ("nprobe", "ef_search") if key in r)
+            print(f"{r['mode']:6} {knob:14} recall@{args.k}={r['recall']:.3f}  "
+                  f"p50={r['p50_ms']:7.3f}ms  p99={r['p99_ms']:7.3f}ms  "
+                  f"train={r['train_seconds']:6.2f}s  add={r['add_seconds']:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Local HTTP server serving the synthetic pages in benchmarks/fixtures, plus a
+minimal OpenAI-compatible chat completions endpoint, so the news pipeline
+and /analyze can be benchmarked without touching the network.
+
+    with StubServer(llm_latency=0.05) as server:
+        scraper = AsyncFinancialNewsScraper(sources=server.news_sources(), ...)
+        client = AsyncOpenAI(base_url=server.url + "/v1", api_key="bench")
+"""
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.async_news_scraper import NEWS_SOURCES
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Per NEWS_SOURCES entry: path prefix on the stub, the real origin its pages link to,
+# and the synthetic listing (or feed) and article page
+SITES = {
+    "MoneyControl": ("moneycontrol", "https://www.moneycontrol.com",
+                     "moneycontrol_listing.html", "moneycontrol_article.html"),
+    "Economic Times": ("economictimes", "https://economictimes.indiatimes.com",
+                       "economictimes_feed.xml", "economictimes_article.html"),
+    "Livemint": ("livemint", "https://www.livemint.com", "livemint_feed.xml", "livemint_article.html"),
+    "Business Standard": ("business_standard", "https://www.business-standard.com",
+                          "business_standard_listing.html", "business_standard_article.html"),
+}
+
+
+def _read(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def answer_for(question: str) -> str:
+    """Deterministic LLM answer with a price move for extract_price_change to find"""
+    return (f"Regarding '{question}': Nifty 50 fell 1.2% today as banking and IT stocks slipped "
+            "on foreign outflows, while midcap funds held up better. Key levels to watch are "
+            "the 50-day average and the rupee.")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.count()
+        page = self.server.page(self.path)
+        if page is None:
+            self._send(404, b"not found", "text/plain")
+            return
+        body, content_type = page
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send(200, body, content_type, {"ETag": etag})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send(404, b"not found", "text/plain")
+            self.server.count()
+            return
+        self.server.count(llm=True)
+        question = payload["messages"][-1]["content"].split("Question:")[-1].strip().splitlines()[0]
+        text = answer_for(question)
+        time.sleep(self.server.llm_latency)
+        if payload.get("stream"):
+            words = text.split(" ")
+            chunks = [{"id": "bench", "object": "chat.completion.chunk", "created": 0, "model": payload["model"],
+                       "choices": [{"index": 0, "delta": {"content": word + (" " if i < len(words) - 1 else "")},
+                                    "finish_reason": None}]}
+                      for i, word in enumerate(words)]
+            body = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+            self._send(200, body.encode(), "text/event-stream")
+            return
+        completion = {
+            "id": "bench", "object": "chat.completion", "created": 0, "model": payload["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+        self._send(200, json.dumps(completion).encode(), "application/json")
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Serves `/<site>/listing/<n>` from the synthetic listing or feed, with its
+    links rewritten to point back at the stub, and any other `/<site>/...`
+    path from the synthetic article. Each article URL gets a distinct first
+    paragraph so content hashes differ per story. Responses carry an ETag
+    and honour If-None-Match.
+    """
+
+    daemon_threads = True
+    # Room for many concurrent clients; the default backlog of 5 drops connections into 1s SYN retries
+    request_queue_size = 128
+
+    def __init__(self, llm_latency: float = 0.0, port: int = 0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.llm_latency = llm_latency
+        self.requests = 0
+        self.llm_calls = 0
+        self._count_lock = threading.Lock()
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self._listings = {}
+        self._articles = {}
+        for prefix, origin, listing, article in SITES.values():
+            self._listings[prefix] = _read(listing).replace(origin, f"{self.url}/{prefix}").encode()
+            self._articles[prefix] = _read(article)
+        self._thread = None
+
+    def count(self, llm: bool = False) -> None:
+        """Count one request; handler threads run concurrently, so `+=` alone could lose updates"""
+        with self._count_lock:
+            self.requests += 1
+            if llm:
+                self.llm_calls += 1
+
+    def page(self, path: str):
+        parts = path.split("?")[0].strip("/").split("/")
+        prefix = parts[0]
+        if prefix not in self._listings:
+            return None
+        if len(parts) > 1 and parts[1] == "listing":
+            listing = self._listings[prefix]
+            return listing, "application/rss+xml" if listing.lstrip().startswith(b"<?xml") else "text/html"
+        article = self._articles[prefix].replace("<p>", f"<p>Story {path}. ", 1)
+        return article.encode(), "text/html"
+
+    def news_sources(self):
+        """NEWS_SOURCES with every URL pointing at this server"""
+        sources = []
+        for source in NEWS_SOURCES:
+            prefix = SITES[source["name"]][0]
+            local = copy.deepcopy(source)
+            local["urls"] = [f"{self.url}/{prefix}/listing/{i}" for i in range(len(source["urls"]))]
+            if local.get("link_prefix"):
+                local["link_prefix"] = f"{self.url}/{prefix}"
+            sources.append(local)
+        return sources
+
+    def __enter__(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,71 @@
+import json
+import os
+
+import httpx
+from fastapi.testclient import TestClient
+from openai import AsyncOpenAI
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from app import main  # noqa: E402
+from app.answer_cache import SemanticAnswerCache  # noqa: E402
+from app.embeddings import Embedder, HashEmbeddingBackend  # noqa: E402
+from app.ingestion import NewsSnapshot  # noqa: E402
+from app.openai_client import AsyncLLMClient  # noqa: E402
+from app.vector_store import VectorStore  # noqa: E402
+
+ARTICLES = [{"title": "Nifty slips", "url": "https://example.com/a", "content": "Nifty fell 1%",
+             "timestamp": "Mon, 01 Jan 2024 10:00:00 GMT", "source": "Test"}]
+
+
+def chunk(text):
+    return {"id": "c", "object": "chat.completion.chunk", "created": 0, "model": "gpt-3.5-turbo",
+            "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]}
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def setup(tmp_path, monkeypatch, handler):
+    monkeypatch.setattr(main.news_scheduler, "snapshot", lambda: NewsSnapshot(ARTICLES, 1))
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    openai_client = AsyncOpenAI(api_key="test", base_url="http://mock/v1", http_client=http_client, max_retries=0)
+    monkeypatch.setattr(main, "llm_client", AsyncLLMClient(client=openai_client, backoff=0.001))
+    store = VectorStore(persist_path=str(tmp_path / "answers"), metric="cosine",
+                        embedder=Embedder(HashEmbeddingBackend(), cache=None))
+    monkeypatch.setattr(main, "answer_cache", SemanticAnswerCache(store=store))
+    return TestClient(main.app)
+
+
+def test_stream_sends_sources_tokens_and_done(tmp_path, monkeypatch):
+    def handler(request):
+        body = "".join(f"data: {json.dumps(chunk(t))}\n\n" for t in ["Nifty is ", "down 1%", " today"])
+        return httpx.Response(200, text=body + "data: [DONE]\n\n", headers={"content-type": "text/event-stream"})
+
+    client = setup(tmp_path, monkeypatch, handler)
+    response = client.get("/analyze/stream", params={"question": "Why is Nifty down?"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_events(response.text)
+    assert [e for e, _ in events] == ["sources", "token", "token", "token", "done"]
+    assert events[0][1]["sources"][0]["url"] == "https://example.com/a"
+    done = events[-1][1]
+    assert done["analysis"]["content"] == "Nifty is down 1% today"
+    assert done["analysis"]["price_change"]["percentage"] == -1.0
+    assert done["cached"] is False
+
+    # The streamed answer was cached for the same snapshot
+    again = parse_events(client.get("/analyze/stream", params={"question": "Why is Nifty down?"}).text)
+    assert [e for e, _ in again] == ["sources", "token", "done"] and again[-1][1]["cached"] is True
+
+
+def test_stream_falls_back_when_llm_fails(tmp_path, monkeypatch):
+    client = setup(tmp_path, monkeypatch, lambda request: httpx.Response(500, json={"error": {"message": "x"}}))
+    events = parse_events(client.get("/analyze/stream", params={"question": "Why?"}).text)
+    assert [e for e, _ in events] == ["sources", "token", "done"]
+    assert events[-1][1]["analysis"]["content"] == main.FALLBACK_CONTENT
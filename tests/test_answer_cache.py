@@ -0,0 +1,45 @@
+from app.answer_cache import SemanticAnswerCache
+from app.embeddings import Embedder, HashEmbeddingBackend
+from app.vector_store import VectorStore
+
+ANALYSIS = {"content": "Nifty fell on FII selling", "price_change": {"percentage": -1.2, "symbol": "Unknown"}}
+
+
+def make_cache(tmp_path, **kwargs):
+    store = VectorStore(persist_path=str(tmp_path / "answers"), max_history=100, metric="cosine",
+                        embedder=Embedder(HashEmbeddingBackend(), cache=None))
+    return SemanticAnswerCache(store=store, **kwargs)
+
+
+def test_near_duplicate_question_hits(tmp_path):
+    cache = make_cache(tmp_path, threshold=0.7)
+    assert cache.get("Why is Nifty down today?", "snap-1") is None
+    cache.put("Why is Nifty down today?", "snap-1", ANALYSIS)
+
+    assert cache.get("why is nifty down today", "snap-1") == ANALYSIS
+    assert cache.get("What happened to Reliance shares?", "snap-1") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_other_snapshot_or_expired_entry_misses(tmp_path):
+    cache = make_cache(tmp_path, threshold=0.7)
+    cache.put("Why is Nifty down today?", "snap-1", ANALYSIS)
+    assert cache.get("Why is Nifty down today?", "snap-2") is None
+
+    cache.ttl = 0
+    assert cache.get("Why is Nifty down today?", "snap-1") is None
+
+
+def test_questions_are_embedded_outside_the_lock(tmp_path):
+    cache = make_cache(tmp_path, threshold=0.7)
+    held = []
+    embed = cache._store.embedder.embed
+
+    def checking_embed(texts):
+        held.append(cache._lock.locked())
+        return embed(texts)
+
+    cache._store.embedder.embed = checking_embed
+    cache.put("Why is Nifty down today?", "snap-1", ANALYSIS)
+    assert cache.get("Why is Nifty down today?", "snap-1") == ANALYSIS
+    assert held == [False, False]
@@ -0,0 +1,33 @@
+from app.article_store import ArticleStore, canonical_url
+
+
+def test_canonical_url_drops_tracking_and_fragments():
+    assert canonical_url("HTTPS://Www.Example.com/news/a/?utm_source=x&id=2#top") == "https://www.example.com/news/a?id=2"
+
+
+def test_upsert_reports_new_and_changed_articles(tmp_path):
+    store = ArticleStore(path=str(tmp_path / "news.db"))
+    article = {"title": "Nifty ends higher", "content": "Markets rallied", "url": "https://example.com/a",
+               "source": "Livemint", "timestamp": "Sat, 12 Apr 2025 10:00:00 +0530"}
+
+    assert store.upsert_many([article]) == [article]
+    assert store.upsert_many([dict(article, url="https://example.com/a/?utm_medium=rss")]) == []
+
+    edited = dict(article, content="Markets rallied on bank stocks")
+    assert store.upsert_many([edited]) == [edited]
+    assert store.get("https://example.com/a")["content"] == "Markets rallied on bank stocks"
+    assert store.known_urls(["https://example.com/a", "https://example.com/b"]) == {"https://example.com/a"}
+    assert store.get_many(["https://example.com/a/?utm_source=x", "https://example.com/b"]) == {
+        "https://example.com/a/?utm_source=x": dict(edited, url="https://example.com/a")
+    }
+
+
+def test_latest_orders_by_published_time(tmp_path):
+    store = ArticleStore(path=str(tmp_path / "news.db"))
+    store.upsert_many([
+        {"title": "Old", "content": "", "url": "https://example.com/old", "source": "ET",
+         "timestamp": "Fri, 11 Apr 2025 09:00:00 +0000"},
+        {"title": "New", "content": "", "url": "https://example.com/new", "source": "ET",
+         "timestamp": "Sat, 12 Apr 2025 09:00:00 +0000"},
+    ])
+    assert [a["title"] for a in store.latest(limit=2, source="ET")] == ["New", "Old"]
@@ -0,0 +1,33 @@
+from app.context_builder import ContextBuilder, chunk_text, estimate_tokens
+
+FILLER = "Markets traded in a narrow range through the session as investors awaited cues. " * 6
+ARTICLES = [
+    {"title": "Rupee steadies", "content": FILLER + "The rupee closed flat against the dollar."},
+    {"title": "HDFC Bank results", "content": "HDFC Bank reported a 20% rise in net profit. " + FILLER},
+    {"title": "HDFC Bank results (syndicated)", "content": "HDFC Bank reported a 20% rise in net profit. " + FILLER},
+    {"title": "Crude oil", "content": "Brent crude rose 2% on supply worries. " + FILLER},
+]
+
+
+def test_chunks_respect_the_size():
+    chunks = chunk_text(FILLER * 4, max_tokens=50)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(c) <= 60 for c in chunks)
+    assert " ".join(chunks).split() == (FILLER * 4).split()
+
+
+def test_relevant_chunks_rank_first_and_duplicates_are_dropped():
+    context, used = ContextBuilder(token_budget=200, chunk_tokens=40).build("How did HDFC Bank profit grow?", ARTICLES)
+    assert used[0]["title"].startswith("HDFC Bank results")
+    assert context.startswith("Title: HDFC Bank results\nContent: HDFC Bank reported")
+    assert context.count("HDFC Bank reported") == 1
+    assert estimate_tokens(context) <= 230
+
+
+def test_unmatched_question_keeps_recency_order_and_index_is_reused():
+    builder = ContextBuilder(token_budget=120, chunk_tokens=40)
+    context, used = builder.build("zzz", ARTICLES, key="snap-1")
+    assert used[0]["title"] == "Rupee steadies"
+    index = builder._cached[1]
+    builder.build("rupee", ARTICLES, key="snap-1")
+    assert builder._cached[1] is index
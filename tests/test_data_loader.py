@@ -0,0 +1,65 @@
+import io
+import json
+import sqlite3
+
+import pytest
+
+from app.data_loader import iter_json_array, load_json_to_db
+
+HOLDINGS = [
+    {"fund_name": f"Fund {i % 7}", "symbol": f"SYM{i}", "sector": "Banking" if i % 2 else "It",
+     "allocation": i / 10, "shares": i * 100, "meta": {"source": "amfi"}}
+    for i in range(50)
+]
+
+
+def write(tmp_path, name, data):
+    (tmp_path / name).write_text(json.dumps(data, indent=1))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_streaming_parser_matches_json_load(chunk_size):
+    data = [{"a": 1, "b": "x, ]"}, [1, 2], 123456789, -0.5, "s", None, True, {}]
+    text = json.dumps(data, indent=2)
+    assert list(iter_json_array(io.StringIO(text), chunk_size)) == data
+    assert list(iter_json_array(io.StringIO(" [ ] "), chunk_size)) == []
+
+
+def test_streaming_parser_rejects_non_arrays():
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('{"a": 1}')))
+
+
+def test_load_infers_types_and_indexes(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.data_loader.DATA_LOAD_STREAM_BYTES", 0)
+    write(tmp_path, "holdings.json", HOLDINGS)
+    db_path = str(tmp_path / "test.db")
+
+    assert load_json_to_db(str(tmp_path), db_path, ["holdings.json"], batch_size=8) == {"holdings": 50}
+    conn = sqlite3.connect(db_path)
+    columns = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(holdings)")}
+    assert columns == {"fund_name": "TEXT", "symbol": "TEXT", "sector": "TEXT",
+                       "allocation": "REAL", "shares": "INTEGER", "meta": "TEXT"}
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(holdings)")}
+    assert indexes == {"idx_holdings_fund_name", "idx_holdings_symbol", "idx_holdings_sector"}
+    # Numeric comparisons, not string ones
+    assert conn.execute("SELECT COUNT(*) FROM holdings WHERE shares > 900").fetchone()[0] == 40
+    assert json.loads(conn.execute("SELECT meta FROM holdings LIMIT 1").fetchone()[0]) == {"source": "amfi"}
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_reload_replaces_table_and_failure_keeps_it(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    write(tmp_path, "stocks.json", [{"symbol": "A", "price": 1.5}, {"symbol": "B", "price": 2}])
+    load_json_to_db(str(tmp_path), db_path, ["stocks.json"])
+    write(tmp_path, "stocks.json", [{"symbol": "C", "price": 3.0}])
+    load_json_to_db(str(tmp_path), db_path, ["stocks.json"])
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT symbol, price FROM stocks").fetchall() == [("C", 3.0)]
+
+    (tmp_path / "stocks.json").write_text('[{"symbol": "D", "price": 4}, {"symbol": ')
+    assert load_json_to_db(str(tmp_path), db_path, ["stocks.json"]) == {}
+    assert conn.execute("SELECT symbol FROM stocks").fetchall() == [("C",)]
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {"stocks"}
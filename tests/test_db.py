@@ -0,0 +1,69 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from app.data_loader import load_json_to_db
+from app.db import ConnectionPool, MarketDB
+from app.stock_data_manager import StockDataManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    data = {
+        "stocks.json": [{"symbol": "TCS", "sector": "It", "price": 3500.5},
+                        {"symbol": "HDFC", "sector": "Banking", "price": 1600.0}],
+        "mutual_funds.json": [{"fund_name": "Alpha", "nav": 10.5, "returns": 12.0},
+                              {"fund_name": "Beta", "nav": 20.0, "returns": 15.0}],
+        "holdings.json": [{"fund_name": "Alpha", "symbol": "TCS", "allocation": 4.0},
+                          {"fund_name": "Beta", "symbol": "TCS", "allocation": 2.0},
+                          {"fund_name": "Beta", "symbol": "HDFC", "allocation": 6.0}],
+    }
+    for name, rows in data.items():
+        (tmp_path / name).write_text(json.dumps(rows))
+    path = str(tmp_path / "test.db")
+    load_json_to_db(str(tmp_path), path)
+    market_db = MarketDB(ConnectionPool(path))
+    yield market_db
+    market_db.pool.close()
+
+
+def test_lookups(db):
+    assert db.get_stock("TCS")["price"] == 3500.5
+    assert db.get_stock("NONE") is None
+    assert [s["symbol"] for s in db.stocks_in_sector("Banking")] == ["HDFC"]
+    assert db.get_fund("Beta")["nav"] == 20.0
+    assert [h["symbol"] for h in db.fund_holdings("Beta")] == ["TCS", "HDFC"]
+    assert db.funds_holding("TCS") == [
+        {"fund_name": "Beta", "allocation": 2.0, "nav": 20.0, "returns": 15.0},
+        {"fund_name": "Alpha", "allocation": 4.0, "nav": 10.5, "returns": 12.0},
+    ]
+    # No articles table yet
+    assert db.latest_articles() == []
+
+
+def test_connections_are_per_thread_and_read_only(db):
+    conn = db.pool.connection()
+    assert db.pool.connection() is conn
+    assert conn.execute("PRAGMA cache_size").fetchone()[0] == -64 * 1024
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("DELETE FROM stocks")
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db.pool.connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+
+def test_missing_database_reads_as_empty(tmp_path):
+    db = MarketDB(ConnectionPool(str(tmp_path / "missing.db")))
+    assert db.get_stock("TCS") is None
+    assert db.funds_holding("TCS") == []
+
+
+def test_stock_manager_falls_back_to_sql(db, tmp_path):
+    manager = StockDataManager(str(tmp_path / "a.json"), str(tmp_path / "b.json"), str(tmp_path / "c.json"), db=db)
+    assert manager.get_stock_metrics("HDFC")["sector"] == "Banking"
+    assert [f["fund_name"] for f in manager.get_relevant_funds(symbol="TCS")] == ["Beta", "Alpha"]
@@ -0,0 +1,45 @@
+import numpy as np
+
+from app.embeddings import EmbeddingCache, Embedder, HashEmbeddingBackend
+
+
+class CountingBackend(HashEmbeddingBackend):
+    def __init__(self):
+        super().__init__(dimension=64)
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return super().embed(texts)
+
+
+def test_hash_backend_is_deterministic_and_lexical():
+    backend = HashEmbeddingBackend(dimension=256)
+    a, b, c = backend.embed(["Nifty 50 is up", "How is Nifty 50 doing?", "Bank stocks fell"])
+    np.testing.assert_array_equal(a, HashEmbeddingBackend(dimension=256).embed(["Nifty 50 is up"])[0])
+    assert a @ b > a @ c
+    assert np.isclose(np.linalg.norm(a), 1.0)
+
+
+def test_embedder_batches_dedupes_and_caches(tmp_path):
+    backend = CountingBackend()
+    cache = EmbeddingCache(path=str(tmp_path / "emb.db"))
+    embedder = Embedder(backend, cache=cache, batch_size=2)
+
+    first = embedder.embed(["a", "b", "a", "c"])
+    assert first.shape == (4, 64)
+    assert backend.calls == [["a", "b"], ["c"]]
+    np.testing.assert_array_equal(first[0], first[2])
+
+    # A fresh embedder over the same cache file makes no backend calls
+    again = Embedder(backend, cache=EmbeddingCache(path=str(tmp_path / "emb.db"))).embed(["c", "a"])
+    assert backend.calls == [["a", "b"], ["c"]]
+    np.testing.assert_array_equal(again, first[[3, 0]])
+    assert cache.misses == 3
+
+
+def test_cache_is_keyed_by_model(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "emb.db"))
+    cache.put_many("model-a", {"h": np.ones(4, dtype=np.float32)})
+    assert cache.get_many("model-b", ["h"]) == {}
+    np.testing.assert_array_equal(cache.get_many("model-a", ["h"])["h"], np.ones(4))
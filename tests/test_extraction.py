@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from app.extraction import LxmlExtractor, SelectolaxExtractor, SelectolaxParser, SoupExtractor, get_extractor
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures")
+
+ENGINES = [LxmlExtractor()] + ([SelectolaxExtractor()] if SelectolaxParser is not None else [])
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("engine", ENGINES, ids=lambda e: e.name)
+def test_engines_match_beautifulsoup(engine):
+    reference = SoupExtractor()
+    listing = read_fixture("business_standard_listing.html")
+    article = read_fixture("economictimes_article.html")
+
+    links = engine.listing(listing, ".article-list li", "h2", "https://www.business-standard.com")
+    assert links == reference.listing(listing, ".article-list li", "h2", "https://www.business-standard.com")
+    assert links[0]["link"].startswith("https://www.business-standard.com/news/")
+
+    text = engine.article_text(article, "artText")
+    assert text and text == reference.article_text(article, "artText")
+    assert engine.article_text(article, "missing-class") == ""
+    assert engine.meta_description(article) == reference.meta_description(article)
+
+
+@pytest.mark.parametrize("engine", ENGINES, ids=lambda e: e.name)
+def test_candidate_classes_and_meta_from_one_parse(engine):
+    reference = SoupExtractor()
+    article = read_fixture("moneycontrol_article.html")
+    classes = ("missing-class", "content_wrapper")
+    text = engine.article_text_or_meta(article, classes, skip_empty=True)
+    assert text and text == engine.article_text(article, "content_wrapper", skip_empty=True)
+    assert text == reference.article_text_or_meta(article, classes, skip_empty=True)
+    meta = engine.article_text_or_meta(article, ("missing-class",))
+    assert meta and meta == reference.meta_description(article)
+
+
+@pytest.mark.parametrize("engine", ENGINES, ids=lambda e: e.name)
+def test_selector_groups_match_beautifulsoup(engine):
+    listing = read_fixture("moneycontrol_listing.html")
+    selector = "li.clearfix, div.clearfix, li.article-list"
+    links = engine.listing(listing, selector)
+    assert links and links == SoupExtractor().listing(listing, selector)
+
+
+def test_get_extractor_honours_name():
+    assert get_extractor("soup").name == "soup"
+    assert get_extractor("lxml").name == "lxml"
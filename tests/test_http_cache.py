@@ -0,0 +1,41 @@
+from app.http_cache import HttpCache
+
+
+def test_unchanged_body_skips_parsing(tmp_path):
+    cache = HttpCache(path=str(tmp_path / "cache.db"))
+    calls = []
+
+    def parse():
+        calls.append(1)
+        return {"content": "parsed"}
+
+    headers = {"ETag": '"v1"', "Last-Modified": "Sat, 12 Apr 2025 10:00:00 GMT"}
+    assert cache.resolve("https://news.test/a", 200, headers, b"<p>body</p>", parse) == {"content": "parsed"}
+    assert cache.resolve("https://news.test/a", 200, headers, b"<p>body</p>", parse) == {"content": "parsed"}
+    assert cache.resolve("https://news.test/a", 304, {}, b"", parse) == {"content": "parsed"}
+    assert len(calls) == 1
+    assert cache.request_headers("https://news.test/a") == {
+        "If-None-Match": '"v1"', "If-Modified-Since": "Sat, 12 Apr 2025 10:00:00 GMT"
+    }
+
+    cache.resolve("https://news.test/a", 200, headers, b"<p>edited</p>", parse)
+    assert len(calls) == 2
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = HttpCache(path=str(tmp_path / "cache.db"), max_bytes=250)
+    for i in range(3):
+        cache.resolve(f"https://news.test/{i}", 200, {"ETag": str(i)}, str(i).encode(), lambda: "x" * 100)
+    assert cache.request_headers("https://news.test/0") == {}
+    assert cache.request_headers("https://news.test/2") == {"If-None-Match": "2"}
+
+
+def test_other_parser_is_a_miss(tmp_path):
+    cache = HttpCache(path=str(tmp_path / "cache.db"))
+    headers = {"ETag": '"v1"'}
+    assert cache.resolve("https://news.test/a", 200, headers, b"<p>body</p>", lambda: "old", parser="v1") == "old"
+    # A new parser gets no validators, so the page comes back with a body and is parsed again
+    assert cache.request_headers("https://news.test/a", parser="v2") == {}
+    assert cache.resolve("https://news.test/a", 200, headers, b"<p>body</p>", lambda: "new", parser="v2") == "new"
+    assert cache.resolve("https://news.test/a", 304, {}, b"", lambda: "unused", parser="v2") == "new"
+    assert cache.request_headers("https://news.test/a", parser="v1") == {}
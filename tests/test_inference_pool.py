@@ -0,0 +1,29 @@
+import os
+
+from app import nlp_processor
+from app.inference_pool import InferencePool
+
+
+def fake_run_models(batch, batch_size):
+    return [{"summary": a["content"].upper(), "entities": [], "pid": os.getpid()} for a in batch]
+
+
+def test_pool_preserves_order_across_workers(monkeypatch):
+    monkeypatch.setattr(nlp_processor, "run_models", fake_run_models)
+    monkeypatch.setattr(nlp_processor, "load_models", lambda: None)
+    pool = InferencePool(workers=2, max_pending=2)
+    try:
+        batch = [{"content": f"article {i}"} for i in range(10)]
+        results = pool.run(batch, batch_size=3)
+        assert [r["summary"] for r in results] == [f"ARTICLE {i}" for i in range(10)]
+        assert all(r["pid"] != os.getpid() for r in results)
+        assert pool.pending == 0
+    finally:
+        pool.shutdown()
+
+
+def test_disabled_pool_runs_in_process(monkeypatch):
+    monkeypatch.setattr(nlp_processor, "run_models", fake_run_models)
+    pool = InferencePool(workers=0)
+    assert not pool.active
+    assert pool.run([{"content": "nifty"}])[0]["pid"] == os.getpid()
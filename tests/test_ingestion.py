@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from app import ingestion
+from app.article_store import ArticleStore
+from app.ingestion import IngestionScheduler
+from app.sentiment_aggregator import SentimentAggregator
+from app.stock_data_manager import StockDataManager
+
+ARTICLES = [{"title": "Nifty ends higher", "content": "Markets rallied", "url": "https://example.com/a",
+             "timestamp": "2025-04-12 10:00:00", "source": "MoneyControl"}]
+
+def test_refresh_publishes_snapshot():
+    scheduler = IngestionScheduler(fetch=lambda: ARTICLES, store=None)
+    snapshot = scheduler.refresh()
+    assert snapshot.version == 1
+    assert snapshot.articles[0]["title"] == "Nifty ends higher"
+    assert scheduler.status()["stale"] is False
+
+def test_failed_refresh_keeps_last_snapshot():
+    results = [ARTICLES]
+
+    def fetch():
+        if results:
+            return results.pop()
+        raise ConnectionError("host unreachable")
+
+    scheduler = IngestionScheduler(fetch=fetch, store=None)
+    scheduler.refresh()
+    snapshot = scheduler.refresh()
+    assert snapshot.version == 1
+    assert snapshot.articles[0]["url"] == "https://example.com/a"
+    status = scheduler.status()
+    assert status["stale"] is True
+    assert "host unreachable" in status["last_error"]
+
+def test_snapshot_reports_only_new_articles(tmp_path):
+    store = ArticleStore(path=str(tmp_path / "news.db"))
+    batches = [ARTICLES, ARTICLES + [dict(ARTICLES[0], url="https://example.com/b", title="Sensex slips")]]
+    scheduler = IngestionScheduler(fetch=lambda: batches.pop(0), store=store)
+    assert len(scheduler.refresh().new_articles) == 1
+    snapshot = scheduler.refresh()
+    assert [a["url"] for a in snapshot.new_articles] == ["https://example.com/b"]
+    assert len(snapshot.articles) == 2
+
+def test_new_articles_feed_the_sentiment_aggregator(tmp_path, monkeypatch):
+    paths = {name: tmp_path / f"{name}.json" for name in ("stocks", "funds", "holdings")}
+    paths["stocks"].write_text(json.dumps({"HDFCBANK": {"sector": "Banking", "price": 1500.0, "returns": 1.0,
+                                                        "market_cap": 10**12, "volume": 10**6, "pe_ratio": 20.0}}))
+    paths["funds"].write_text(json.dumps({"Alpha Bluechip Fund": {"nav": 50.0, "returns": 12.0, "holdings": {}}}))
+    paths["holdings"].write_text(json.dumps({}))
+    manager = StockDataManager(*(str(paths[name]) for name in ("stocks", "funds", "holdings")))
+    aggregator = SentimentAggregator(path=str(tmp_path / "sentiment.db"))
+    processed = []
+
+    def fake_process_articles(batch):
+        processed.append([article["url"] for article in batch])
+        return [{"summary": article["title"], "entities": ["Alpha Bluechip", "HDFCBANK"],
+                 "sentiment": {"label": "POSITIVE", "score": 0.8}} for article in batch]
+
+    monkeypatch.setattr(ingestion, "process_articles", fake_process_articles)
+    store = ArticleStore(path=str(tmp_path / "news.db"))
+    scheduler = IngestionScheduler(fetch=lambda: ARTICLES, store=store,
+                                   on_new_articles=lambda a: ingestion.record_sentiment(a, aggregator, manager))
+    scheduler.refresh()
+    scheduler.refresh()
+
+    # Only the first refresh had new articles
+    assert processed == [["https://example.com/a"]]
+    fund = aggregator.get("fund", "Alpha Bluechip Fund")
+    assert fund["score"] == pytest.approx(0.8)
+    # Recorded as of publication, not ingestion
+    assert fund["updated_at"] == ingestion._published_at(ARTICLES[0]["timestamp"], 0)
+    assert aggregator.get("stock", "HDFCBANK") is not None
+    assert aggregator.get("sector", "Banking") is not None
+
+
+def test_failed_new_articles_are_passed_again(tmp_path):
+    store = ArticleStore(path=str(tmp_path / "news.db"))
+    batches = [ARTICLES, ARTICLES + [dict(ARTICLES[0], url="https://example.com/b", title="Sensex slips")]]
+    delivered = []
+
+    def consume(articles):
+        delivered.append([a["url"] for a in articles])
+        if len(delivered) == 1:
+            raise RuntimeError("models not loaded")
+
+    scheduler = IngestionScheduler(fetch=lambda: batches.pop(0), store=store, on_new_articles=consume)
+    scheduler.refresh()
+    assert scheduler.status()["stale"] is False
+    scheduler.refresh()
+    assert delivered == [["https://example.com/a"], ["https://example.com/a", "https://example.com/b"]]
+    assert scheduler._undelivered == []
@@ -0,0 +1,14 @@
+from app.match_utils import FundMatcher, is_related
+
+FUNDS = ["HDFC Top 100 Fund", "Nippon India Nifty 50 ETF", "SBI Bluechip Fund", "Axis Midcap Fund"]
+
+
+def test_match_batch_agrees_with_is_related():
+    articles = [["Reliance Industries", "SBI"], ["Nifty 50", "Monday"], [], ["hdfc", "axis midcap"]]
+    expected = [[fund for fund in FUNDS if is_related(entities, fund)] for entities in articles]
+    assert FundMatcher(FUNDS).match_batch(articles) == expected
+    assert expected[0] == ["SBI Bluechip Fund"]
+
+
+def test_match_single_list():
+    assert FundMatcher(FUNDS).match(["nifty 50"]) == ["Nippon India Nifty 50 ETF"]
@@ -0,0 +1,71 @@
+import asyncio
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from app import main, news_crawler  # noqa: E402
+from app.metrics import Histogram, stage_errors, stage_seconds, timed  # noqa: E402
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test.", ["stage"], buckets=[0.1, 1.0])
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, stage="a")
+    assert histogram.render().splitlines() == [
+        "# HELP test_seconds Test.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{stage="a",le="0.1"} 1',
+        'test_seconds_bucket{stage="a",le="1"} 3',
+        'test_seconds_bucket{stage="a",le="+Inf"} 4',
+        'test_seconds_sum{stage="a"} 6.05',
+        'test_seconds_count{stage="a"} 4',
+    ]
+
+
+def test_timed_counts_calls_and_errors():
+    @timed("test.sync")
+    def work(fail=False):
+        if fail:
+            raise ValueError("boom")
+        return 1
+
+    @timed("test.async")
+    async def async_work():
+        return 2
+
+    before = stage_seconds.count(stage="test.sync")
+    assert work() == 1
+    with pytest.raises(ValueError):
+        work(fail=True)
+    assert asyncio.run(async_work()) == 2
+    with timed("test.block"):
+        pass
+
+    assert stage_seconds.count(stage="test.sync") == before + 2
+    assert stage_errors.value(stage="test.sync") >= 1
+    assert stage_seconds.count(stage="test.async") >= 1
+    assert stage_seconds.count(stage="test.block") >= 1
+
+
+def test_crawler_is_timed(monkeypatch):
+    def unreachable(url, **kwargs):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(news_crawler.requests, "get", unreachable)
+    before = stage_seconds.count(stage="crawl.moneycontrol")
+    assert news_crawler.scrape_moneycontrol()[0]["source"] == "System"
+    assert stage_seconds.count(stage="crawl.moneycontrol") == before + 1
+
+
+def test_metrics_endpoint():
+    client = TestClient(main.app)
+    client.get("/")
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'newssense_http_request_duration_seconds_count{method="GET",route="/",status="200"}' in body
+    assert 'newssense_cache_hits_total{cache="answer"}' in body
+    assert 'newssense_queue_depth{queue="llm_requests"} 0' in body
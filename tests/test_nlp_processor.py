@@ -0,0 +1,110 @@
+import sys
+import types
+
+import pytest
+
+from app import nlp_processor
+from app.nlp_cache import NLPResultCache
+
+
+def fake_models(monkeypatch, calls):
+    def run(batch, batch_size):
+        calls.append(len(batch))
+        return [{"summary": a["content"][:5], "entities": [], "sentiment": {"label": "POSITIVE", "score": 0.9}}
+                for a in batch]
+    monkeypatch.setattr(nlp_processor, "run_models", run)
+
+
+def test_results_are_memoised_by_content(tmp_path, monkeypatch):
+    calls = []
+    fake_models(monkeypatch, calls)
+    cache = NLPResultCache(path=str(tmp_path / "nlp.db"), model_version="v1")
+    batch = [{"content": "Nifty rallied"}, {"content": "Sensex fell"}, {"content": "Nifty rallied"}]
+
+    first = nlp_processor.process_articles(batch, cache=cache)
+    assert [r["summary"] for r in first] == ["Nifty", "Sense", "Nifty"]
+    assert calls == [2]
+
+    assert nlp_processor.process_articles(batch, cache=cache) == first
+    assert calls == [2]
+
+
+def test_model_change_invalidates_cache(tmp_path, monkeypatch):
+    calls = []
+    fake_models(monkeypatch, calls)
+    path = str(tmp_path / "nlp.db")
+    nlp_processor.process_articles([{"content": "Nifty rallied"}], cache=NLPResultCache(path=path, model_version="v1"))
+    nlp_processor.process_articles([{"content": "Nifty rallied"}], cache=NLPResultCache(path=path, model_version="v2"))
+    assert calls == [1, 1]
+
+
+class StubDoc:
+    def __init__(self, text):
+        self.ents = [StubEntity(word) for word in text.split() if word.istitle()]
+
+
+class StubEntity:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubNLP:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def pipe(self, texts, batch_size=None):
+        self.calls.append(("ner", len(texts), batch_size))
+        return (StubDoc(text) for text in texts)
+
+
+def stub_models(monkeypatch, calls, nested_summaries=False):
+    def summarizer(texts, batch_size=None):
+        calls.append(("summarization", len(texts), batch_size))
+        summaries = [{"summary_text": text.split(".")[0]} for text in texts]
+        # Some transformers versions wrap each summary in a list of candidates
+        return [[summary] for summary in summaries] if nested_summaries else summaries
+
+    def sentiment(texts, batch_size=None):
+        calls.append(("sentiment", [len(text) for text in texts], batch_size))
+        return [{"label": "NEGATIVE" if "fell" in text else "POSITIVE", "score": 0.9} for text in texts]
+
+    monkeypatch.setattr(nlp_processor, "_models",
+                        {"nlp": StubNLP(calls), "summarizer": summarizer, "sentiment_analyzer": sentiment})
+
+
+def test_each_model_runs_once_per_batch_in_order(monkeypatch):
+    calls = []
+    stub_models(monkeypatch, calls)
+    batch = [{"content": f"Story {i} about Nifty. It {'fell' if i % 2 else 'rose'} today."} for i in range(5)]
+    batch.append({"content": "Long Sensex story. " + "x" * 2000})
+
+    results = nlp_processor.process_articles(batch, batch_size=4, cache=None)
+    assert [r["summary"] for r in results] == [f"Story {i} about Nifty" for i in range(5)] + ["Long Sensex story"]
+    assert results[1]["entities"] == ["Story", "Nifty.", "It"] and results[1]["sentiment"]["label"] == "NEGATIVE"
+    assert results[0]["sentiment"]["label"] == "POSITIVE"
+    # One call per model for the whole batch, which the pipelines split into batch_size chunks
+    assert [(name, size) for name, size, _ in calls if name != "sentiment"] == [("summarization", 6), ("ner", 6)]
+    assert {batch_size for _, _, batch_size in calls} == {4}
+    # Sentiment inputs are truncated for the classifier
+    assert [lengths for name, lengths, _ in calls if name == "sentiment"][0][-1] == 512
+
+
+def test_nested_summaries_are_unwrapped(monkeypatch):
+    stub_models(monkeypatch, [], nested_summaries=True)
+    results = nlp_processor.process_articles([{"content": "Nifty rose. More."}, {"content": "Sensex fell."}], cache=None)
+    assert [r["summary"] for r in results] == ["Nifty rose", "Sensex fell"]
+
+
+def test_models_load_lazily_once(monkeypatch):
+    loads = []
+    spacy = types.ModuleType("spacy")
+    spacy.load = lambda name: loads.append(name) or StubNLP([])
+    monkeypatch.setitem(sys.modules, "spacy", spacy)
+    monkeypatch.setattr(nlp_processor, "_models", {})
+
+    assert loads == []
+    nlp = nlp_processor.nlp
+    assert nlp_processor.get_nlp() is nlp
+    assert loads == ["en_core_web_sm"]
+    with pytest.raises(AttributeError):
+        nlp_processor.not_a_model
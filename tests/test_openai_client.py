@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+
+import httpx
+from openai import AsyncOpenAI
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from app.openai_client import FALLBACK_CONTENT, AsyncLLMClient  # noqa: E402
+
+
+def completion(content):
+    return {
+        "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-3.5-turbo",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+    }
+
+
+def mock_client(handler):
+    """The real SDK against an in-process mock of the completions endpoint."""
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return AsyncOpenAI(api_key="test", base_url="http://mock/v1", http_client=http_client, max_retries=0)
+
+
+def test_identical_inflight_questions_share_one_call():
+    requests = []
+
+    async def handler(request):
+        requests.append(json.loads(request.content))
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=completion("Nifty is down 1.5% on FII selling"))
+
+    async def run():
+        llm = AsyncLLMClient(client=mock_client(handler))
+        results = await asyncio.gather(*[llm.ask("Why is Nifty down?", "ctx") for _ in range(10)])
+        other = await llm.ask("Why is Nifty down?", "other ctx")
+        return llm, results, other
+
+    llm, results, other = asyncio.run(run())
+    assert len(requests) == 2
+    assert llm.coalesced == 9
+    assert all(r == results[0] for r in results)
+    assert results[0]["price_change"]["percentage"] == -1.5
+    assert other["content"].startswith("Nifty")
+
+
+def test_concurrency_is_bounded_and_errors_are_retried():
+    state = {"active": 0, "peak": 0, "failures": 0}
+
+    async def handler(request):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        question = json.loads(request.content)["messages"][1]["content"]
+        if "Q3" in question and state["failures"] < 2:
+            state["failures"] += 1
+            return httpx.Response(503, json={"error": {"message": "overloaded"}})
+        return httpx.Response(200, json=completion("ok"))
+
+    async def run():
+        llm = AsyncLLMClient(client=mock_client(handler), max_concurrency=3, backoff=0.001)
+        return llm, await asyncio.gather(*[llm.ask(f"Q{i}", "ctx") for i in range(12)])
+
+    llm, results = asyncio.run(run())
+    assert state["peak"] <= 3
+    assert [r["content"] for r in results] == ["ok"] * 12
+    assert llm.calls == 14
+
+
+def test_client_errors_fall_back_without_retrying():
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        return httpx.Response(400, json={"error": {"message": "bad request"}})
+
+    llm = AsyncLLMClient(client=mock_client(handler), backoff=0.001)
+    assert asyncio.run(llm.ask("Q", "ctx"))["content"] == FALLBACK_CONTENT
+    assert len(calls) == 1
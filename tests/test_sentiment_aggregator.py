@@ -0,0 +1,116 @@
+import math
+import os
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from app import main  # noqa: E402
+from app import sentiment_aggregator  # noqa: E402
+from app.sentiment_aggregator import SentimentAggregator  # noqa: E402
+
+HOUR = 3600
+POSITIVE = {"label": "POSITIVE", "score": 0.9}
+NEGATIVE = {"label": "NEGATIVE", "score": 0.6}
+
+
+def make(tmp_path):
+    return SentimentAggregator(path=str(tmp_path / "sentiment.db"), half_life_hours=1)
+
+
+def test_scores_decay_with_half_life(tmp_path):
+    aggregator = make(tmp_path)
+    aggregator.record_article("a", POSITIVE, funds=["Alpha"], timestamp=0)
+    aggregator.record_article("b", NEGATIVE, funds=["Alpha"], timestamp=HOUR)
+
+    view = aggregator.get("fund", "Alpha", now=2 * HOUR)
+    # The older article weighs half as much as the newer one
+    assert view["score"] == pytest.approx((0.5 * 0.9 - 0.6) / 1.5)
+    assert view["mentions"] == pytest.approx(1.5 / 2)
+    assert view["positive"] == pytest.approx(0.25)
+    assert view["negative"] == pytest.approx(0.5)
+
+
+def test_out_of_order_articles_match_in_order(tmp_path):
+    events = [(3 * HOUR, POSITIVE), (0, NEGATIVE), (HOUR, POSITIVE), (2 * HOUR, NEGATIVE)]
+    aggregator = make(tmp_path)
+    for i, (timestamp, sentiment) in enumerate(events):
+        aggregator.record_article(str(i), sentiment, stocks=["TCS"], timestamp=timestamp)
+
+    weights = [0.5 ** ((4 * HOUR - t) / HOUR) for t, _ in events]
+    values = [0.9, -0.6, 0.9, -0.6]
+    view = aggregator.get("stock", "TCS", now=4 * HOUR)
+    assert view["mentions"] == pytest.approx(sum(weights))
+    assert view["score"] == pytest.approx(sum(w * v for w, v in zip(weights, values)) / sum(weights))
+
+
+def test_state_persists_and_articles_count_once_per_key(tmp_path):
+    aggregator = make(tmp_path)
+    assert aggregator.record_article("a", POSITIVE, funds=["Alpha"], sectors=["It"], timestamp=0) == 2
+    assert aggregator.record_article("a", POSITIVE, funds=["Alpha"], timestamp=0) == 0
+    assert aggregator.record_article("a", POSITIVE, funds=["Beta"], timestamp=0) == 1
+
+    reloaded = make(tmp_path)
+    assert reloaded.get("fund", "Alpha", now=0)["mentions"] == 1
+    assert reloaded.get("sector", "It", now=HOUR)["mentions"] == pytest.approx(0.5)
+    assert reloaded.record_article("a", POSITIVE, funds=["Alpha"], timestamp=0) == 0
+    assert [s["key"] for s in reloaded.scores("fund", now=0)] == ["Alpha", "Beta"]
+    assert reloaded.get("fund", "Gamma") is None
+
+
+class FailingWrites:
+    """Connection whose score writes fail, everything else goes through."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def executemany(self, *args):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+
+def test_failed_write_leaves_state_untouched(tmp_path):
+    aggregator = make(tmp_path)
+    aggregator.record_article("a", POSITIVE, funds=["Alpha"], timestamp=0)
+    conn = aggregator._conn
+    aggregator._conn = FailingWrites(conn)
+    assert aggregator.record_article("b", NEGATIVE, funds=["Alpha", "Beta"], timestamp=HOUR) == 0
+    aggregator._conn = conn
+
+    assert aggregator.get("fund", "Alpha", now=0)["mentions"] == 1
+    assert aggregator.get("fund", "Beta") is None
+    # Not marked as seen either, so it can be recorded again
+    assert aggregator.record_article("b", NEGATIVE, funds=["Alpha", "Beta"], timestamp=HOUR) == 2
+    assert make(tmp_path).get("fund", "Alpha", now=HOUR)["mentions"] == pytest.approx(1.5)
+
+
+def test_old_matches_are_pruned_while_running(tmp_path, monkeypatch):
+    monkeypatch.setattr(sentiment_aggregator, "PRUNE_EVERY", 3)
+    aggregator = make(tmp_path)
+    aggregator.record_article("old", POSITIVE, funds=["Alpha"])
+    aggregator._conn.execute("UPDATE sentiment_matches SET recorded_at = 0")
+    aggregator.record_article("b", POSITIVE, funds=["Alpha"])
+    count = "SELECT COUNT(*) FROM sentiment_matches"
+    assert aggregator._conn.execute(count).fetchone()[0] == 2
+    aggregator.record_article("c", POSITIVE, funds=["Alpha"])
+    assert aggregator._conn.execute(count).fetchone()[0] == 2
+
+
+def test_sentiment_endpoint(tmp_path, monkeypatch):
+    aggregator = make(tmp_path)
+    aggregator.record_article("a", NEGATIVE, funds=["Alpha"])
+    monkeypatch.setattr(main, "sentiment_aggregator", aggregator)
+    client = TestClient(main.app)
+
+    body = client.get("/sentiment", params={"kind": "fund"}).json()
+    assert body["status"] == "success"
+    assert body["half_life_hours"] == 1
+    assert body["scores"][0]["key"] == "Alpha"
+    assert math.isclose(body["scores"][0]["score"], -0.6)
+
+    assert client.get("/sentiment", params={"kind": "fund", "key": "Beta"}).json()["scores"] == []
+    assert client.get("/sentiment", params={"kind": "planet"}).json()["status"] == "error"
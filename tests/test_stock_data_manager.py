@@ -0,0 +1,175 @@
+import json
+import random
+
+import pytest
+
+from app.stock_data_manager import StockDataManager
+
+SECTORS = ["Banking", "It", "Pharma", "Energy"]
+
+
+def write_data(tmp_path, n=200, seed=1):
+    rng = random.Random(seed)
+    stocks = {
+        f"SYM{i}": {
+            "sector": rng.choice(SECTORS),
+            "price": round(rng.uniform(10, 5000), 2),
+            "returns": round(rng.uniform(-10, 10), 2),
+            "market_cap": rng.randint(10**9, 10**12),
+            "volume": rng.randint(10**3, 10**7),
+            "pe_ratio": round(rng.uniform(5, 80), 2),
+        }
+        for i in range(n)
+    }
+    paths = {name: tmp_path / f"{name}.json" for name in ("stocks", "funds", "holdings")}
+    paths["stocks"].write_text(json.dumps(stocks))
+    paths["funds"].write_text(json.dumps({}))
+    paths["holdings"].write_text(json.dumps({}))
+    manager = StockDataManager(str(paths["stocks"]), str(paths["funds"]), str(paths["holdings"]))
+    return manager, stocks
+
+
+def make_funds(n_funds, n_symbols, rng):
+    funds = {}
+    for i in range(n_funds):
+        weights = [rng.random() ** 3 for _ in SECTORS]
+        total = sum(weights)
+        funds[f"Fund {i}"] = {
+            "nav": round(rng.uniform(10, 500), 2),
+            "returns": round(rng.uniform(-5, 40), 1),
+            "holdings": {f"SYM{s}": round(rng.uniform(0.5, 8), 2) for s in rng.sample(range(n_symbols), 50)},
+            "sector_allocation": {s: round(100 * w / total, 1) for s, w in zip(SECTORS, weights)},
+        }
+    return funds
+
+
+def scan_relevant_funds(mf_data, symbol=None, sector=None):
+    """Reference for get_relevant_funds: a pass over every fund."""
+    relevant_funds = []
+    if symbol:
+        relevant_funds.extend(
+            {"fund_name": name, "allocation": data["holdings"].get(symbol, 0),
+             "nav": data.get("nav", 0), "returns": data.get("returns", 0)}
+            for name, data in mf_data.items()
+            if symbol in data.get("holdings", {})
+        )
+    if sector:
+        relevant_funds.extend(
+            {"fund_name": name, "sector_exposure": data.get("sector_allocation", {}).get(sector, 0),
+             "nav": data.get("nav", 0), "returns": data.get("returns", 0)}
+            for name, data in mf_data.items()
+            if data.get("sector_allocation", {}).get(sector, 0) > 20
+        )
+    return sorted(relevant_funds, key=lambda x: x.get("returns", 0), reverse=True)[:5]
+
+
+def test_sector_aggregates_match_a_scan(tmp_path):
+    manager, stocks = write_data(tmp_path)
+    banking = [s for s in stocks.values() if s["sector"] == "Banking"]
+    perf = manager.get_sector_performance("Banking")
+    assert perf["avg_returns"] == pytest.approx(sum(s["returns"] for s in banking) / len(banking))
+    assert perf["market_cap"] == pytest.approx(sum(s["market_cap"] for s in banking))
+    assert manager.get_sector_performance("Unknown") == {}
+
+
+def test_sector_pe_is_the_mean_over_the_sector(tmp_path):
+    manager, stocks = write_data(tmp_path)
+    symbol = "SYM0"
+    sector = stocks[symbol]["sector"]
+    peers = [s["pe_ratio"] for s in stocks.values() if s["sector"] == sector]
+    recommendation = manager.get_stock_recommendation(symbol)
+    assert recommendation["sector_avg_pe"] == pytest.approx(sum(peers) / len(peers))
+
+
+def test_stock_without_sector_peers_is_held(tmp_path):
+    manager, stocks = write_data(tmp_path)
+    stocks["LONE"] = dict(stocks["SYM0"], sector=None)
+    stocks["NOPE"] = dict(stocks["SYM0"], pe_ratio=None)
+    (tmp_path / "stocks.json").write_text(json.dumps(stocks))
+    assert manager.reload_if_changed()
+    for symbol in ("LONE", "NOPE"):
+        recommendation = manager.get_stock_recommendation(symbol)
+        assert recommendation["recommendation"] == "HOLD"
+        assert recommendation["confidence"] == 0
+        assert recommendation["sector_avg_pe"] is None
+
+
+def test_market_summary_top_movers(tmp_path):
+    manager, stocks = write_data(tmp_path)
+    by_returns = sorted(stocks, key=lambda s: stocks[s]["returns"])
+    summary = manager.get_market_summary()
+    assert [m["symbol"] for m in summary["top_losers"]] == by_returns[:5]
+    assert [m["returns"] for m in summary["top_gainers"]] == sorted(
+        (stocks[s]["returns"] for s in by_returns), reverse=True)[:5]
+    assert summary["top_gainers"][0]["sector"] in SECTORS
+    assert summary["stock_count"] == 200
+    assert sorted(summary["sectors"]) == sorted(SECTORS)
+    assert summary["average_pe"] == pytest.approx(sum(s["pe_ratio"] for s in stocks.values()) / 200)
+
+
+def test_relevant_funds_from_index_match_a_scan(tmp_path):
+    manager, _ = write_data(tmp_path)
+    funds = make_funds(300, 100, random.Random(3))
+    for name, data in funds.items():
+        manager.update_fund(name, data)
+    for symbol, sector in [("SYM1", None), (None, "Banking"), ("SYM7", "It"), ("NONE", None)]:
+        assert manager.get_relevant_funds(symbol, sector) == scan_relevant_funds(funds, symbol, sector)
+
+
+def test_fund_updates_are_reflected(tmp_path):
+    manager, _ = write_data(tmp_path)
+    manager.update_fund("Alpha", {"nav": 10, "returns": 12, "holdings": {"SYM1": 4.0},
+                                  "sector_allocation": {"Banking": 35}})
+    manager.update_fund("Beta", {"nav": 20, "returns": 15, "holdings": {"SYM1": 2.0}})
+    assert [f["fund_name"] for f in manager.get_relevant_funds(symbol="SYM1")] == ["Beta", "Alpha"]
+
+    manager.update_fund("Alpha", {"nav": 11, "returns": 20, "holdings": {"SYM2": 1.0},
+                                  "sector_allocation": {"Banking": 10}})
+    assert [f["fund_name"] for f in manager.get_relevant_funds(symbol="SYM1")] == ["Beta"]
+    assert manager.get_relevant_funds(symbol="SYM2")[0]["allocation"] == 1.0
+    assert manager.get_relevant_funds(sector="Banking") == []
+
+
+def test_reload_swaps_in_changed_files(tmp_path):
+    manager, stocks = write_data(tmp_path)
+    before = manager.snapshot
+    assert not manager.reload_if_changed()
+    assert manager.snapshot is before
+
+    stocks["NEW"] = dict(stocks["SYM0"], returns=99.0)
+    (tmp_path / "stocks.json").write_text(json.dumps(stocks))
+    assert manager.reload_if_changed()
+    assert manager.get_market_summary()["top_gainers"][0]["symbol"] == "NEW"
+    # A reader still holding the old snapshot sees it unchanged
+    assert "NEW" not in before.stock_data
+    assert before.get_market_summary()["stock_count"] == 200
+
+
+def test_broken_file_keeps_previous_snapshot(tmp_path):
+    manager, _ = write_data(tmp_path)
+    before = manager.snapshot
+    (tmp_path / "stocks.json").write_text("{\"SYM0\": ")
+    assert not manager.reload_if_changed()
+    assert manager.snapshot is before
+
+
+def test_fund_update_leaves_old_snapshot_untouched(tmp_path):
+    manager, _ = write_data(tmp_path)
+    manager.update_fund("Alpha", {"nav": 10, "returns": 12, "holdings": {"SYM1": 4.0}})
+    before = manager.snapshot
+    manager.update_fund("Beta", {"nav": 20, "returns": 15, "holdings": {"SYM1": 2.0}})
+    assert [f["fund_name"] for f in before.get_relevant_funds(symbol="SYM1")] == ["Alpha"]
+    assert [f["fund_name"] for f in manager.get_relevant_funds(symbol="SYM1")] == ["Beta", "Alpha"]
+    assert "Beta" not in before.mf_data
+
+
+def test_fund_matcher_is_shared_per_snapshot(tmp_path):
+    manager, _ = write_data(tmp_path)
+    manager.update_fund("HDFC Top 100 Fund", {"nav": 10, "returns": 12, "holdings": {"SYM1": 4.0}})
+    matcher = manager.fund_matcher
+    assert manager.fund_matcher is matcher
+    assert matcher.match(["HDFC Top 100"]) == ["HDFC Top 100 Fund"]
+
+    manager.update_fund("Axis Bluechip Fund", {"nav": 20, "returns": 15, "holdings": {"SYM1": 2.0}})
+    assert manager.fund_matcher is not matcher
+    assert manager.fund_matcher.match(["Axis Bluechip"]) == ["Axis Bluechip Fund"]
@@ -0,0 +1,104 @@
+import faiss
+import numpy as np
+import pytest
+
+from app.embeddings import Embedder, HashEmbeddingBackend
+from app.vector_store import VectorStore, build_index
+
+embedder = Embedder(HashEmbeddingBackend(dimension=64), cache=None)
+
+
+def make_store(tmp_path, **kwargs):
+    store = VectorStore(persist_path=str(tmp_path / "vs"), max_history=1000, embedder=embedder, **kwargs)
+    store.nlist = 2
+    return store
+
+
+def fill(store, n=100):
+    store.add_contexts([(f"question {i} about topic{i}", f"answer {i}", []) for i in range(n)])
+
+
+def test_ivf_trains_once_enough_vectors(tmp_path):
+    store = make_store(tmp_path, index_mode="ivf")
+    fill(store, 50)
+    assert store._index_kind == "flat"
+    fill(store, 100)
+    assert store._index_kind == "ivf" and store.index.is_trained
+    store.nprobe = 2  # every list, so the search is exact
+    assert store.find_similar_contexts("question 7 about topic7", top_k=1)[0]["response"] == "answer 7"
+
+    # Reopening retrains from the persisted vectors
+    reopened = make_store(tmp_path, index_mode="ivf")
+    reopened.train_index()
+    assert reopened._index_kind == "ivf" and reopened.index.ntotal == 100
+
+
+def test_hnsw_cosine_search_and_eviction(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.vector_store.REMOVE_BATCH_SIZE", 4)
+    store = make_store(tmp_path, index_mode="hnsw", metric="cosine")
+    fill(store, 20)
+    hits = store._search(embedder.embed(["question 3 about topic3"])[0], 2)
+    assert hits[0][0] == "question 3 about topic3"
+    assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+
+    # HNSW cannot remove ids; evicted entries are skipped and then rebuilt away in the background
+    store.max_history = 10
+    fill(store, 1)
+    assert len(store.contexts) == 10
+    store._swap_rebuilt_index(wait=True)
+    assert store.index.ntotal - len(store._removed) == 10 and store.index.ntotal < 21
+    assert all(q in store.contexts for q, _ in store._search(embedder.embed(["question 3"])[0], 5))
+
+
+@pytest.mark.parametrize("mode", ["flat", "ivf", "ivfpq", "hnsw"])
+def test_build_index_modes(mode):
+    index = build_index(mode, 16, metric="cosine", nlist=4, pq_m=4)
+    vectors = np.random.default_rng(0).standard_normal((512, 16)).astype(np.float32)
+    if not index.is_trained:
+        index.train(vectors)
+    index.add_with_ids(vectors, np.arange(1000, 1512))
+    _, ids = index.search(vectors[:1], 1)
+    assert ids[0][0] >= 1000
+
+
+def test_search_overfetch_is_bounded(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    fill(store, 200)
+    searched = []
+    search = store.index.search
+
+    def recording_search(query, k):
+        searched.append(k)
+        return search(query, k)
+
+    monkeypatch.setattr(store.index, "search", recording_search, raising=False)
+    query = embedder.embed(["question 3 about topic3"])[0]
+    # Many tombstones, but the nearest entries are live: a single small fetch
+    store._removed = set(range(100, 200))
+    assert store._search(query, 3)[0][0] == "question 3 about topic3"
+    assert searched == [6]
+
+    # The nearest entries are tombstones: the fetch grows until enough live ones turn up
+    searched.clear()
+    nearest = [idx for idx in search(store._prepare(query.reshape(1, -1)), 50)[1][0]][:40]
+    for idx in nearest:
+        store._queries.pop(int(idx))
+    store._removed = set(int(idx) for idx in nearest)
+    hits = store._search(query, 3)
+    assert len(hits) == 3 and searched[0] == 6 and searched[-1] <= 43
+
+
+def test_hnsw_rebuild_catches_up_with_changes_made_meanwhile(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.vector_store.REMOVE_BATCH_SIZE", 4)
+    store = make_store(tmp_path, index_mode="hnsw")
+    store.max_history = 20
+    fill(store, 26)
+    assert store._rebuild_thread is not None
+    store._rebuild_thread.join()
+    # Added and evicted after the rebuild took its snapshot of the live rows
+    store.add_contexts([(f"late question {i}", f"late answer {i}", []) for i in range(3)])
+
+    assert store.index.ntotal - len(store._removed) == 20 and store.index.ntotal < 29
+    assert set(store._queries) <= set(faiss.vector_to_array(store.index.id_map))
+    hits = store._search(embedder.embed(["late question 1"])[0], 3)
+    assert hits[0][0] == "late question 1" and all(q in store.contexts for q, _ in hits)
@@ -0,0 +1,139 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.embeddings import Embedder, HashEmbeddingBackend
+from app.vector_store import VectorStore
+
+embedder = Embedder(HashEmbeddingBackend(), cache=None)
+
+
+def fake_embedding(text):
+    return embedder.embed([text])[0].tolist()
+
+
+def make_store(path):
+    return VectorStore(persist_path=str(path), embedder=embedder)
+
+
+def test_reload_maps_matrix_from_disk(tmp_path):
+    store = make_store(tmp_path / "vs")
+    store.add_context("Nifty today?", "Up 2%", ["Nifty 50"])
+    store.add_context("Banks?", "Down", ["banking"])
+
+    reloaded = make_store(tmp_path / "vs")
+    assert set(reloaded.contexts) == {"Nifty today?", "Banks?"}
+    assert reloaded.contexts["Banks?"]["entities"] == ["banking"]
+    assert np.shares_memory(reloaded.embeddings["Banks?"], reloaded._matrix)
+    np.testing.assert_array_equal(reloaded.embeddings["Banks?"], np.float32(fake_embedding("Banks?")))
+    assert reloaded.find_similar_contexts("Banks?", top_k=1)[0]["response"] == "Down"
+
+
+def test_history_limit_survives_reload(tmp_path):
+    store = make_store(tmp_path / "vs")
+    for i in range(15):
+        store.add_context(f"Query {i}", f"Response {i}")
+    store.add_context("Query 14", "Updated")
+
+    reloaded = make_store(tmp_path / "vs")
+    assert len(reloaded.contexts) == 10
+    assert "Query 4" not in reloaded.contexts
+    assert reloaded.contexts["Query 14"]["response"] == "Updated"
+
+
+def test_compaction_drops_dead_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.vector_store.COMPACT_MIN_DEAD_ROWS", 5)
+    store = make_store(tmp_path / "vs")
+    store.max_history = 3
+    for i in range(20):
+        store.add_context(f"Query {i}", f"Response {i}")
+
+    assert os.path.getsize(store.matrix_path) < 20 * 1536 * 4
+    reloaded = make_store(tmp_path / "vs")
+    assert set(reloaded.contexts) == {"Query 17", "Query 18", "Query 19"}
+    np.testing.assert_array_equal(reloaded.embeddings["Query 18"], np.float32(fake_embedding("Query 18")))
+
+
+def matrix_files(path):
+    return sorted(name for name in os.listdir(path) if name.endswith(".f32"))
+
+
+def test_interrupted_compaction_keeps_the_old_matrix(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.vector_store.COMPACT_MIN_DEAD_ROWS", 5)
+    store = make_store(tmp_path / "vs")
+    store.max_history = 3
+    for i in range(8):
+        store.add_context(f"Query {i}", f"Response {i}")
+
+    # The ninth entry triggers compaction; crash once the new matrix is written,
+    # before the metadata switches to it
+    def crash(fd):
+        raise OSError("disk went away")
+
+    fsync = os.fsync
+    monkeypatch.setattr("app.vector_store.os.fsync", crash)
+    with pytest.raises(OSError):
+        store.add_context("Query 8", "Response 8")
+    monkeypatch.setattr("app.vector_store.os.fsync", fsync)
+    assert matrix_files(tmp_path / "vs") == ["embeddings.1.f32", "embeddings.f32"]
+
+    reloaded = make_store(tmp_path / "vs")
+    assert matrix_files(tmp_path / "vs") == ["embeddings.f32"]
+    assert set(reloaded.contexts) == {"Query 6", "Query 7", "Query 8"}
+    for query in reloaded.contexts:
+        np.testing.assert_array_equal(reloaded.embeddings[query], np.float32(fake_embedding(query)))
+
+    # A completed compaction switches files in the same commit and leaves only the new one
+    reloaded.max_history = 3
+    for i in range(9, 20):
+        reloaded.add_context(f"Query {i}", f"Response {i}")
+    assert matrix_files(tmp_path / "vs") == [os.path.basename(reloaded.matrix_path)] != ["embeddings.f32"]
+    again = make_store(tmp_path / "vs")
+    assert set(again.contexts) == {"Query 17", "Query 18", "Query 19"}
+    np.testing.assert_array_equal(again.embeddings["Query 18"], np.float32(fake_embedding("Query 18")))
+
+
+def test_legacy_json_is_migrated(tmp_path):
+    legacy = {
+        "embeddings": {"Old question": fake_embedding("Old question")},
+        "contexts": {"Old question": {"query": "Old question", "response": "Old answer",
+                                      "entities": [], "timestamp": 1.0}},
+    }
+    (tmp_path / "vector_store.json").write_text(json.dumps(legacy))
+
+    store = make_store(tmp_path / "vector_store")
+    assert store.contexts["Old question"]["response"] == "Old answer"
+    assert os.path.exists(store.matrix_path)
+
+
+def test_eviction_is_incremental(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.vector_store.REMOVE_BATCH_SIZE", 4)
+    store = make_store(tmp_path / "vs")
+    store.max_history = 5
+    for i in range(8):
+        store.add_context(f"Query {i}", f"Response {i}")
+
+    assert list(store.contexts) == [f"Query {i}" for i in range(3, 8)]
+    # Three evicted ids are still in FAISS but never returned
+    assert store.index.ntotal == 8
+    found = store.find_similar_contexts("Query 1", top_k=5)
+    assert sorted(c["query"] for c in found) == [f"Query {i}" for i in range(3, 8)]
+
+    store.add_context("Query 3", "Again")
+    store.add_context("Query 8", "Response 8")
+    assert store.index.ntotal == 5
+    assert list(store.contexts) == ["Query 5", "Query 6", "Query 7", "Query 3", "Query 8"]
+
+
+def test_batch_insert_commits_once(tmp_path):
+    store = VectorStore(persist_path=str(tmp_path / "vs"), max_history=5, embedder=embedder)
+    statements = []
+    store._meta.set_trace_callback(statements.append)
+    store.add_contexts([(f"Query {i}", f"Response {i}", []) for i in range(12)])
+    store._meta.set_trace_callback(None)
+
+    assert sum(statement.strip().upper() == "COMMIT" for statement in statements) == 1
+    reloaded = make_store(tmp_path / "vs")
+    assert set(reloaded.contexts) == {f"Query {i}" for i in range(7, 12)}